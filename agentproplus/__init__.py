@@ -1,2 +1,28 @@
-from .react_agent import ReactAgent
-from .model import create_model
\ No newline at end of file
+# Public names are resolved on first access so `import agentproplus` stays cheap:
+# provider SDKs (openai, litellm) and tool dependencies load only when used.
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .react_agent import ReactAgent
+    from .model import create_model
+
+_LAZY_ATTRS = {
+    "ReactAgent": ".react_agent",
+    "create_model": ".model",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -28,3 +28,4 @@ class ThoughtStep(BaseModel):
 class AgentResponse(BaseModel):
     thought_process: List[ThoughtStep]  # Steps including thoughts, actions, and observations
     final_answer: Optional[str] = None  # Final answer after reasoning
+    run_id: Optional[str] = None  # Checkpoint id when the agent has a checkpoint_store
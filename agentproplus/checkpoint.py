@@ -0,0 +1,237 @@
+"""
+Checkpoints of in-flight agent runs.
+
+A ReactAgent with a checkpoint_store saves the run inputs when a run starts and
+each ThoughtStep as soon as it completes. After a crash, restart or provider
+outage, agent.resume(run_id) continues from the last completed step, so only the
+remaining iterations cost LLM and tool calls.
+
+Stores:
+    InMemoryCheckpointStore   per process, e.g. retries after provider errors
+    FileCheckpointStore       one append-only JSON Lines file per run; survives restarts
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import json
+import os
+import re
+import threading
+import time
+
+from pydantic import BaseModel, Field
+
+from .agent import ThoughtStep
+
+
+class RunState(BaseModel):
+    run_id: str
+    query: str
+    history: List[Dict[str, Any]] = Field(default_factory=list)  # conversation_history when the run started
+    steps: List[ThoughtStep] = Field(default_factory=list)
+    final_answer: Optional[str] = None
+    completed: bool = False
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time)
+
+
+class CheckpointStore(ABC):
+    """Where agent runs are checkpointed."""
+
+    @abstractmethod
+    def start(self, run_id: str, query: str, history: List[Dict[str, Any]]) -> None:
+        pass
+
+    @abstractmethod
+    def add_step(self, run_id: str, step: ThoughtStep) -> None:
+        pass
+
+    @abstractmethod
+    def finish(self, run_id: str, final_answer: Optional[str]) -> None:
+        pass
+
+    @abstractmethod
+    def load(self, run_id: str) -> Optional[RunState]:
+        pass
+
+    @abstractmethod
+    def delete(self, run_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def run_ids(self) -> List[str]:
+        pass
+
+
+class InMemoryCheckpointStore(CheckpointStore):
+    """Checkpoints held in this process.
+
+    Finished runs are kept for `ttl` seconds so resume() can still return their
+    response, and the least recently updated runs are evicted beyond `max_runs`.
+    """
+
+    def __init__(self, max_runs: int = 1024, ttl: Optional[float] = 3600.0):
+        self.max_runs = max_runs
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._runs: "OrderedDict[str, RunState]" = OrderedDict()
+
+    def start(self, run_id: str, query: str, history: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._runs[run_id] = RunState(run_id=run_id, query=query, history=[dict(h) for h in history])
+            self._runs.move_to_end(run_id)
+            self._prune_locked()
+
+    def add_step(self, run_id: str, step: ThoughtStep) -> None:
+        with self._lock:
+            state = self._runs[run_id]
+            state.steps.append(step.model_copy(deep=True))
+            state.updated_at = time.time()
+            self._runs.move_to_end(run_id)
+
+    def finish(self, run_id: str, final_answer: Optional[str]) -> None:
+        with self._lock:
+            state = self._runs[run_id]
+            state.final_answer = final_answer
+            state.completed = True
+            state.updated_at = time.time()
+            self._runs.move_to_end(run_id)
+
+    def _prune_locked(self) -> None:
+        if self.ttl is not None:
+            cutoff = time.time() - self.ttl
+            for run_id in [r for r, state in self._runs.items() if state.completed and state.updated_at < cutoff]:
+                del self._runs[run_id]
+        while len(self._runs) > self.max_runs:
+            self._runs.popitem(last=False)
+
+    def load(self, run_id: str) -> Optional[RunState]:
+        with self._lock:
+            state = self._runs.get(run_id)
+            return state.model_copy(deep=True) if state is not None else None
+
+    def delete(self, run_id: str) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def run_ids(self) -> List[str]:
+        with self._lock:
+            self._prune_locked()
+            return list(self._runs)
+
+
+_RUN_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+class FileCheckpointStore(CheckpointStore):
+    """One `<run_id>.jsonl` file per run in `directory`.
+
+    Each step is appended as one line, so a checkpoint costs a small write rather than
+    rewriting the run. With fsync=True (the default) a step is on disk before the
+    next iteration starts. A line cut short by a crash is cut off the file when the
+    run is loaded, so the records resume() appends start on a line of their own.
+    """
+
+    def __init__(self, directory: str, fsync: bool = True):
+        self.directory = directory
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, run_id: str) -> str:
+        if not _RUN_ID.match(run_id) or run_id in (".", ".."):
+            raise ValueError(f"Invalid run_id '{run_id}': use letters, digits, '_', '-' and '.'")
+        return os.path.join(self.directory, f"{run_id}.jsonl")
+
+    def _write(self, run_id: str, record: Dict[str, Any], mode: str = "a") -> None:
+        line = json.dumps(record, default=str, ensure_ascii=False) + "\n"
+        with open(self._path(run_id), mode, encoding="utf-8") as f:
+            f.write(line)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def start(self, run_id: str, query: str, history: List[Dict[str, Any]]) -> None:
+        self._write(run_id, {"type": "start", "run_id": run_id, "query": query, "history": history,
+                             "time": time.time()}, mode="w")
+
+    def add_step(self, run_id: str, step: ThoughtStep) -> None:
+        self._write(run_id, {"type": "step", "step": step.model_dump(mode="json"), "time": time.time()})
+
+    def finish(self, run_id: str, final_answer: Optional[str]) -> None:
+        self._write(run_id, {"type": "finish", "final_answer": final_answer, "time": time.time()})
+
+    def load(self, run_id: str) -> Optional[RunState]:
+        path = self._path(run_id)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # Drop the line a crash cut short; appends would otherwise extend it
+            with open(path, "r+b") as f:
+                f.truncate(end)
+                if self.fsync:
+                    os.fsync(f.fileno())
+        state: Optional[RunState] = None
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"⚠️ Skipping unreadable checkpoint record of run '{run_id}'")
+                continue
+            kind = record.get("type")
+            if kind == "start":
+                state = RunState(run_id=run_id, query=record["query"], history=record.get("history") or [],
+                                 created_at=record["time"], updated_at=record["time"])
+            elif state is None:
+                continue
+            elif kind == "step":
+                state.steps.append(ThoughtStep.model_validate(record["step"]))
+                state.updated_at = record["time"]
+            elif kind == "finish":
+                state.final_answer = record.get("final_answer")
+                state.completed = True
+                state.updated_at = record["time"]
+        return state
+
+    def delete(self, run_id: str) -> None:
+        try:
+            os.remove(self._path(run_id))
+        except FileNotFoundError:
+            pass
+
+    def run_ids(self) -> List[str]:
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(self.directory) if name.endswith(".jsonl"))
+
+
+class RunCheckpoint:
+    """Checkpoints of one agent run. Without a store every call is a no-op; a failing
+    store is reported but does not fail the run."""
+
+    __slots__ = ("store", "run_id")
+
+    def __init__(self, store: Optional[CheckpointStore], run_id: Optional[str] = None):
+        self.store = store
+        self.run_id = run_id
+
+    def _save(self, method: str, *args: Any) -> None:
+        if self.store is None:
+            return
+        try:
+            getattr(self.store, method)(self.run_id, *args)
+        except Exception as e:
+            print(f"⚠️ Saving checkpoint of run '{self.run_id}' failed: {e}")
+
+    def start(self, query: str, history: List[Dict[str, Any]]) -> None:
+        self._save("start", query, history)
+
+    def step(self, step: ThoughtStep) -> None:
+        self._save("add_step", step)
+
+    def finish(self, final_answer: Optional[str]) -> None:
+        self._save("finish", final_answer)
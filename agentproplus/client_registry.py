@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+import hashlib
+import os
+import threading
+
+if TYPE_CHECKING:
+    import openai
+
+
+def credential_fingerprint(api_key: Optional[str]) -> str:
+    # Keys never end up in registry keys or reprs, only their digest
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ClientRegistry:
+    """Process-wide cache of provider SDK clients and their HTTP connection pools.
+
+    Clients are keyed by (provider, base_url, credentials), so every agent that talks
+    to the same endpoint with the same key reuses one thread-safe client and its warm
+    keep-alive connections instead of cold-starting a new pool per agent.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str, str], Any] = {}
+        self._async_clients: Dict[Tuple[str, str, str, int], Tuple[Any, Any]] = {}
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+
+    def configure(self, max_connections: Optional[int] = None, max_keepalive_connections: Optional[int] = None,
+                  keepalive_expiry: Optional[float] = None) -> None:
+        """Set pool sizes for clients created from now on. Call before building agents."""
+        with self._lock:
+            if max_connections is not None:
+                self.max_connections = max_connections
+            if max_keepalive_connections is not None:
+                self.max_keepalive_connections = max_keepalive_connections
+            if keepalive_expiry is not None:
+                self.keepalive_expiry = keepalive_expiry
+
+    def _limits(self) -> Any:
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def get_openai_client(self, api_key: Optional[str] = None, base_url: Optional[str] = None) -> "openai.OpenAI":
+        api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        base_url = base_url or os.environ.get("OPENAI_BASE_URL")
+        key = ("openai", base_url or "", credential_fingerprint(api_key))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                import openai
+
+                client = openai.OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    # Retries are handled by ModelClient's retry policy
+                    max_retries=0,
+                    http_client=openai.DefaultHttpxClient(limits=self._limits()),
+                )
+                self._clients[key] = client
+            return client
+
+    def get_async_openai_client(self, api_key: Optional[str] = None,
+                                base_url: Optional[str] = None) -> "openai.AsyncOpenAI":
+        """AsyncOpenAI client for the running event loop.
+
+        Async connection pools are bound to the loop that opened them, so clients are
+        cached per loop; entries of closed loops are dropped when new ones are made.
+        """
+        import asyncio
+
+        api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        base_url = base_url or os.environ.get("OPENAI_BASE_URL")
+        loop = asyncio.get_running_loop()
+        key = ("openai-async", base_url or "", credential_fingerprint(api_key), id(loop))
+        with self._lock:
+            entry = self._async_clients.get(key)
+            if entry is not None and entry[0] is loop:
+                return entry[1]
+            for stale in [k for k, (other, _) in self._async_clients.items() if other.is_closed()]:
+                del self._async_clients[stale]
+            import openai
+
+            client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=0,
+                http_client=openai.DefaultAsyncHttpxClient(limits=self._limits()),
+            )
+            self._async_clients[key] = (loop, client)
+            return client
+
+    def prewarm(self, client: Any) -> bool:
+        """Open a pooled connection (TCP + TLS) ahead of the first real request."""
+        try:
+            client.models.list()
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to pre-warm LLM client connection: {e}")
+            return False
+
+    def reset_after_fork(self) -> None:
+        """Forget cached clients in a forked child without closing them.
+
+        Their connections belong to the parent process; closing them here would
+        shut down the parent's sockets. New clients (and pools) are made on demand.
+        """
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._async_clients = {}
+
+    def clear(self) -> None:
+        """Close every cached client and its connection pool."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            # Async clients can only be closed from their own loop; they are just released
+            self._async_clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+default_registry = ClientRegistry()
+
+
+def get_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> "openai.OpenAI":
+    return default_registry.get_openai_client(api_key=api_key, base_url=base_url)
+
+
+def configure_client_pool(max_connections: Optional[int] = None, max_keepalive_connections: Optional[int] = None,
+                          keepalive_expiry: Optional[float] = None) -> None:
+    default_registry.configure(max_connections, max_keepalive_connections, keepalive_expiry)
+
+
+def prewarm_clients(*models: Any) -> None:
+    """Warm the connection pools of the given model clients, e.g. at service startup."""
+    for model in models:
+        prewarm = getattr(model, "prewarm", None)
+        if callable(prewarm):
+            prewarm()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from .tokenization import Tokenizer, get_tokenizer
+
+
+class ContextOverflowError(ValueError):
+    """The parts of a prompt that cannot be trimmed do not fit the model's context window."""
+
+
+class PromptPart:
+    """A piece of the user prompt.
+
+    Parts with a `priority` can be trimmed, lowest priority first: "drop" parts are
+    removed entirely, "truncate" parts are shortened down to `min_tokens` (keeping
+    their head and tail). Parts with priority None are always kept.
+    """
+
+    __slots__ = ("text", "priority", "mode", "min_tokens")
+
+    def __init__(self, text: str, priority: Optional[int] = None, mode: str = "drop", min_tokens: int = 64):
+        self.text = text
+        self.priority = priority
+        self.mode = mode
+        self.min_tokens = min_tokens
+
+
+class FittedPrompt(str):
+    """A user prompt built by ContextWindowManager.fit, carrying its token count so
+    the request is not counted again before it is sent."""
+
+    __slots__ = ("tokens",)
+
+    def __new__(cls, text: str, tokens: int) -> "FittedPrompt":
+        prompt = super().__new__(cls, text)
+        prompt.tokens = tokens
+        return prompt
+
+
+class ContextWindowManager:
+    """Keeps prompts within a model's context window minus the output budget."""
+
+    def __init__(self, model_name: Optional[str], context_window: Optional[int],
+                 tokenizer: Optional[Tokenizer] = None, safety_margin: float = 0.02):
+        self.context_window = context_window
+        self.tokenizer = tokenizer or get_tokenizer(model_name)
+        # Covers message framing tokens and the error of estimated counts
+        self.safety_margin = safety_margin
+
+    def budget(self, system_prompt: str, max_tokens: int, system_tokens: Optional[int] = None) -> Optional[int]:
+        """Tokens left for the user prompt, or None when the window is unknown."""
+        if not self.context_window:
+            return None
+        usable = int(self.context_window * (1 - self.safety_margin))
+        if system_tokens is None:
+            system_tokens = self.tokenizer.count(system_prompt)
+        return usable - max_tokens - system_tokens
+
+    def check(self, system_prompt: str, user_prompt: str, max_tokens: int) -> int:
+        """Count prompt tokens, raising ContextOverflowError if the request cannot fit.
+
+        A FittedPrompt brings its own count, so only the system prompt is counted here.
+        """
+        system_tokens = self.tokenizer.count(system_prompt)
+        user_tokens = user_prompt.tokens if isinstance(user_prompt, FittedPrompt) else self.tokenizer.count(user_prompt)
+        prompt_tokens = system_tokens + user_tokens
+        budget = self.budget(system_prompt, max_tokens, system_tokens)
+        if budget is not None and user_tokens > budget:
+            raise ContextOverflowError(
+                f"Prompt has {prompt_tokens} tokens; with max_tokens={max_tokens} it exceeds "
+                f"the {self.context_window}-token context window"
+            )
+        return prompt_tokens
+
+    def fit(self, system_prompt: str, parts: Sequence[PromptPart], max_tokens: int) -> str:
+        """Join parts into a user prompt, trimming low-priority parts until it fits.
+
+        With a known window the result is a FittedPrompt carrying its token count
+        (the sum of the parts' counts).
+        """
+        budget = self.budget(system_prompt, max_tokens)
+        texts = [part.text for part in parts]
+        if budget is None:
+            return "".join(texts)
+        counts = [self.tokenizer.count(text) for text in texts]
+        excess = sum(counts) - budget
+        if excess <= 0:
+            return FittedPrompt("".join(texts), sum(counts))
+
+        trimmable = sorted((i for i, p in enumerate(parts) if p.priority is not None), key=lambda i: parts[i].priority)
+        for i in trimmable:
+            if excess <= 0:
+                break
+            part = parts[i]
+            if part.mode == "truncate" and counts[i] > part.min_tokens:
+                target = max(part.min_tokens, counts[i] - excess)
+                texts[i] = self._shorten(texts[i], counts[i], target)
+            elif part.mode == "drop":
+                texts[i] = ""
+            else:
+                continue
+            new_count = self.tokenizer.count(texts[i])
+            excess -= counts[i] - new_count
+            counts[i] = new_count
+
+        if excess > 0:
+            raise ContextOverflowError(
+                f"Prompt is {excess} tokens over the {self.context_window}-token context window "
+                f"after trimming history and observations"
+            )
+        return FittedPrompt("".join(texts), sum(counts))
+
+    def _shorten(self, text: str, tokens: int, target: int) -> str:
+        """Keep roughly the first two thirds and last third of `target` tokens."""
+        marker = f"\n[... truncated {tokens - target} tokens ...]\n"
+        keep = max(0, target - self.tokenizer.count(marker))
+        head = self.tokenizer.truncate(text, keep * 2 // 3)
+        tail_chars = int(len(text) * (keep - keep * 2 // 3) / max(tokens, 1))
+        tail = text[len(text) - tail_chars:] if tail_chars else ""
+        trailing_newline = "\n" if text.endswith("\n") and not tail.endswith("\n") else ""
+        return head + marker + tail + trailing_newline
+
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+import asyncio
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from http.cookiejar import DefaultCookiePolicy
+
+
+class HTTPConfig:
+    """Connection pooling settings shared by all network tools.
+
+    pool_connections: number of distinct hosts kept in the pool
+    pool_maxsize: keep-alive connections per host (also the per-host concurrency cap when pool_block is set)
+    pool_block: wait for a free connection instead of opening extra, unpooled ones
+    timeout: default (connect, read) timeout in seconds for requests that do not pass one
+    max_retries: connection-level retries (DNS failures, refused connections)
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 16,
+        pool_maxsize: int = 32,
+        pool_block: bool = True,
+        timeout: Any = 30,
+        max_retries: int = 0,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+
+class PooledSession(requests.Session):
+    """requests.Session with keep-alive pooling and a default timeout."""
+
+    def __init__(self, config: HTTPConfig):
+        super().__init__()
+        self.default_timeout = config.timeout
+        adapter = HTTPAdapter(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            pool_block=config.pool_block,
+            max_retries=config.max_retries,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        # The session is shared across agents/tenants, so never carry cookies between calls
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+_config = HTTPConfig()
+_session: Optional[PooledSession] = None
+_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_host_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def configure_http(**kwargs: Any) -> HTTPConfig:
+    """Update pooling settings; the shared session is rebuilt on next use."""
+    global _config
+    with _lock:
+        _config = HTTPConfig(**{**vars(_config), **kwargs})
+        _reset_locked()
+    return _config
+
+
+def get_session() -> PooledSession:
+    """Return the process-wide pooled session used by the built-in network tools."""
+    global _session
+    session = _session
+    if session is None:
+        with _lock:
+            if _session is None:
+                _session = PooledSession(_config)
+            session = _session
+    return session
+
+
+def get_async_client() -> Any:
+    """Return the pooled httpx.AsyncClient bound to the running event loop.
+
+    httpx async connections belong to the loop that opened them, so one client
+    is kept per loop rather than per process.
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        timeout = _config.timeout
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=_config.pool_connections * _config.pool_maxsize,
+                max_keepalive_connections=_config.pool_maxsize,
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=_config.max_retries),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def arequest(method: str, url: str, **kwargs: Any) -> Any:
+    """Send a request through the loop's pooled client, mirroring the sync session's limits.
+
+    httpx only caps connections in total, so with pool_block set at most pool_maxsize
+    requests per host are in flight at once, like the blocking requests adapter.
+    """
+    client = get_async_client()
+    if not _config.pool_block:
+        return await client.request(method, url, **kwargs)
+    slots = _host_slots.setdefault(asyncio.get_running_loop(), {})
+    host = urlsplit(url).netloc
+    slot = slots.get(host)
+    if slot is None:
+        slot = slots[host] = asyncio.Semaphore(_config.pool_maxsize)
+    async with slot:
+        return await client.request(method, url, **kwargs)
+
+
+async def aclose_async_client() -> None:
+    """Close the async client of the running loop (call before the loop shuts down)."""
+    loop = asyncio.get_running_loop()
+    _host_slots.pop(loop, None)
+    client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_sessions() -> None:
+    """Close the shared sync session and drop its pooled connections."""
+    with _lock:
+        _reset_locked()
+
+
+def _reset_locked() -> None:
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
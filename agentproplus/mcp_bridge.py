@@ -1,90 +1,694 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Coroutine, Dict, List, Optional, Set, TypeVar
 import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 
-try:
-    # Client-side MCP SDK
-    from mcp.client.stdio import StdioServer
-    from mcp.client.session import ClientSession
-except Exception:  # pragma: no cover
-    StdioServer = None  # type: ignore
-    ClientSession = None  # type: ignore
+from .metrics import metrics
+
+# Client-side MCP SDK, imported on first use (see _ensure_sdk)
+ClientSession = None  # type: ignore
+StdioServerParameters = None  # type: ignore
+stdio_client = None  # type: ignore
+sse_client = None  # type: ignore
+streamable_http_client = None  # type: ignore
+streamablehttp_client = None  # type: ignore
+
+TRANSPORTS = ("stdio", "streamable_http", "sse")
+
+T = TypeVar("T")
 
 
 class MCPNotAvailableError(RuntimeError):
     pass
 
 
+class _LoopThread:
+    """A long-lived asyncio event loop running on a daemon thread.
+
+    MCP sessions are bound to the loop that opened them, so every session of a
+    manager lives on this one loop and callers submit coroutines to it.
+    """
+
+    def __init__(self, name: str = "mcp-client-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run `coro` on the loop and block the calling thread for its result."""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("MCPClientManager sync API called from its own event loop; use the async API")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def wrap(self, coro: Coroutine[Any, Any, T]) -> Awaitable[T]:
+        """Run `coro` on the loop and return an awaitable for the caller's loop."""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def stop(self) -> None:
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if not self.in_loop_thread():
+            self._thread.join(timeout=5)
+            self.loop.close()
+
+
+def transport_of(entry: Dict[str, Any]) -> str:
+    """The entry's transport: explicit "transport", else stdio for "command" and streamable HTTP for "url"."""
+    transport = str(entry.get("transport") or ("stdio" if entry.get("command") else "streamable_http"))
+    transport = transport.replace("-", "_")
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown MCP transport '{transport}', expected one of {', '.join(TRANSPORTS)}")
+    return transport
+
+
+def _http_client(entry: Dict[str, Any]) -> Any:
+    """Keep-alive connection pool shared by every session to one HTTP server entry."""
+    import httpx
+
+    timeout = float(entry.get("timeout", 30))
+    return httpx.AsyncClient(
+        headers=entry.get("headers"),
+        timeout=httpx.Timeout(timeout, read=float(entry.get("sse_read_timeout", 300))),
+        limits=httpx.Limits(
+            max_connections=int(entry.get("max_connections", 100)),
+            max_keepalive_connections=int(entry.get("max_keepalive_connections", 20)),
+        ),
+    )
+
+
+class _ServerConnection:
+    """One MCP server session: a child process (stdio) or an HTTP session.
+
+    The transport and session context managers are entered and exited by a single
+    owner task, as the SDK's anyio task groups require; other tasks on the same loop
+    only send requests through the session, which multiplexes them by request id.
+    """
+
+    def __init__(self, server_id: str, entry: Dict[str, Any], http_client: Any = None):
+        self.server_id = server_id
+        self.entry = entry
+        self.http_client = http_client
+        self.session: Any = None
+        self.outstanding = 0
+        self.last_used = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        self._ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=f"mcp-server-{self.server_id}")
+        await self._ready
+
+    def _open_transport(self) -> Any:
+        transport = transport_of(self.entry)
+        if transport == "stdio":
+            params = StdioServerParameters(  # type: ignore[misc]
+                command=self.entry["command"],
+                args=self.entry.get("args", []),
+                env=self.entry.get("env"),
+                cwd=self.entry.get("cwd"),
+            )
+            return stdio_client(params)  # type: ignore[misc]
+        url = self.entry["url"]
+        timeout = float(self.entry.get("timeout", 30))
+        sse_read_timeout = float(self.entry.get("sse_read_timeout", 300))
+        if transport == "sse":
+            return sse_client(  # type: ignore[misc]
+                url, headers=self.entry.get("headers"), timeout=timeout, sse_read_timeout=sse_read_timeout
+            )
+        if streamable_http_client is not None and self.http_client is not None:
+            return streamable_http_client(url, http_client=self.http_client)  # type: ignore[misc]
+        # Older SDKs open a client per session
+        return streamablehttp_client(  # type: ignore[misc]
+            url, headers=self.entry.get("headers"), timeout=timeout, sse_read_timeout=sse_read_timeout
+        )
+
+    async def _run(self) -> None:
+        try:
+            async with self._open_transport() as streams:
+                # stdio and SSE yield (read, write); streamable HTTP adds a session id getter
+                read, write = streams[0], streams[1]
+                async with ClientSession(read, write) as session:  # type: ignore[misc]
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set_result(None)
+                    await self._stop.wait()
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self.session = None
+
+    async def abort(self) -> None:
+        """Tear down a connection that never became ready (e.g. startup timeout)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except BaseException:
+            pass
+        self._task = None
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=10)
+        except BaseException:
+            self._task.cancel()
+        self._task = None
+
+
+def _is_undelivered(exc: BaseException) -> bool:
+    """The request could not be written to the server's transport."""
+    return type(exc).__name__ in ("ClosedResourceError", "BrokenResourceError")
+
+
+def _is_connection_error(exc: BaseException) -> bool:
+    return _is_undelivered(exc) or (
+        type(exc).__name__ == "McpError" and "connection closed" in str(exc).lower()
+    )
+
+
+class _ReplicaPool:
+    """Up to `replicas` connections to one server config, routed by least outstanding requests.
+
+    Replicas are added on demand while every live one is busy, dead ones are
+    replaced, and idle ones beyond `min_replicas` are shut down after `idle_timeout`.
+    Extra replicas start in the background; calls keep going to the live ones meanwhile.
+    """
+
+    def __init__(self, server_id: str, entry: Dict[str, Any], startup_timeout: float, http_client: Any = None):
+        self.server_id = server_id
+        self.entry = entry
+        self.http_client = http_client
+        self.max_replicas = max(1, int(entry.get("replicas", 1)))
+        self.min_replicas = min(self.max_replicas, max(0, int(entry.get("min_replicas", 1))))
+        self.idle_timeout = float(entry.get("idle_timeout", 300))
+        self.startup_timeout = float(entry.get("startup_timeout", startup_timeout))
+        self.replicas: List[_ServerConnection] = []
+        self.restarts = 0
+        self._spawning = 0
+        self._growing: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def live(self) -> List[_ServerConnection]:
+        return [r for r in self.replicas if r.healthy]
+
+    async def _spawn(self) -> _ServerConnection:
+        conn = _ServerConnection(self.server_id, self.entry, self.http_client)
+        try:
+            await asyncio.wait_for(conn.start(), self.startup_timeout)
+        except BaseException:
+            await conn.abort()
+            raise
+        self.replicas.append(conn)
+        return conn
+
+    def _grow(self) -> None:
+        """Start one more replica without making the caller wait for it."""
+        self._spawning += 1
+        task = asyncio.get_running_loop().create_task(self._spawn_extra())
+        self._growing.add(task)
+        task.add_done_callback(self._growing.discard)
+
+    async def _spawn_extra(self) -> None:
+        try:
+            await self._spawn()
+        except Exception as e:
+            print(f"⚠️ Starting another replica of MCP server '{self.server_id}' failed: {e}")
+        finally:
+            self._spawning -= 1
+
+    async def _drop_dead(self) -> None:
+        for conn in [r for r in self.replicas if not r.healthy]:
+            self.replicas.remove(conn)
+            self.restarts += 1
+            await conn.abort()
+
+    async def ensure_min(self) -> None:
+        await self._drop_dead()
+        missing = max(1, self.min_replicas) - len(self.live)
+        if missing > 0:
+            await asyncio.gather(*(self._spawn() for _ in range(missing)))
+
+    async def acquire(self) -> _ServerConnection:
+        live = self.live
+        best = min(live, key=lambda r: r.outstanding, default=None)
+        if best is None:
+            # Nothing to fall back on: the caller has to wait for a replica
+            async with self._lock:
+                await self._drop_dead()
+                best = min(self.live, key=lambda r: r.outstanding, default=None)
+                if best is None:
+                    best = await self._spawn()
+        elif best.outstanding > 0 and len(live) + self._spawning < self.max_replicas:
+            self._grow()
+        best.outstanding += 1
+        return best
+
+    def release(self, conn: _ServerConnection) -> None:
+        conn.outstanding -= 1
+        conn.last_used = time.monotonic()
+
+    async def check_health(self) -> None:
+        """Ping idle replicas, replace dead ones and scale idle ones down to min_replicas."""
+        for conn in list(self.replicas):
+            if conn.healthy and conn.outstanding == 0:
+                try:
+                    await asyncio.wait_for(conn.session.send_ping(), timeout=10)
+                except Exception:
+                    await conn.abort()
+        had_replicas = bool(self.replicas)
+        await self._drop_dead()
+        now = time.monotonic()
+        idle = [r for r in self.live if r.outstanding == 0 and now - r.last_used > self.idle_timeout]
+        for conn in idle[: max(0, len(self.live) - self.min_replicas)]:
+            self.replicas.remove(conn)
+            await conn.stop()
+        if had_replicas and len(self.live) < self.min_replicas:
+            async with self._lock:
+                await self.ensure_min()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": len(self.live),
+            "outstanding": [r.outstanding for r in self.live],
+            "restarts": self.restarts,
+        }
+
+    async def stop(self) -> None:
+        for task in list(self._growing):
+            task.cancel()
+        await asyncio.gather(*self._growing, return_exceptions=True)
+        replicas, self.replicas = self.replicas, []
+        await asyncio.gather(*(r.stop() for r in replicas), return_exceptions=True)
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+
+class _ResultCache:
+    """LRU cache of tool results with a per-entry TTL; only touched from the bridge loop."""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Any, Any]" = OrderedDict()
+
+    @classmethod
+    def from_entry(cls, entry: Dict[str, Any]) -> Optional["_ResultCache"]:
+        """Build the cache described by an entry's "cache" policy; caching is off without one."""
+        policy = entry.get("cache")
+        if policy is False or policy is None:
+            return None
+        if policy is True:
+            policy = {}
+        cache = cls(float(policy.get("ttl", 60.0)), int(policy.get("max_entries", 256)))
+        return cache if cache.ttl > 0 and cache.max_entries > 0 else None
+
+    def get(self, key: Any) -> Any:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _is_cacheable(annotations: Optional[Dict[str, Any]]) -> bool:
+    # Read-only alone is not enough: a clock or a search has no side effects but changes answers
+    return bool(annotations and annotations.get("readOnlyHint") and annotations.get("idempotentHint"))
+
+
+def default_manifest_path() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "agentproplus", "mcp_manifest.json")
+
+
+class ToolManifest:
+    """On-disk cache of each server's list_tools result, keyed by its launch config.
+
+    Lets a lazy manager advertise a server's tools without spawning it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_manifest_path()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def config_key(entry: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(entry, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, entry: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            record = self._load().get(self.config_key(entry))
+        return record.get("tools") if isinstance(record, dict) else None
+
+    def put(self, entry: Dict[str, Any], tools: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            data = self._load()
+            data[self.config_key(entry)] = {"server_id": entry.get("id"), "tools": tools, "updated": time.time()}
+            try:
+                directory = os.path.dirname(self.path)
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, default=str)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"⚠️ Could not write MCP tool manifest {self.path}: {e}")
+
+
 class MCPClientManager:
     """Manages connections to one or more MCP servers and exposes tool calls.
 
-    servers_config example (stdio):
+    All sessions run on one background event loop owned by the manager. The sync
+    facade (start, list_all_tools, call_tool, stop) submits coroutines to that loop
+    from any thread; the async API (alist_all_tools, acall_tool) can be awaited from
+    any other event loop, so concurrent tool calls share the same sessions.
+
+    Servers are started concurrently; one that fails to start is reported in
+    `failed` and skipped instead of aborting the others. With lazy=True, servers
+    whose tools are already in the on-disk manifest are only spawned on the first
+    call to one of their tools.
+
+    An entry may run several replicas of its server ("replicas", "min_replicas",
+    "idle_timeout"); calls go to the replica with the fewest outstanding requests.
+    A background health check restarts crashed replicas and scales idle ones down.
+
+    Entries with a "cache" policy ({"ttl": 60, "max_entries": 256}, or True for those
+    defaults) cache the results of tools annotated both readOnlyHint and
+    idempotentHint, per tool and arguments; hit and miss counts go to
+    agentproplus.metrics. Caching is off by default.
+
+    Servers are launched as child processes over stdio ("command"), or reached at
+    a "url" over streamable HTTP (default) or "transport": "sse". HTTP sessions to
+    one entry share a keep-alive connection pool, so many agent workers can use
+    centrally deployed tool servers instead of spawning their own.
+
+    servers_config example:
     [
         {"id": "local-search", "command": "python", "args": ["-m", "my_search_mcp"]},
-        {"id": "math", "command": "python", "args": ["mcp_server.py"]},
+        {"id": "math", "command": "python", "args": ["mcp_server.py"], "startup_timeout": 10},
+        {"id": "ocr", "command": "python", "args": ["-m", "ocr_mcp"], "replicas": 4, "min_replicas": 1},
+        {"id": "weather", "command": "weather-mcp", "cache": {"ttl": 300, "max_entries": 1000}},
+        {"id": "search", "url": "http://tools.internal:8000/mcp", "headers": {"Authorization": "Bearer ..."}},
+        {"id": "legacy", "url": "http://localhost:8001/sse", "transport": "sse"},
     ]
     """
 
-    def __init__(self, servers_config: List[Dict[str, Any]]):
+    def __init__(self, servers_config: List[Dict[str, Any]], call_timeout: Optional[float] = None,
+                 lazy: bool = False, manifest_path: Optional[str] = None, startup_timeout: float = 30.0,
+                 health_interval: float = 15.0):
         self._config = servers_config or []
-        self._servers: Dict[str, Any] = {}
-        self._sessions: Dict[str, ClientSession] = {}
-        self._loop = None
+        self._entries: Dict[str, Dict[str, Any]] = {
+            e["id"]: e for e in self._config if e.get("id") and (e.get("command") or e.get("url"))
+        }
+        self._pools: Dict[str, _ReplicaPool] = {}
+        self._loop_thread: Optional[_LoopThread] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self.call_timeout = call_timeout
+        self.lazy = lazy
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+        self.manifest = ToolManifest(manifest_path)
+        self.failed: Dict[str, str] = {}
+        self._caches: Dict[str, _ResultCache] = {}
+        self._cacheable: Dict[str, set] = {}
+        for sid, entry in self._entries.items():
+            cache = _ResultCache.from_entry(entry)
+            if cache is not None:
+                self._caches[sid] = cache
+
+    @property
+    def _sessions(self) -> Dict[str, Any]:
+        """One live session per server (used for discovery)."""
+        sessions: Dict[str, Any] = {}
+        for sid, pool in self._pools.items():
+            live = pool.live
+            if live:
+                sessions[sid] = live[0].session
+        return sessions
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Replica counts, outstanding requests and restarts per server."""
+        return {sid: pool.stats() for sid, pool in self._pools.items()}
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Result cache size and hit rate per server with caching enabled."""
+        stats: Dict[str, Dict[str, Any]] = {}
+        for sid, cache in self._caches.items():
+            prefix = f"mcp.cache.{sid}"
+            stats[sid] = {
+                "entries": len(cache),
+                "hits": metrics.counter(f"{prefix}.hits"),
+                "misses": metrics.counter(f"{prefix}.misses"),
+                "hit_rate": metrics.ratio(f"{prefix}.hits", f"{prefix}.misses"),
+                "cached_tools": sorted(self._cacheable.get(sid, ())),
+            }
+        return stats
 
     # ---------- public sync facade ----------
     def start(self) -> None:
         self._ensure_sdk()
-        asyncio.run(self._astart())
+        if self._loop_thread is None:
+            self._loop_thread = _LoopThread()
+        self._loop_thread.submit(self._astart())
 
     def stop(self) -> None:
-        if not self._sessions:
+        if self._loop_thread is None:
             return
-        asyncio.run(self._astop())
+        try:
+            self._loop_thread.submit(self._astop(), timeout=30)
+        finally:
+            self._loop_thread.stop()
+            self._loop_thread = None
+
+    def reset_after_fork(self) -> None:
+        """Give a forked child its own loop thread and MCP connections.
+
+        The parent's loop thread does not exist in the child and its sessions and
+        server processes belong to the parent, so they are forgotten, not stopped.
+        Servers are reconnected here, or on first call when lazy with a cached manifest.
+        """
+        started = self._loop_thread is not None
+        self._loop_thread = None
+        self._pools = {}
+        self._health_task = None
+        if started:
+            self.start()
 
     def list_all_tools(self) -> Dict[str, List[Dict[str, Any]]]:
         """Return all tools per server id: {server_id: [{name, description, schema}, ...]}"""
-        return asyncio.run(self._alist_all_tools())
+        return self._submit(self._alist_all_tools())
 
     def call_tool(self, server_id: str, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
-        return asyncio.run(self._acall_tool(server_id, tool_name, arguments or {}))
+        return self._submit(self._acall_tool(server_id, tool_name, arguments or {}), timeout=self.call_timeout)
+
+    # ---------- public async API ----------
+    async def alist_all_tools(self) -> Dict[str, List[Dict[str, Any]]]:
+        return await self._run_async(self._alist_all_tools())
 
-    # ---------- async core ----------
+    async def acall_tool(self, server_id: str, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        coro = self._acall_tool(server_id, tool_name, arguments or {})
+        if self.call_timeout is not None:
+            coro = asyncio.wait_for(coro, self.call_timeout)
+        return await self._run_async(coro)
+
+    def _submit(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        if self._loop_thread is None:
+            coro.close()
+            raise RuntimeError("MCPClientManager is not started")
+        return self._loop_thread.submit(coro, timeout=timeout)
+
+    async def _run_async(self, coro: Coroutine[Any, Any, T]) -> T:
+        if self._loop_thread is None:
+            coro.close()
+            raise RuntimeError("MCPClientManager is not started")
+        if self._loop_thread.in_loop_thread():
+            return await coro
+        return await self._loop_thread.wrap(coro)
+
+    # ---------- async core (runs on the manager loop) ----------
     async def _astart(self) -> None:
-        self._ensure_sdk()
-        for entry in self._config:
-            sid = entry.get("id")
-            command = entry.get("command")
-            args = entry.get("args", [])
-            if not sid or not command:
+        if self._health_task is None and self.health_interval:
+            self._health_task = asyncio.create_task(self._health_loop(), name="mcp-health")
+        pending = []
+        for sid, entry in self._entries.items():
+            if sid in self._pools and self._pools[sid].live:
                 continue
-            server = StdioServer(command=command, args=args)  # type: ignore[arg-type]
-            stream = await server.__aenter__()
-            session = ClientSession(stream)
-            await session.__aenter__()
-            await session.initialize()
-            self._servers[sid] = server
-            self._sessions[sid] = session
+            if self.lazy and self.manifest.get(entry) is not None:
+                continue
+            pending.append(sid)
+        results = await asyncio.gather(*(self._aconnect(sid) for sid in pending), return_exceptions=True)
+        for sid, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                self.failed[sid] = str(result) or result.__class__.__name__
+                print(f"⚠️ MCP server '{sid}' failed to start: {self.failed[sid]}")
+
+    def _pool(self, server_id: str) -> _ReplicaPool:
+        pool = self._pools.get(server_id)
+        if pool is None:
+            entry = self._entries.get(server_id)
+            if entry is None:
+                raise RuntimeError(f"Unknown MCP server: {server_id}")
+            http_client = _http_client(entry) if transport_of(entry) == "streamable_http" else None
+            pool = _ReplicaPool(server_id, entry, self.startup_timeout, http_client)
+            self._pools[server_id] = pool
+        return pool
+
+    async def _aconnect(self, server_id: str) -> _ReplicaPool:
+        """Bring the server's pool up to its minimum size; concurrent callers share the start."""
+        pool = self._pool(server_id)
+        async with pool._lock:
+            await pool.ensure_min()
+        self.failed.pop(server_id, None)
+        return pool
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for sid, pool in list(self._pools.items()):
+                try:
+                    await pool.check_health()
+                except Exception as e:
+                    print(f"⚠️ MCP server '{sid}' health check failed: {e}")
+
+    async def _alist_tools(self, server_id: str, session: Any) -> List[Dict[str, Any]]:
+        tools = await session.list_tools()
+        items: List[Dict[str, Any]] = []
+        for t in tools.tools:  # type: ignore[attr-defined]
+            annotations = getattr(t, "annotations", None)
+            if annotations is not None and hasattr(annotations, "model_dump"):
+                annotations = annotations.model_dump(exclude_none=True)
+            items.append({
+                "name": t.name,
+                "description": getattr(t, "description", ""),
+                "input_schema": getattr(t, "inputSchema", None) or getattr(t, "input_schema", None),
+                "annotations": annotations or None,
+            })
+        self._remember_annotations(server_id, items)
+        self.manifest.put(self._entries[server_id], items)
+        return items
+
+    def _remember_annotations(self, server_id: str, items: List[Dict[str, Any]]) -> None:
+        self._cacheable[server_id] = {t["name"] for t in items if _is_cacheable(t.get("annotations"))}
 
     async def _alist_all_tools(self) -> Dict[str, List[Dict[str, Any]]]:
         tools_map: Dict[str, List[Dict[str, Any]]] = {}
-        for sid, session in self._sessions.items():
-            tools = await session.list_tools()
-            items: List[Dict[str, Any]] = []
-            for t in tools.tools:  # type: ignore[attr-defined]
-                items.append({
-                    "name": t.name,
-                    "description": getattr(t, "description", ""),
-                    "input_schema": getattr(t, "inputSchema", None) or getattr(t, "input_schema", None),
-                })
+        live = self._sessions
+        listed = await asyncio.gather(
+            *(self._alist_tools(sid, session) for sid, session in live.items()), return_exceptions=True
+        )
+        for sid, items in zip(live, listed):
+            if isinstance(items, BaseException):
+                print(f"⚠️ Failed to list tools of MCP server '{sid}': {items}")
+                continue
             tools_map[sid] = items
+        if self.lazy:
+            # Servers not spawned yet are advertised from the manifest
+            for sid, entry in self._entries.items():
+                if sid not in tools_map and sid not in live:
+                    cached = self.manifest.get(entry)
+                    if cached is not None:
+                        self._remember_annotations(sid, cached)
+                        tools_map[sid] = cached
         return tools_map
 
     async def _acall_tool(self, server_id: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        session = self._sessions.get(server_id)
-        if not session:
+        if server_id not in self._entries:
             raise RuntimeError(f"MCP server not connected: {server_id}")
-        result = await session.call_tool(tool_name, arguments=arguments)
+        cache = self._caches.get(server_id)
+        cache_key = None
+        if cache is not None and tool_name in self._cacheable.get(server_id, ()):
+            cache_key = (tool_name, json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str))
+            cached = cache.get(cache_key)
+            prefix = f"mcp.cache.{server_id}"
+            if cached is not None:
+                metrics.incr(f"{prefix}.hits")
+                return cached
+            metrics.incr(f"{prefix}.misses")
+        result = await self._acall_uncached(server_id, tool_name, arguments)
+        output = self._result_text(result)
+        if cache_key is not None and not getattr(result, "isError", False):
+            cache.put(cache_key, output)
+        return output
+
+    async def _acall_uncached(self, server_id: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        # Lazy servers (and ones that failed earlier) are spawned on first use
+        pool = self._pool(server_id)
+        for attempt in range(2):
+            conn = await pool.acquire()
+            try:
+                result = await conn.session.call_tool(tool_name, arguments=arguments)
+                break
+            except Exception as e:
+                if not _is_connection_error(e):
+                    raise
+                # The replica's process is gone: drop it so it gets replaced. Only calls
+                # that never reached the server are retried, so tools don't run twice.
+                await conn.abort()
+                if attempt or not _is_undelivered(e):
+                    raise
+            finally:
+                pool.release(conn)
+        return result
+
+    @staticmethod
+    def _result_text(result: Any) -> Any:
         # result may include multiple outputs; coalesce to text where possible
         # FastMCP returns a list of content parts; grab text bodies
         try:
@@ -100,22 +704,40 @@ class MCPClientManager:
         return result
 
     async def _astop(self) -> None:
-        for sid, session in list(self._sessions.items()):
-            try:
-                await session.__aexit__(None, None, None)
-            except Exception:
-                pass
-            self._sessions.pop(sid, None)
-        for sid, server in list(self._servers.items()):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for sid, pool in list(self._pools.items()):
             try:
-                await server.__aexit__(None, None, None)
+                await pool.stop()
             except Exception:
                 pass
-            self._servers.pop(sid, None)
+            self._pools.pop(sid, None)
 
     def _ensure_sdk(self) -> None:
-        if StdioServer is None or ClientSession is None:
+        global ClientSession, StdioServerParameters, stdio_client
+        global sse_client, streamable_http_client, streamablehttp_client
+        if ClientSession is None or stdio_client is None:
+            try:
+                from mcp import ClientSession, StdioServerParameters
+                from mcp.client.stdio import stdio_client
+            except Exception:  # pragma: no cover
+                ClientSession = None  # type: ignore
+                StdioServerParameters = None  # type: ignore
+                stdio_client = None  # type: ignore
+        if ClientSession is None or stdio_client is None:
             raise MCPNotAvailableError(
                 "The 'mcp' package is required for MCP integration. Install with: pip install mcp"
             )
-
+        transports = {transport_of(e) for e in self._entries.values()}
+        if "sse" in transports and sse_client is None:
+            from mcp.client.sse import sse_client
+        if "streamable_http" in transports and streamablehttp_client is None:
+            try:
+                from mcp.client import streamable_http
+            except Exception:  # pragma: no cover
+                raise MCPNotAvailableError(
+                    "This version of the 'mcp' package has no streamable HTTP client. Upgrade with: pip install -U mcp"
+                )
+            streamable_http_client = getattr(streamable_http, "streamable_http_client", None)
+            streamablehttp_client = streamable_http.streamablehttp_client
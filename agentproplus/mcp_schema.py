@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+import json
+
+# Compact rendering and local validation of MCP tool input schemas (a JSON Schema
+# subset: type, properties, required, enum, items, anyOf/oneOf, $ref into $defs).
+
+_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None,
+}
+
+
+def _resolve(schema: Dict[str, Any], root: Dict[str, Any]) -> Dict[str, Any]:
+    ref = schema.get("$ref")
+    if not isinstance(ref, str) or not ref.startswith("#/"):
+        return schema
+    node: Any = root
+    for part in ref[2:].split("/"):
+        node = node.get(part, {}) if isinstance(node, dict) else {}
+    return node if isinstance(node, dict) else {}
+
+
+def render_type(schema: Any, root: Optional[Dict[str, Any]] = None) -> str:
+    """Short type expression for a property schema, e.g. 'number', 'array[string]', '"a"|"b"'."""
+    if not isinstance(schema, dict):
+        return "any"
+    root = root if root is not None else schema
+    ref = schema.get("$ref")
+    if isinstance(ref, str):
+        return ref.rsplit("/", 1)[-1]
+    if "enum" in schema:
+        return "|".join(json.dumps(v) for v in schema["enum"])
+    if "const" in schema:
+        return json.dumps(schema["const"])
+    variants = schema.get("anyOf") or schema.get("oneOf")
+    if variants:
+        return "|".join(render_type(v, root) for v in variants)
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        return "|".join(kind)
+    if kind == "array":
+        return f"array[{render_type(schema.get('items'), root)}]"
+    if kind == "object" and isinstance(schema.get("properties"), dict):
+        fields = ", ".join(f"{k}: {render_type(v, root)}" for k, v in schema["properties"].items())
+        return "{" + fields + "}"
+    return kind or "any"
+
+
+def render_signature(name: str, schema: Optional[Dict[str, Any]]) -> str:
+    """Render an input schema as a call signature, e.g. 'add(a: number, b: number, c?: string = "x")'."""
+    if not isinstance(schema, dict) or not isinstance(schema.get("properties"), dict):
+        return f"{name}()"
+    required = set(schema.get("required") or [])
+    params: List[str] = []
+    for prop, prop_schema in schema["properties"].items():
+        optional = prop not in required
+        param = f"{prop}{'?' if optional else ''}: {render_type(prop_schema, schema)}"
+        if optional and isinstance(prop_schema, dict) and "default" in prop_schema:
+            param += f" = {json.dumps(prop_schema['default'])}"
+        params.append(param)
+    return f"{name}({', '.join(params)})"
+
+
+def render_input_format(name: str, schema: Optional[Dict[str, Any]]) -> str:
+    """input_format text for an MCP tool: its signature plus how to pass the arguments."""
+    return f"{render_signature(name, schema)} — pass the arguments as a JSON object keyed by parameter name."
+
+
+def validate_arguments(arguments: Any, schema: Optional[Dict[str, Any]]) -> List[str]:
+    """Check arguments against an input schema; returns a list of problems (empty when valid)."""
+    if not isinstance(schema, dict) or not schema:
+        return []
+    return _validate(arguments, schema, schema, "arguments")
+
+
+def _validate(value: Any, schema: Dict[str, Any], root: Dict[str, Any], path: str) -> List[str]:
+    schema = _resolve(schema, root)
+    variants = schema.get("anyOf") or schema.get("oneOf")
+    if variants:
+        if any(not _validate(value, v, root, path) for v in variants if isinstance(v, dict)):
+            return []
+        return [f"{path}: expected {render_type(schema, root)}"]
+    if "enum" in schema and value not in schema["enum"]:
+        return [f"{path}: must be one of {render_type(schema, root)}"]
+
+    kind = schema.get("type")
+    kinds = kind if isinstance(kind, list) else [kind] if kind else []
+    if kinds and not any(_TYPE_CHECKS.get(k, lambda v: True)(value) for k in kinds):
+        return [f"{path}: expected {'|'.join(kinds)}, got {type(value).__name__}"]
+
+    errors: List[str] = []
+    if isinstance(value, dict):
+        properties = schema.get("properties") or {}
+        for prop in schema.get("required") or []:
+            if prop not in value:
+                errors.append(f"{path}: missing required '{prop}'")
+        if schema.get("additionalProperties") is False:
+            for prop in value:
+                if prop not in properties:
+                    errors.append(f"{path}: unexpected '{prop}'")
+        for prop, prop_value in value.items():
+            if isinstance(properties.get(prop), dict):
+                errors.extend(_validate(prop_value, properties[prop], root, f"{path}.{prop}"))
+    elif isinstance(value, list) and isinstance(schema.get("items"), dict):
+        for i, item in enumerate(value):
+            errors.extend(_validate(item, schema["items"], root, f"{path}[{i}]"))
+    return errors
+
+
+def coerce_arguments(input_value: Any, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn an agent's action input into an arguments dict.
+
+    Dicts pass through, JSON object strings are parsed, and a bare value is bound
+    to the tool's only parameter when it has exactly one.
+    """
+    if isinstance(input_value, dict):
+        return input_value
+    if isinstance(input_value, str):
+        try:
+            parsed = json.loads(input_value)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, dict):
+            return parsed
+    properties = (schema or {}).get("properties") if isinstance(schema, dict) else None
+    if isinstance(properties, dict) and len(properties) == 1:
+        return {next(iter(properties)): input_value}
+    return {"input": input_value}
@@ -0,0 +1,236 @@
+"""
+Serve ReactAgents, and optionally their tools, as MCP tools from one warm process.
+
+Agents are built once at startup. Each request runs on a clone that shares the
+model client, tools and MCP sessions but has its own conversation history, so
+callers skip agent construction and import costs. Progress notifications are
+sent from the agent's arun_stream events, and a cancelled request stops its run.
+
+Run:
+    agentproplus-mcp --agent research=my_app.agents:build_research_agent
+    agentproplus-mcp --agent my_app.agents:agent --expose-tools --transport streamable-http --port 8000
+
+`--agent` takes "[name=]module:attr", where attr is a ReactAgent or a callable returning one.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any, Callable, Dict, Optional, Union
+import argparse
+import asyncio
+import re
+import sys
+
+from .agent import Action
+from .mcp_bridge import MCPNotAvailableError
+from .react_agent import ReactAgent
+
+
+def _mcp_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", text).strip("_") or "tool"
+
+
+def _progress_message(event: Dict[str, Any]) -> Optional[str]:
+    """Short human-readable line for a run_stream event, or None to skip it."""
+    etype = event.get("type")
+    if etype == "thought_step":
+        step = event.get("step") or {}
+        action = step.get("action")
+        if action:
+            return f"Action: {action.get('action_type')}"
+        if step.get("thought"):
+            return f"Thought: {step['thought'][:200]}"
+    elif etype == "error":
+        return "Retrying after a malformed model response"
+    elif etype == "final_answer":
+        return "Final answer ready"
+    return None
+
+
+class AgentMCPServer:
+    """Exposes named ReactAgents (and optionally their tools) on a FastMCP server.
+
+    At most `max_concurrency` agent runs and tool calls execute at once; the rest
+    wait for a slot. Agents run through arun_stream and tools through aexecute_tool,
+    so a request the client cancels stops its model call and tool call.
+    """
+
+    def __init__(
+        self,
+        agents: Dict[str, ReactAgent],
+        expose_tools: bool = False,
+        max_concurrency: int = 8,
+        name: str = "agentproplus-agents",
+        descriptions: Optional[Dict[str, str]] = None,
+    ):
+        if not agents:
+            raise ValueError("AgentMCPServer needs at least one agent")
+        self.agents = agents
+        self.expose_tools = expose_tools
+        self.max_concurrency = max_concurrency
+        self.name = name
+        self.descriptions = descriptions or {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._server: Any = None
+
+    def prewarm(self) -> None:
+        """Open connections to each agent's model provider before the first request."""
+        for agent in self.agents.values():
+            prewarm = getattr(agent.client, "prewarm", None)
+            if callable(prewarm):
+                try:
+                    prewarm()
+                except Exception as e:
+                    print(f"⚠️ Prewarming model client failed: {e}", file=sys.stderr)
+
+    def build(self) -> Any:
+        """Create the FastMCP server with one tool per agent (plus agent tools when enabled)."""
+        if self._server is not None:
+            return self._server
+        try:
+            from mcp.server.fastmcp import Context, FastMCP
+        except Exception:
+            raise MCPNotAvailableError(
+                "The 'mcp' package is required to serve agents over MCP. Install with: pip install mcp"
+            )
+
+        server = FastMCP(self.name)
+        for agent_name, agent in self.agents.items():
+            server.add_tool(
+                self._agent_fn(agent_name, Context),
+                name=_mcp_name(agent_name),
+                description=self.descriptions.get(agent_name)
+                or f"Ask the '{agent_name}' agent. It reasons step by step with its tools and returns a final answer.",
+            )
+
+        if self.expose_tools:
+            seen = {_mcp_name(n) for n in self.agents}
+            for agent in self.agents.values():
+                for tool in agent.tools:
+                    tool_name = _mcp_name(tool.action_type)
+                    if tool_name in seen:
+                        continue
+                    seen.add(tool_name)
+                    server.add_tool(
+                        self._tool_fn(agent, tool.action_type),
+                        name=tool_name,
+                        description=f"{tool.description}\nInput format: {tool.input_format}",
+                    )
+        self._server = server
+        return server
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    def _agent_fn(self, agent_name: str, context_type: Any) -> Callable[..., Any]:
+        async def run_agent(query: str, ctx=None) -> str:
+            return await self.arun_agent(agent_name, query, ctx)
+
+        # FastMCP injects the request Context into the parameter annotated with it
+        run_agent.__annotations__["ctx"] = context_type
+        return run_agent
+
+    def _tool_fn(self, agent: ReactAgent, action_type: str) -> Callable[..., Any]:
+        async def run_tool(input: Union[str, Dict[str, Any]]) -> str:
+            async with self._semaphore():
+                return str(await agent.aexecute_tool(Action(action_type=action_type, input=input)))
+
+        return run_tool
+
+    async def arun_agent(self, agent_name: str, query: str, ctx: Any = None) -> str:
+        """Run a fresh clone of the named agent, forwarding progress to the MCP caller."""
+        agent = self.agents[agent_name].clone()
+        async with self._semaphore():
+            # Coalesced tokens and a summary completion keep progress notifications few
+            stream = agent.arun_stream(query, coalesce_ms=50, complete_payload="summary")
+            final_answer = None
+            try:
+                async for event in stream:
+                    if event.get("type") == "complete":
+                        final_answer = (event.get("response") or {}).get("final_answer")
+                    message = _progress_message(event)
+                    if message and ctx is not None:
+                        await ctx.report_progress(event.get("iteration", 0), agent.max_iterations, message)
+            finally:
+                # Also when the request is cancelled: closes the model stream and the tool call
+                await stream.aclose()
+            return final_answer or ""
+
+    def run(self, transport: str = "stdio", host: str = "127.0.0.1", port: int = 8000) -> None:
+        server = self.build()
+        self.prewarm()
+        if transport != "stdio":
+            server.settings.host = host
+            server.settings.port = port
+            server.run(transport=transport)
+            return
+
+        # Over stdio, stdout carries the protocol, so the agents' debug prints go to stderr
+        sys.stdout = _ProtocolStdout(sys.stdout)
+        server.run(transport="stdio")
+
+
+class _ProtocolStdout:
+    """sys.stdout for the stdio transport: the MCP SDK writes protocol messages to
+    `.buffer` (the real stdout), while print() text goes to stderr."""
+
+    def __init__(self, stdout: Any):
+        self.buffer = stdout.buffer
+
+    def write(self, text: str) -> int:
+        return sys.stderr.write(text)
+
+    def flush(self) -> None:
+        sys.stderr.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(sys.stderr, name)
+
+
+def load_agent(target: str) -> ReactAgent:
+    """Resolve "module:attr" to a ReactAgent (attr may be an agent or a factory)."""
+    module_name, _, attr = target.partition(":")
+    if not attr:
+        raise ValueError(f"Expected 'module:attr', got '{target}'")
+    obj = getattr(import_module(module_name), attr)
+    agent = obj() if callable(obj) and not isinstance(obj, ReactAgent) else obj
+    if not isinstance(agent, ReactAgent):
+        raise TypeError(f"'{target}' did not produce a ReactAgent")
+    return agent
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve ReactAgents over MCP")
+    parser.add_argument("--agent", action="append", required=True, metavar="[NAME=]MODULE:ATTR",
+                        help="Agent to serve; may be repeated")
+    parser.add_argument("--expose-tools", action="store_true", help="Also expose each agent's tools")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--name", default="agentproplus-agents")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http", "sse"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    # Keep stdout clean for the stdio protocol while agents are built
+    real_stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        agents: Dict[str, ReactAgent] = {}
+        for spec in args.agent:
+            name, _, target = spec.rpartition("=")
+            agents[name or target.rpartition(":")[2]] = load_agent(target)
+    finally:
+        sys.stdout = real_stdout
+
+    AgentMCPServer(
+        agents,
+        expose_tools=args.expose_tools,
+        max_concurrency=args.max_concurrency,
+        name=args.name,
+    ).run(transport=args.transport, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+import threading
+
+
+class _Summary:
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0, "sum": 0.0, "avg": 0.0, "min": 0.0, "max": 0.0}
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """Thread-safe in-process counters and value summaries.
+
+    Names are dotted strings, e.g. "mcp.cache.math.hits". Export them with
+    snapshot() to whatever monitoring system the application uses.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._summaries: Dict[str, _Summary] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                summary = self._summaries[name] = _Summary()
+            summary.add(value)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def ratio(self, hits: str, misses: str) -> float:
+        """hits / (hits + misses), or 0.0 before anything was recorded."""
+        with self._lock:
+            h = self._counters.get(hits, 0)
+            m = self._counters.get(misses, 0)
+        return h / (h + m) if h + m else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "summaries": {name: s.as_dict() for name, s in self._summaries.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+# Process-wide registry used by the library's components
+metrics = Metrics()
@@ -1,16 +1,137 @@
 # model.py
-from typing import Dict, Any, Optional, List, Union, Iterator
-import openai
-import litellm
+from typing import Dict, Any, Optional, List, Union, Iterator, AsyncIterator, Awaitable, Callable, Sequence, TypeVar
+import asyncio
+import inspect
+import json
 import os
+import threading
+from collections import OrderedDict
+
+from .rate_limit import RetryPolicy, get_rate_limiter
+from .context_window import ContextWindowManager
+from .tokenization import context_window_for, get_tokenizer
+from .client_registry import credential_fingerprint, default_registry
+from .metrics import metrics
+
+T = TypeVar("T")
+
+
+def _close_stream(stream: Any) -> None:
+    """Close a provider stream so an abandoned response stops generating and frees its connection."""
+    for target in (stream, getattr(stream, "completion_stream", None)):
+        close = getattr(target, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+            return
+
+
+async def _aclose_stream(stream: Any) -> None:
+    close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+    if not callable(close):
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception:
+        pass
+
 
 class ModelClient:
     """Base class for different model clients"""
-    def __init__(self, model_name: str = None, temperature: float = 0.7, max_tokens: Optional[int] = None):
+    provider: str = ""
+    # Whether streams ask for a final usage chunk (stream_options include_usage)
+    stream_usage: bool = False
+
+    def __init__(self, model_name: str = None, temperature: float = 0.7, max_tokens: Optional[int] = None,
+                 requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 max_retries: int = 3, rate_limit_scope: str = "", context_window: Optional[int] = None):
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens or 2048  # Default max_tokens if not provided
-        
+        # Limiter is shared process-wide by every client of the same provider/model/credentials
+        self.rate_limiter = get_rate_limiter(self.provider, model_name, requests_per_minute, tokens_per_minute,
+                                             scope=rate_limit_scope)
+        self.retry_policy = RetryPolicy(max_retries=max_retries)
+        # Prompts are counted locally so oversized requests fail before they are paid for
+        self.context_window = context_window or context_window_for(model_name)
+        self.tokenizer = get_tokenizer(model_name)
+        self.context = ContextWindowManager(model_name, self.context_window, self.tokenizer)
+        # Token usage of the most recent call; totals accumulate in agentproplus.metrics
+        self.last_usage: Dict[str, int] = {}
+
+    def _record_usage(self, usage: Any) -> None:
+        """Store a response's token usage, including prompt tokens served from the provider's cache."""
+        if usage is None:
+            return
+
+        def field(obj: Any, name: str) -> Any:
+            return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+        details = field(usage, "prompt_tokens_details")
+        recorded = {
+            "prompt_tokens": field(usage, "prompt_tokens") or 0,
+            "completion_tokens": field(usage, "completion_tokens") or 0,
+            # OpenAI and LiteLLM report cache reads here; Anthropic via LiteLLM also sets cache_read_input_tokens
+            "cached_tokens": (field(details, "cached_tokens") if details is not None else None)
+            or field(usage, "cache_read_input_tokens") or 0,
+            "cache_creation_tokens": field(usage, "cache_creation_input_tokens") or 0,
+        }
+        self.last_usage = recorded
+        for name, value in recorded.items():
+            if value:
+                metrics.incr(f"llm.{name}", value)
+
+    def _call_with_limits(self, fn: Callable[[], T], system_prompt: str, user_prompt: str, max_tokens: int) -> T:
+        """Run a provider call through the shared rate limiter with retries on transient errors.
+
+        Raises ContextOverflowError, without calling the provider, if the prompt plus
+        max_tokens cannot fit the model's context window.
+        """
+        tokens = self.context.check(system_prompt, user_prompt, max_tokens or 0) + (max_tokens or 0)
+        return self.retry_policy.call(fn, limiter=self.rate_limiter, tokens=tokens)
+
+    def _open_stream(self, create: Callable[..., T]) -> T:
+        """Call create(), asking for a usage chunk when stream_usage is set.
+
+        Some OpenAI-compatible servers reject stream_options with a 400. The request is
+        then retried once without it, and if that succeeds the option is not sent again.
+        """
+        if not self.stream_usage:
+            return create()
+        try:
+            return create(stream_options={"include_usage": True})
+        except Exception as e:
+            if getattr(e, "status_code", None) != 400:
+                raise
+            stream = create()
+            self._disable_stream_usage(e)
+            return stream
+
+    async def _aopen_stream(self, create: Callable[..., Awaitable[T]]) -> T:
+        if not self.stream_usage:
+            return await create()
+        try:
+            return await create(stream_options={"include_usage": True})
+        except Exception as e:
+            if getattr(e, "status_code", None) != 400:
+                raise
+            stream = await create()
+            self._disable_stream_usage(e)
+            return stream
+
+    def _disable_stream_usage(self, error: Exception) -> None:
+        self.stream_usage = False
+        print(f"⚠️ Endpoint for {self.model_name} rejected stream_options ({error}); streaming without usage")
+
+    async def _acall_with_limits(self, fn: Callable[[], Awaitable[T]], system_prompt: str, user_prompt: str,
+                                 max_tokens: int) -> T:
+        tokens = self.context.check(system_prompt, user_prompt, max_tokens or 0) + (max_tokens or 0)
+        return await self.retry_policy.acall(fn, limiter=self.rate_limiter, tokens=tokens)
+
     def chat_completion(self, system_prompt: str, user_prompt: str, 
                        temperature: Optional[float] = None, 
                        max_tokens: Optional[int] = None) -> str:
@@ -29,12 +150,95 @@ class ModelClient:
         """Optional streaming interface. Subclasses may override if supported."""
         raise NotImplementedError("Streaming not implemented for this client")
 
+    async def achat_completion_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Async streaming interface; stopping iteration or cancelling aborts the request.
+
+        This default runs chat_completion_stream on a worker thread, which closes the
+        provider stream at the next chunk after the consumer goes away. Clients with
+        an async SDK override it so the HTTP stream is closed immediately.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+        # Overrides may not take the optional parameters, so they are only passed when set
+        options = {name: value for name, value in (("temperature", temperature), ("max_tokens", max_tokens))
+                   if value is not None}
+
+        def put(item: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                stop.set()  # the event loop is gone
+
+        def produce() -> None:
+            stream = None
+            try:
+                stream = self.chat_completion_stream(system_prompt=system_prompt, user_prompt=user_prompt, **options)
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    put(chunk)
+            except BaseException as e:
+                put(e)
+            finally:
+                # For generator streams this runs their finally, which closes the provider stream
+                if stream is not None:
+                    _close_stream(stream)
+                put(done)
+
+        threading.Thread(target=produce, name="llm-stream", daemon=True).start()
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def prewarm(self) -> bool:
+        """Open provider connections ahead of the first request. Returns False if unsupported."""
+        return False
+
+    def reset_after_fork(self) -> None:
+        """Drop HTTP clients inherited from a parent process; called in forked workers."""
+
 class OpenAIClient(ModelClient):
     """Client for OpenAI models"""
+    provider = "openai"
+
     def __init__(self, api_key: str = None, model_name: str = "gpt-4o", 
-                 temperature: float = 0.7, max_tokens: Optional[int] = None):
-        super().__init__(model_name=model_name, temperature=temperature, max_tokens=max_tokens)
-        self.client = openai.OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+                 temperature: float = 0.7, max_tokens: Optional[int] = None,
+                 requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 max_retries: int = 3, base_url: Optional[str] = None, context_window: Optional[int] = None,
+                 stream_usage: Optional[bool] = None):
+        super().__init__(model_name=model_name, temperature=temperature, max_tokens=max_tokens,
+                         requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute,
+                         max_retries=max_retries, rate_limit_scope=credential_fingerprint(api_key),
+                         context_window=context_window)
+        # Shared per (base_url, api_key) so agents reuse warm connection pools
+        self.client = default_registry.get_openai_client(api_key=api_key, base_url=base_url)
+        self.api_key = api_key
+        self.base_url = base_url
+        # Usage chunks by default only from api.openai.com; other compatible servers may reject them
+        endpoint = base_url or os.environ.get("OPENAI_BASE_URL") or ""
+        self.stream_usage = stream_usage if stream_usage is not None else (not endpoint or "api.openai.com" in endpoint)
+
+    def prewarm(self) -> bool:
+        return default_registry.prewarm(self.client)
+
+    def reset_after_fork(self) -> None:
+        # Expects default_registry.reset_after_fork() to have run, so this is a fresh pool
+        self.client = default_registry.get_openai_client(api_key=self.api_key, base_url=self.base_url)
     
     def chat_completion(self, system_prompt: str, user_prompt: str, 
                        temperature: Optional[float] = None, 
@@ -43,15 +247,19 @@ class OpenAIClient(ModelClient):
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens if max_tokens is not None else self.max_tokens
         
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temp,
-            max_tokens=tokens
+        response = self._call_with_limits(
+            lambda: self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temp,
+                max_tokens=tokens
+            ),
+            system_prompt, user_prompt, tokens,
         )
+        self._record_usage(getattr(response, "usage", None))
         return response.choices[0].message.content
 
     def chat_completion_stream(
@@ -64,67 +272,170 @@ class OpenAIClient(ModelClient):
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens if max_tokens is not None else self.max_tokens
 
-        stream = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temp,
-            max_tokens=tokens,
-            stream=True,
+        # Only opening the stream is retried; tokens already yielded cannot be replayed
+        stream = self._call_with_limits(
+            lambda: self._open_stream(lambda **options: self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temp,
+                max_tokens=tokens,
+                stream=True,
+                **options,
+            )),
+            system_prompt, user_prompt, tokens,
         )
 
-        for chunk in stream:
-            if not chunk.choices:
-                continue
-            delta = chunk.choices[0].delta
-            token = getattr(delta, "content", None)
-            if token:
-                yield {"token": token}
-        
+        try:
+            for chunk in stream:
+                token = self._chunk_token(chunk)
+                if token:
+                    yield {"token": token}
+        finally:
+            # Also runs when the consumer stops early, so generation is not paid for in the background
+            _close_stream(stream)
+
+    async def achat_completion_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+        client = default_registry.get_async_openai_client(api_key=self.api_key, base_url=self.base_url)
+
+        stream = await self._acall_with_limits(
+            lambda: self._aopen_stream(lambda **options: client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temp,
+                max_tokens=tokens,
+                stream=True,
+                **options,
+            )),
+            system_prompt, user_prompt, tokens,
+        )
+        try:
+            async for chunk in stream:
+                token = self._chunk_token(chunk)
+                if token:
+                    yield {"token": token}
+        finally:
+            # On cancellation this closes the HTTP response, which aborts generation upstream
+            await _aclose_stream(stream)
+
+    def _chunk_token(self, chunk: Any) -> Optional[str]:
+        # With include_usage the last chunk has no choices, only usage
+        if getattr(chunk, "usage", None) is not None:
+            self._record_usage(chunk.usage)
+        if not chunk.choices:
+            return None
+        return getattr(chunk.choices[0].delta, "content", None)
+
+
+# Environment variables LiteLLM reads for each provider's API key
+PROVIDER_API_KEY_ENV = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "gemini": "GEMINI_API_KEY",
+    "openrouter": "OPENROUTER_API_KEY",
+}
 
 class LiteLLMClient(ModelClient):
-    """Client for LiteLLM which supports multiple providers"""
+    """Client for LiteLLM which supports multiple providers.
+
+    Credentials and base URL are passed on every call instead of being written to
+    os.environ, so clients for different tenants can coexist in one process.
+
+    cache_control marks prompt cache breakpoints for providers that need them
+    (e.g. Anthropic): True for {"type": "ephemeral"}, or a cache_control dict.
+    cache_breakpoints lists which messages ("system", "user") carry it.
+    """
     def __init__(self, api_key: str = None, model_name: str = "gpt-4", 
                  litellm_provider: str = None, temperature: float = 0.7, 
-                 max_tokens: Optional[int] = None):
-        super().__init__(model_name=model_name, temperature=temperature, max_tokens=max_tokens)
+                 max_tokens: Optional[int] = None,
+                 requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 max_retries: int = 3, base_url: Optional[str] = None,
+                 cache_control: Union[bool, Dict[str, Any], None] = None,
+                 cache_breakpoints: Sequence[str] = ("system",), context_window: Optional[int] = None,
+                 stream_usage: Optional[bool] = None):
+        self.provider = litellm_provider or "litellm"
+        super().__init__(model_name=model_name, temperature=temperature, max_tokens=max_tokens,
+                         requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute,
+                         max_retries=max_retries, rate_limit_scope=credential_fingerprint(api_key),
+                         context_window=context_window)
         self.api_key = api_key
         self.litellm_provider = litellm_provider
-        
-        # Set up API key for the specified provider
-        if self.litellm_provider == "openai":
-            os.environ["OPENAI_API_KEY"] = self.api_key or os.environ.get("OPENAI_API_KEY", "")
-        elif self.litellm_provider == "anthropic":
-            os.environ["ANTHROPIC_API_KEY"] = self.api_key or os.environ.get("ANTHROPIC_API_KEY", "")
-        elif self.litellm_provider == "gemini":
-            os.environ["GEMINI_API_KEY"] = self.api_key or os.environ.get("GEMINI_API_KEY", "")
-        elif self.litellm_provider == "openrouter":
-            os.environ["OPENROUTER_API_KEY"] = self.api_key or os.environ.get("OPENROUTER_API_KEY", "")
-        # Add other providers as needed
+        self.base_url = base_url
+        self.cache_control = {"type": "ephemeral"} if cache_control is True else (cache_control or None)
+        self.cache_breakpoints = tuple(cache_breakpoints)
+        # LiteLLM adapts stream_options for the providers it routes to; a custom base_url may not accept it
+        self.stream_usage = stream_usage if stream_usage is not None else not base_url
+
+    def _messages(self, system_prompt: str, user_prompt: str) -> List[Dict[str, Any]]:
+        messages: List[Dict[str, Any]] = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        if self.cache_control:
+            for message in messages:
+                if message["role"] in self.cache_breakpoints:
+                    message["content"] = [
+                        {"type": "text", "text": message["content"], "cache_control": dict(self.cache_control)}
+                    ]
+        return messages
+
+    def reset_after_fork(self) -> None:
+        import sys
+
+        litellm = sys.modules.get("litellm")
+        if litellm is not None:
+            # LiteLLM caches provider SDK clients (and their pools) process-wide
+            litellm.in_memory_llm_clients_cache.flush_cache()
+
+    def _credentials(self) -> Dict[str, Any]:
+        """Per-call credential kwargs for litellm.completion."""
+        kwargs: Dict[str, Any] = {}
+        env_var = PROVIDER_API_KEY_ENV.get(self.litellm_provider)
+        api_key = self.api_key or (os.environ.get(env_var) if env_var else None)
+        if api_key:
+            kwargs["api_key"] = api_key
+        if self.base_url:
+            kwargs["api_base"] = self.base_url
+        return kwargs
     
     def chat_completion(self, system_prompt: str, user_prompt: str, 
                        temperature: Optional[float] = None, 
                        max_tokens: Optional[int] = None) -> str:
+        import litellm  # imported on first use; it is slow to import
+
         # Use provided parameters or fall back to instance defaults
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens if max_tokens is not None else self.max_tokens
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
+        messages = self._messages(system_prompt, user_prompt)
         
         # If a specific provider is defined, use it
         model_param = f"{self.litellm_provider}/{self.model_name}"
         
-        response = litellm.completion(
-            model=model_param,
-            messages=messages,
-            temperature=temp,
-            max_tokens=tokens
+        response = self._call_with_limits(
+            lambda: litellm.completion(
+                model=model_param,
+                messages=messages,
+                temperature=temp,
+                max_tokens=tokens,
+                **self._credentials()
+            ),
+            system_prompt, user_prompt, tokens,
         )
+        self._record_usage(getattr(response, "usage", None))
         
         return response.choices[0].message.content
 
@@ -135,35 +446,84 @@ class LiteLLMClient(ModelClient):
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
     ) -> Iterator[Dict[str, Any]]:
+        import litellm
+
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens if max_tokens is not None else self.max_tokens
 
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
+        messages = self._messages(system_prompt, user_prompt)
 
         model_param = f"{self.litellm_provider}/{self.model_name}"
 
-        stream = litellm.completion(
-            model=model_param,
-            messages=messages,
-            temperature=temp,
-            max_tokens=tokens,
-            stream=True,
+        stream = self._call_with_limits(
+            lambda: self._open_stream(lambda **options: litellm.completion(
+                model=model_param,
+                messages=messages,
+                temperature=temp,
+                max_tokens=tokens,
+                stream=True,
+                **options,
+                **self._credentials()
+            )),
+            system_prompt, user_prompt, tokens,
         )
 
-        for chunk in stream:
-            # LiteLLM streams dict with 'choices'
-            choices = getattr(chunk, "choices", None) or chunk.get("choices") if isinstance(chunk, dict) else None
-            if not choices:
-                continue
-            delta = choices[0].get("delta") if isinstance(choices[0], dict) else getattr(choices[0], "delta", None)
-            if not delta:
-                continue
-            token = delta.get("content") if isinstance(delta, dict) else getattr(delta, "content", None)
-            if token:
-                yield {"token": token}
+        try:
+            for chunk in stream:
+                token = self._chunk_token(chunk)
+                if token:
+                    yield {"token": token}
+        finally:
+            _close_stream(stream)
+
+    async def achat_completion_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        import litellm
+
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens if max_tokens is not None else self.max_tokens
+
+        messages = self._messages(system_prompt, user_prompt)
+
+        model_param = f"{self.litellm_provider}/{self.model_name}"
+
+        stream = await self._acall_with_limits(
+            lambda: self._aopen_stream(lambda **options: litellm.acompletion(
+                model=model_param,
+                messages=messages,
+                temperature=temp,
+                max_tokens=tokens,
+                stream=True,
+                **options,
+                **self._credentials()
+            )),
+            system_prompt, user_prompt, tokens,
+        )
+        try:
+            async for chunk in stream:
+                token = self._chunk_token(chunk)
+                if token:
+                    yield {"token": token}
+        finally:
+            await _aclose_stream(stream)
+
+    def _chunk_token(self, chunk: Any) -> Optional[str]:
+        usage = chunk.get("usage") if isinstance(chunk, dict) else getattr(chunk, "usage", None)
+        if usage:
+            self._record_usage(usage)
+        # LiteLLM streams dict with 'choices'
+        choices = chunk.get("choices") if isinstance(chunk, dict) else getattr(chunk, "choices", None)
+        if not choices:
+            return None
+        delta = choices[0].get("delta") if isinstance(choices[0], dict) else getattr(choices[0], "delta", None)
+        if not delta:
+            return None
+        return delta.get("content") if isinstance(delta, dict) else getattr(delta, "content", None)
 
 class ModelConfig:
     """Configuration class for a LLM model"""
@@ -174,7 +534,13 @@ class ModelConfig:
         api_key: str = None,
         litellm_provider: str = None,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: int = 3,
+        base_url: Optional[str] = None,
+        cache_control: Union[bool, Dict[str, Any], None] = None,
+        context_window: Optional[int] = None
     ):
         self.provider = provider.lower()
         self.model_name = model_name
@@ -182,6 +548,12 @@ class ModelConfig:
         self.litellm_provider = litellm_provider
         self.temperature = temperature
         self.max_tokens = max_tokens or 2048  # Default max_tokens
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_url = base_url
+        self.cache_control = cache_control
+        self.context_window = context_window
         
         # Set defaults based on provider
         if not self.model_name:
@@ -197,7 +569,12 @@ class ModelConfig:
                 api_key=self.api_key, 
                 model_name=self.model_name,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                requests_per_minute=self.requests_per_minute,
+                tokens_per_minute=self.tokens_per_minute,
+                max_retries=self.max_retries,
+                base_url=self.base_url,
+                context_window=self.context_window
             )
         elif self.provider == "litellm":
             return LiteLLMClient(
@@ -205,7 +582,13 @@ class ModelConfig:
                 model_name=self.model_name, 
                 litellm_provider=self.litellm_provider,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                requests_per_minute=self.requests_per_minute,
+                tokens_per_minute=self.tokens_per_minute,
+                max_retries=self.max_retries,
+                base_url=self.base_url,
+                cache_control=self.cache_control,
+                context_window=self.context_window
             )
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
@@ -216,7 +599,13 @@ def create_model(
     api_key: str = None,
     litellm_provider: str = None,
     temperature: float = 0.7,
-    max_tokens: Optional[int] = None
+    max_tokens: Optional[int] = None,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+    max_retries: int = 3,
+    base_url: Optional[str] = None,
+    cache_control: Union[bool, Dict[str, Any], None] = None,
+    context_window: Optional[int] = None
 ) -> ModelClient:
     """
     Create and return a model client with the specified configuration
@@ -228,6 +617,14 @@ def create_model(
         litellm_provider: For litellm, the specific provider to use
         temperature: The temperature parameter for the model (default: 0.7)
         max_tokens: The maximum tokens for the model (default: 2048)
+        requests_per_minute: Client-side request quota shared by all clients of this provider/model
+        tokens_per_minute: Client-side token quota (estimated prompt + max_tokens) shared likewise
+        max_retries: Retries on rate-limit and transient errors, with jittered backoff (default: 3)
+        base_url: Custom endpoint (OpenAI-compatible server, or LiteLLM api_base)
+        cache_control: LiteLLM only; mark the system prompt as a prompt-cache breakpoint
+            (True for {"type": "ephemeral"}). OpenAI caches prefixes automatically.
+        context_window: Model context size in tokens, for models missing from
+            agentproplus.tokenization.CONTEXT_WINDOWS; prompts are trimmed to fit it
         
     Returns:
         ModelClient: A configured model client
@@ -238,6 +635,58 @@ def create_model(
         api_key=api_key,
         litellm_provider=litellm_provider,
         temperature=temperature,
-        max_tokens=max_tokens
+        max_tokens=max_tokens,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        max_retries=max_retries,
+        base_url=base_url,
+        cache_control=cache_control,
+        context_window=context_window
     )
     return config.create_client()
+
+
+
+def _config_key_value(name: str, value: Any) -> Any:
+    if name == "api_key":
+        return credential_fingerprint(value)
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+class TenantModelPool:
+    """Per-tenant cache of model clients for multiplexing many tenants in one process.
+
+    Each tenant gets its own client (its own credentials, base URL and rate-limit
+    scope) while SDK connection pools are still shared through the client registry.
+    The least recently used tenants are evicted beyond `max_tenants`.
+    """
+
+    def __init__(self, max_tenants: int = 1024, **defaults: Any):
+        self.max_tenants = max_tenants
+        self.defaults = defaults
+        self._clients: "OrderedDict[Any, ModelClient]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str, **config: Any) -> ModelClient:
+        """Return the tenant's client, creating it from create_model(**defaults, **config)."""
+        params = {**self.defaults, **config}
+        key = (tenant_id, tuple(sorted((k, _config_key_value(k, v)) for k, v in params.items())))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+        client = create_model(**params)
+        with self._lock:
+            client = self._clients.setdefault(key, client)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_tenants:
+                self._clients.popitem(last=False)
+        return client
+
+    def evict(self, tenant_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._clients if k[0] == tenant_id]:
+                del self._clients[key]
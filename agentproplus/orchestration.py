@@ -0,0 +1,388 @@
+"""
+Multi-agent pipelines declared as a dependency DAG.
+
+Each node is an agent, a tool or a plain function, and names the nodes (or run
+inputs) it depends on. Nodes whose dependencies are done run concurrently, at most
+`max_parallel` at a time, and each node receives its dependencies' outputs.
+
+    dag = AgentDAG(max_parallel=4, cache=FileNodeCache(".dag-cache"))
+    dag.add_agent("audit", audit_agent, deps=["php"], prompt="Audit this PHP code:\n{php}")
+    dag.add_agent("security", security_agent, deps=["php"])
+    dag.add_agent("migrate", migrate_agent, deps=["php"])
+    dag.add_tool("extract_files", extract_tool, deps=["migrate"])
+    dag.add("integration", integrate, deps=["extract_files"])
+    result = dag.run({"php": php_code})
+    result["audit"], result.cached, result.durations
+
+Agents run on a clone() through arun_stream, so one agent can back several nodes
+and its own history is untouched. With a cache, a node whose inputs and definition
+are unchanged since an earlier run returns the saved output without running.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+
+from .metrics import metrics
+from .react_agent import MAX_ITERATIONS_ANSWER, NO_LLM_ANSWER, ReactAgent
+from .tools import Tool
+
+
+class NodeFailedError(RuntimeError):
+    """A DAG node raised; the original exception is the __cause__."""
+
+    def __init__(self, node: str, error: BaseException):
+        super().__init__(f"Node '{node}' failed: {error}")
+        self.node = node
+        self.error = error
+
+
+# -- caches ---------------------------------------------------------------------
+
+class NodeCache(ABC):
+    """Stores node outputs by cache key."""
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(True, output) on a hit, (False, None) on a miss."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, node: str, output: Any) -> None:
+        pass
+
+
+class InMemoryNodeCache(NodeCache):
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key not in self._items:
+                return False, None
+            self._items.move_to_end(key)
+            return True, self._items[key]
+
+    def put(self, key: str, node: str, output: Any) -> None:
+        with self._lock:
+            self._items[key] = output
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class FileNodeCache(NodeCache):
+    """One JSON file per cached output in `directory`; outputs must be JSON-serializable."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return True, json.load(f)["output"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return False, None
+
+    def put(self, key: str, node: str, output: Any) -> None:
+        try:
+            data = json.dumps({"node": node, "output": output, "time": time.time()}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            print(f"⚠️ Output of node '{node}' is not JSON-serializable; not cached")
+            return
+        # Write then rename, so a crash never leaves a half-written entry
+        tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+
+
+# -- nodes ----------------------------------------------------------------------
+
+def _stable_repr(value: Any, depth: int = 0) -> str:
+    """repr of plain data and code. Other objects are named by type, since their repr
+    often holds a memory address and would never match across processes."""
+    if isinstance(value, (str, bytes, int, float, complex, bool, type(None))):
+        return repr(value)
+    if depth >= 4:
+        return type(value).__qualname__
+    if isinstance(value, (list, tuple, frozenset, set)):
+        items = [_stable_repr(item, depth + 1) for item in value]
+        return f"{type(value).__name__}({', '.join(sorted(items) if isinstance(value, (set, frozenset)) else items)})"
+    if isinstance(value, dict):
+        items = sorted(f"{_stable_repr(k, depth + 1)}: {_stable_repr(v, depth + 1)}" for k, v in value.items())
+        return "{" + ", ".join(items) + "}"
+    if inspect.iscode(value):
+        return value.co_code.hex() + _stable_repr(value.co_consts, depth + 1)
+    if hasattr(value, "__code__"):
+        return _code_digest(value, depth + 1)
+    return type(value).__qualname__
+
+
+def _code_digest(fn: Any, depth: int = 0) -> str:
+    """Identifies a function by its code and the values it closes over, so editing
+    either invalidates cached outputs. Globals it reads are not covered."""
+    target = fn if getattr(fn, "__code__", None) is not None else getattr(fn, "__call__", None)
+    code = getattr(target, "__code__", None)
+    if code is None:
+        return getattr(fn, "__qualname__", type(fn).__qualname__)
+    cells = []
+    for cell in getattr(target, "__closure__", None) or ():
+        try:
+            cells.append(cell.cell_contents)
+        except ValueError:  # not assigned yet
+            cells.append(None)
+    data = _stable_repr(code, depth) + _stable_repr(tuple(cells), depth)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def _default_input(inputs: Dict[str, Any]) -> Any:
+    # One dependency is passed through as is; several are labelled sections
+    if len(inputs) == 1:
+        return next(iter(inputs.values()))
+    return "\n\n".join(f"{name}:\n{value}" for name, value in inputs.items())
+
+
+class _Node:
+    __slots__ = ("name", "deps", "call", "fingerprint", "cache")
+
+    def __init__(self, name: str, deps: Sequence[str], call: Callable[[Dict[str, Any]], Any],
+                 fingerprint: Any, cache: bool):
+        self.name = name
+        self.deps = tuple(deps)
+        self.call = call
+        self.fingerprint = fingerprint
+        self.cache = cache
+
+
+async def _run_agent(agent: ReactAgent, query: str) -> str:
+    stream = agent.clone().arun_stream(query)
+    response = None
+    try:
+        async for event in stream:
+            if event["type"] == "complete":
+                response = event["response"]
+    finally:
+        await stream.aclose()
+    if response is None:
+        raise RuntimeError("agent run ended without a final answer")
+    # The agent reports these in place of an answer; they must not be cached as output
+    if response["final_answer"] in (MAX_ITERATIONS_ANSWER, NO_LLM_ANSWER):
+        raise RuntimeError(response["final_answer"])
+    return response["final_answer"]
+
+
+class DAGResult:
+    """Outputs of a DAG run by node (and run input) name, plus which nodes came from the cache."""
+
+    __slots__ = ("outputs", "cached", "durations")
+
+    def __init__(self, outputs: Dict[str, Any], cached: List[str], durations: Dict[str, float]):
+        self.outputs = outputs
+        self.cached = cached
+        self.durations = durations  # seconds per executed node
+
+    def __getitem__(self, name: str) -> Any:
+        return self.outputs[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.outputs
+
+    def __repr__(self) -> str:
+        return f"DAGResult(nodes={list(self.outputs)}, cached={self.cached})"
+
+
+class AgentDAG:
+    """Runs agent, tool and function nodes in dependency order with bounded parallelism."""
+
+    def __init__(self, max_parallel: int = 4, cache: Optional[NodeCache] = None):
+        if max_parallel < 1:
+            raise ValueError("max_parallel must be at least 1")
+        self.max_parallel = max_parallel
+        self.cache = cache
+        self._nodes: Dict[str, _Node] = {}
+
+    def _add(self, node: _Node) -> "AgentDAG":
+        if node.name in self._nodes:
+            raise ValueError(f"Node '{node.name}' is already defined")
+        self._nodes[node.name] = node
+        return self
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], deps: Iterable[str] = (),
+            cache: bool = True, version: str = "") -> "AgentDAG":
+        """A function node: fn(inputs) gets {dependency name: output}; it may be async.
+        Sync functions run on a worker thread. The cache tracks fn's code and the plain
+        values it closes over; bump `version` when globals or objects it uses change."""
+
+        async def call(inputs: Dict[str, Any]) -> Any:
+            if inspect.iscoroutinefunction(fn):
+                return await fn(inputs)
+            return await asyncio.to_thread(fn, inputs)
+
+        return self._add(_Node(name, list(deps), call, ("fn", _code_digest(fn), version), cache))
+
+    def add_agent(self, name: str, agent: ReactAgent, deps: Iterable[str] = (),
+                  prompt: Union[str, Callable[[Dict[str, Any]], str], None] = None,
+                  cache: bool = True, version: str = "") -> "AgentDAG":
+        """An agent node; its output is the final answer.
+
+        prompt: a str.format template over the dependency outputs ("Audit:\\n{php}"), or
+            a function of them. By default the only dependency's output is the query,
+            or all of them as labelled sections.
+        """
+
+        def query(inputs: Dict[str, Any]) -> str:
+            if prompt is None:
+                return str(_default_input(inputs))
+            if isinstance(prompt, str):
+                return prompt.format(**inputs)
+            return prompt(inputs)
+
+        async def call(inputs: Dict[str, Any]) -> Any:
+            return await _run_agent(agent, query(inputs))
+
+        fingerprint = (
+            "agent",
+            getattr(agent.client, "model_name", type(agent.client).__name__),
+            agent.custom_system_prompt,
+            sorted(agent.tool_registry),
+            prompt if isinstance(prompt, str) or prompt is None else _code_digest(prompt),
+            version,
+        )
+        return self._add(_Node(name, list(deps), call, fingerprint, cache))
+
+    def add_tool(self, name: str, tool: Tool, deps: Iterable[str] = (),
+                 input: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 cache: bool = True, version: str = "") -> "AgentDAG":
+        """A tool node called through Tool.arun; `input` maps dependency outputs to the
+        tool input (default: as for agents)."""
+
+        async def call(inputs: Dict[str, Any]) -> Any:
+            return await tool.arun(input(inputs) if input else _default_input(inputs))
+
+        fingerprint = ("tool", type(tool).__qualname__, tool.name,
+                       None if input is None else _code_digest(input), version)
+        return self._add(_Node(name, list(deps), call, fingerprint, cache))
+
+    # -- planning -------------------------------------------------------------
+
+    def _plan(self, inputs: Dict[str, Any], targets: Optional[Iterable[str]]) -> List[_Node]:
+        """Nodes needed for `targets` (default: all) in dependency order."""
+        for node in self._nodes.values():
+            for dep in node.deps:
+                if dep not in self._nodes and dep not in inputs:
+                    raise ValueError(f"Node '{node.name}' depends on unknown node or input '{dep}'")
+        wanted = list(targets) if targets is not None else list(self._nodes)
+        order: List[_Node] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if name in inputs and name not in self._nodes:
+                return
+            if name not in self._nodes:
+                raise ValueError(f"Unknown node '{name}'")
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + (name,))}")
+            state[name] = 1
+            for dep in self._nodes[name].deps:
+                visit(dep, path + (name,))
+            state[name] = 2
+            order.append(self._nodes[name])
+
+        for name in wanted:
+            visit(name, ())
+        return order
+
+    def _cache_key(self, node: _Node, inputs: Dict[str, Any]) -> str:
+        payload = json.dumps({"node": node.name, "def": node.fingerprint, "inputs": inputs},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # -- execution ------------------------------------------------------------
+
+    async def arun(self, inputs: Optional[Dict[str, Any]] = None, targets: Optional[Iterable[str]] = None,
+                   on_node: Optional[Callable[[str, str], Any]] = None) -> DAGResult:
+        """Run the DAG (or only what `targets` need) on the given run inputs.
+
+        on_node(name, status) is called with "started", "done" or "cached", e.g. to
+        drive a progress bar. The first failing node cancels the nodes still running
+        and raises NodeFailedError; outputs cached so far make a re-run cheap.
+        """
+        inputs = dict(inputs or {})
+        plan = self._plan(inputs, targets)
+        outputs: Dict[str, Any] = dict(inputs)
+        cached: List[str] = []
+        durations: Dict[str, float] = {}
+        slots = asyncio.Semaphore(self.max_parallel)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def notify(name: str, status: str) -> None:
+            if on_node is not None:
+                on_node(name, status)
+
+        async def run_node(node: _Node) -> None:
+            await asyncio.gather(*(tasks[dep] for dep in node.deps if dep in tasks))
+            node_inputs = {dep: outputs[dep] for dep in node.deps}
+            key = None
+            if self.cache is not None and node.cache:
+                key = self._cache_key(node, node_inputs)
+                hit, value = self.cache.get(key)
+                if hit:
+                    outputs[node.name] = value
+                    cached.append(node.name)
+                    metrics.incr("dag.cache_hits")
+                    notify(node.name, "cached")
+                    return
+                metrics.incr("dag.cache_misses")
+            async with slots:
+                notify(node.name, "started")
+                started = time.perf_counter()
+                try:
+                    value = await node.call(node_inputs)
+                except Exception as e:
+                    raise NodeFailedError(node.name, e) from e
+                durations[node.name] = time.perf_counter() - started
+            outputs[node.name] = value
+            metrics.observe("dag.node_ms", durations[node.name] * 1000)
+            if key is not None:
+                self.cache.put(key, node.name, value)  # type: ignore[union-attr]
+            notify(node.name, "done")
+
+        # Tasks are created in dependency order, so every dependency's task exists first
+        for node in plan:
+            tasks[node.name] = asyncio.create_task(run_node(node))
+        try:
+            await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # After a failure, or when this run is cancelled, stop the remaining nodes
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for node in plan:
+            task = tasks[node.name]
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()  # type: ignore[misc]
+        return DAGResult(outputs, cached, durations)
+
+    def run(self, inputs: Optional[Dict[str, Any]] = None, targets: Optional[Iterable[str]] = None,
+            on_node: Optional[Callable[[str, str], Any]] = None) -> DAGResult:
+        """Synchronous arun(); call it from code that is not already in an event loop."""
+        return asyncio.run(self.arun(inputs, targets, on_node))
@@ -0,0 +1,251 @@
+"""
+Pre-forked worker processes for agentproplus.server.
+
+The parent imports everything and builds the agents, tool registries and prompts
+once, then calls gc.freeze() and forks N workers. Workers share that memory
+copy-on-write instead of each re-importing litellm/openai and rebuilding agents,
+and run in parallel without sharing a GIL.
+
+- Load balancing: the parent binds one listening socket before forking and every
+  worker accepts from it, so the kernel spreads connections across workers with no
+  proxy hop. Each worker still applies its own admission control.
+- Health: each worker's event loop writes a heartbeat to shared memory. A worker
+  whose heartbeat goes stale (a blocked loop) is killed and replaced, as is one that exits.
+- Recycling: a worker exits gracefully after max_requests (plus jitter, so workers
+  do not restart together) and is replaced, which bounds memory growth.
+- Fork safety: workers open their own HTTP connection pools and MCP sessions and
+  get 1/N of each client-side rate limit.
+
+Run:
+    agentproplus-server --agent my_app.agents:agent --workers 4 --max-requests 5000
+
+POSIX only (uses os.fork).
+"""
+
+from __future__ import annotations
+
+from multiprocessing.sharedctypes import RawArray
+from typing import Any, Dict, Iterable, Optional
+import asyncio
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+
+from .client_registry import default_registry
+from .metrics import metrics
+from .rate_limit import scale_rate_limits
+from .react_agent import ReactAgent
+from .server import AgentServer
+
+
+def reset_after_fork(agents: Iterable[ReactAgent], workers: int = 1) -> None:
+    """Re-create per-process resources in a forked child: HTTP pools, MCP sessions, rate limits."""
+    default_registry.reset_after_fork()
+    seen = set()
+    for agent in agents:
+        for resource in (agent.client, getattr(agent, "_mcp_manager", None)):
+            if resource is None or id(resource) in seen:
+                continue
+            seen.add(id(resource))
+            reset = getattr(resource, "reset_after_fork", None)
+            if callable(reset):
+                try:
+                    reset()
+                except Exception as e:
+                    print(f"⚠️ Resetting {type(resource).__name__} after fork failed: {e}", file=sys.stderr)
+    if workers > 1:
+        scale_rate_limits(1 / workers)
+
+
+class _Worker:
+    __slots__ = ("index", "pid", "started")
+
+    def __init__(self, index: int, pid: int):
+        self.index = index
+        self.pid = pid
+        self.started = time.monotonic()
+
+
+class PreforkSupervisor:
+    """Runs an AgentServer in `workers` forked processes and keeps them healthy."""
+
+    def __init__(
+        self,
+        server: AgentServer,
+        workers: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        max_requests: Optional[int] = 10_000,
+        max_requests_jitter: int = 1_000,
+        health_timeout: float = 10.0,
+        backlog: int = 2048,
+        **uvicorn_options: Any,
+    ):
+        self.server = server
+        self.workers = workers or os.cpu_count() or 1
+        self.host = host
+        self.port = port
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.health_timeout = health_timeout
+        self.backlog = backlog
+        self.uvicorn_options = uvicorn_options
+        self._children: Dict[int, _Worker] = {}
+        self._stopping = False
+        # Per worker slot: last heartbeat (time.time()) and requests served
+        self._heartbeats = RawArray("d", self.workers)
+        self._served = RawArray("d", self.workers)
+
+    # -- parent ---------------------------------------------------------------
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def run(self) -> None:
+        """Fork the workers and supervise them until SIGTERM/SIGINT."""
+        sock = self._bind()
+        # Import and build everything workers need before forking, so they share it
+        self.server.build()
+        import uvicorn  # noqa: F401
+
+        # Move everything built so far out of the collector's reach: collections in
+        # workers would otherwise write to these objects and un-share their pages
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        print(f"✅ Serving on http://{self.host}:{self.port} with {self.workers} workers (parent pid {os.getpid()})",
+              file=sys.stderr)
+        for index in range(self.workers):
+            self._spawn(index, sock)
+        try:
+            self._supervise(sock)
+        finally:
+            self._shutdown()
+            sock.close()
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        self._stopping = True
+
+    def _spawn(self, index: int, sock: socket.socket) -> None:
+        self._heartbeats[index] = time.time()
+        self._served[index] = 0
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                self._worker_main(index, sock)
+                code = 0
+            except BaseException as e:
+                print(f"❌ Worker {index} crashed: {e}", file=sys.stderr)
+            finally:
+                # Never fall back into the parent's supervision loop
+                os._exit(code)
+        self._children[pid] = _Worker(index, pid)
+
+    def _supervise(self, sock: socket.socket) -> None:
+        while not self._stopping:
+            time.sleep(0.5)
+            self._reap(sock)
+            now = time.time()
+            for worker in list(self._children.values()):
+                # A fresh worker gets time to start its event loop before it is judged
+                if time.monotonic() - worker.started < self.health_timeout:
+                    continue
+                if now - self._heartbeats[worker.index] > self.health_timeout:
+                    print(f"⚠️ Worker {worker.index} (pid {worker.pid}) stopped responding; replacing it",
+                          file=sys.stderr)
+                    metrics.incr("prefork.unhealthy")
+                    self._kill(worker.pid, signal.SIGKILL)
+
+    def _reap(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self._children.pop(pid, None)
+            if worker is None or self._stopping:
+                continue
+            metrics.incr("prefork.restarts")
+            if time.monotonic() - worker.started < 1.0:
+                # Crashing right after start: back off instead of fork-looping
+                time.sleep(1.0)
+            self._spawn(worker.index, sock)
+
+    def _kill(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _shutdown(self) -> None:
+        """Ask workers to drain (SIGTERM), then kill any still running after the drain timeout."""
+        for pid in list(self._children):
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.server.drain_timeout + 5
+        while self._children and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self._children.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in list(self._children):
+            self._kill(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self._children.clear()
+
+    def stats(self) -> Dict[int, Dict[str, Any]]:
+        """Per-worker pid, seconds since the last heartbeat and requests served (parent only)."""
+        now = time.time()
+        return {
+            worker.index: {
+                "pid": worker.pid,
+                "heartbeat_age": round(now - self._heartbeats[worker.index], 3),
+                "requests": int(self._served[worker.index]),
+            }
+            for worker in self._children.values()
+        }
+
+    # -- worker ---------------------------------------------------------------
+
+    def _worker_main(self, index: int, sock: socket.socket) -> None:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        random.seed()
+        reset_after_fork(self.server.agents.values(), self.workers)
+
+        async def heartbeat() -> None:
+            interval = max(0.5, self.health_timeout / 4)
+            while True:
+                self._heartbeats[index] = time.time()
+                self._served[index] = metrics.counter("server.requests")
+                await asyncio.sleep(interval)
+
+        def start_heartbeat() -> None:
+            asyncio.get_running_loop().create_task(heartbeat())
+
+        self.server.on_startup.append(start_heartbeat)
+        options = dict(self.uvicorn_options)
+        if self.max_requests:
+            options["limit_max_requests"] = self.max_requests + random.randint(0, self.max_requests_jitter)
+        self.server.uvicorn_server(self.host, self.port, **options).run(sockets=[sock])
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+import asyncio
+import random
+import threading
+import time
+
+T = TypeVar("T")
+
+# HTTP status codes worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Exception class names raised by openai/litellm for transient failures
+RETRYABLE_EXCEPTION_NAMES = {
+    "RateLimitError",
+    "APIConnectionError",
+    "APITimeoutError",
+    "Timeout",
+    "InternalServerError",
+    "ServiceUnavailableError",
+}
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap prompt token estimate (~4 characters per token)."""
+    if not text:
+        return 0
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Continuously refilling token bucket.
+
+    `reserve` debits immediately (the balance may go negative) and returns how long
+    the caller must wait, so concurrent callers queue up fairly instead of racing.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A single request larger than the bucket could never be admitted otherwise
+        self._tokens -= min(float(amount), self.capacity)
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.refill_per_second
+
+
+class RateLimiter:
+    """Client-side requests-per-minute / tokens-per-minute limiter shared by all callers."""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._requests: Optional[TokenBucket] = None
+        self._tokens: Optional[TokenBucket] = None
+        self.configure(requests_per_minute, tokens_per_minute)
+
+    def configure(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.requests_per_minute = requests_per_minute
+            self.tokens_per_minute = tokens_per_minute
+            self._requests = self._rebucket(self._requests, requests_per_minute, now)
+            self._tokens = self._rebucket(self._tokens, tokens_per_minute, now)
+
+    @staticmethod
+    def _rebucket(old: Optional[TokenBucket], per_minute: Optional[int], now: float) -> Optional[TokenBucket]:
+        if not per_minute:
+            return None
+        bucket = TokenBucket(per_minute, per_minute / 60.0)
+        if old is not None:
+            # Keep what is left (or owed), so reconfiguring never hands out a fresh quota
+            old._refill(now)
+            bucket._tokens = min(bucket.capacity, old._tokens)
+            bucket._updated = now
+        return bucket
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve capacity for one request and return the delay before it may be sent."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._blocked_until - now)
+            if self._requests is not None:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._tokens is not None and tokens:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+            return delay
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request of `tokens` estimated tokens may be sent."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    def block_for(self, seconds: float) -> None:
+        """Hold back every caller sharing this limiter, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+_limiters: Dict[Tuple[str, str, str], RateLimiter] = {}
+# Configured (unscaled) rpm/tpm of each limiter
+_quotas: Dict[Tuple[str, str, str], Tuple[Optional[int], Optional[int]]] = {}
+_limiters_lock = threading.Lock()
+# Share of every configured limit this process may use; set by scale_rate_limits()
+_scale = 1.0
+
+
+def _scaled(quota: Tuple[Optional[int], Optional[int]]) -> Tuple[Optional[int], Optional[int]]:
+    return tuple(max(1, int(limit * _scale)) if limit else None for limit in quota)  # type: ignore[return-value]
+
+
+def get_rate_limiter(
+    provider: str,
+    model_name: str,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+    scope: str = "",
+) -> RateLimiter:
+    """Return the process-wide limiter for (provider, model), creating or reconfiguring it.
+
+    `scope` separates quotas that the provider tracks independently, e.g. per API key.
+    Limits are scaled by this process's share (see scale_rate_limits).
+    """
+    key = (provider or "", model_name or "", scope)
+    quota = (requests_per_minute, tokens_per_minute)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            _quotas[key] = quota
+            limiter = _limiters[key] = RateLimiter(*_scaled(quota))
+            return limiter
+        if not (requests_per_minute or tokens_per_minute) or _quotas[key] == quota:
+            return limiter
+        _quotas[key] = quota
+        rpm, tpm = _scaled(quota)
+    if (limiter.requests_per_minute, limiter.tokens_per_minute) != (rpm, tpm):
+        limiter.configure(rpm, tpm)
+    return limiter
+
+
+def scale_rate_limits(fraction: float) -> None:
+    """Give this process `fraction` of every configured limit.
+
+    Limiters live in process memory, so N forked workers would each allow the full
+    quota; each worker calls this with 1/N to keep the total within the provider's.
+    The share also applies to limiters created or reconfigured later, and replaces
+    (does not compound) an earlier one.
+    """
+    global _scale
+    with _limiters_lock:
+        _scale = fraction
+        limiters = [(limiter, _scaled(_quotas[key])) for key, limiter in _limiters.items()]
+    for limiter, (rpm, tpm) in limiters:
+        if (limiter.requests_per_minute, limiter.tokens_per_minute) != (rpm, tpm):
+            limiter.configure(rpm, tpm)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Extract a Retry-After hint (seconds) from a provider exception, if present."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return float(value) / 1000.0
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    code = _status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    return any(cls.__name__ in RETRYABLE_EXCEPTION_NAMES for cls in type(exc).__mro__)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff that honors provider Retry-After hints."""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        hinted = retry_after_seconds(exc)
+        if hinted is not None:
+            # Small jitter so callers released together do not stampede again
+            return min(self.max_delay, hinted) + random.uniform(0, self.base_delay)
+        # Full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable[[], T], limiter: Optional[RateLimiter] = None, tokens: int = 0) -> T:
+        attempt = 0
+        while True:
+            if limiter is not None and limiter.enabled:
+                limiter.acquire(tokens)
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt, e)
+                if limiter is not None and _status_code(e) == 429:
+                    limiter.block_for(delay)
+                print(f"⚠️ LLM request failed ({e.__class__.__name__}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], limiter: Optional[RateLimiter] = None, tokens: int = 0) -> T:
+        """Async variant of call(); waits with asyncio.sleep so the event loop keeps running."""
+        attempt = 0
+        while True:
+            if limiter is not None and limiter.enabled:
+                delay = limiter.reserve(tokens)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            try:
+                return await fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt, e)
+                if limiter is not None and _status_code(e) == 429:
+                    limiter.block_for(delay)
+                print(f"⚠️ LLM request failed ({e.__class__.__name__}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
@@ -1,49 +1,108 @@
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, AsyncIterator, Dict, Iterator, Tuple, Union
 import json
 from .tools import Tool
+from .tools.registry import ToolSpec, resolve_tools
 from .tools.mcp_tool import MCPTool
 from .mcp_bridge import MCPClientManager, MCPNotAvailableError
+from .mcp_schema import render_input_format
+from .tool_retrieval import EmbedFn, SearchToolsTool, ToolRetriever, select_tools
 from .agent import Action, Observation, ThoughtStep, AgentResponse
-from .model import ModelClient, create_model
-
+from .context_window import PromptPart
+from .stream_parser import SectionStreamParser
+from .stream_events import StreamEvent, acoalesce_tokens, coalesce_tokens, dict_event
+from .model import ModelClient, _aclose_stream, _close_stream, create_model
+from .scheduling import FairScheduler, RunTurns
+from .checkpoint import CheckpointStore, RunCheckpoint
+from .singleflight import tool_calls
+
+import asyncio
+import copy
 import re
+import uuid
 from datetime import datetime
 
 
+STREAM_MODES = ("tokens", "sections", "final_answer")
+# Returned as final_answer when a run ends without one
+NO_LLM_ANSWER = "❌ No LLM is Connected. Please set and pass the OPENAI_API_KEY to AgentPro."
+MAX_ITERATIONS_ANSWER = "❌ Stopped after reaching maximum iterations limit."
+
+
+def _dict_token_event(kind: str, token: str, iteration: int, section: Optional[str] = None) -> Dict[str, Any]:
+    if section is None:
+        return {"type": kind, "token": token, "iteration": iteration}
+    return {"type": kind, "token": token, "section": section, "iteration": iteration}
+
+
+def _object_token_event(kind: str, token: str, iteration: int, section: Optional[str] = None) -> StreamEvent:
+    return StreamEvent(kind, iteration, token, section)
+
+
+def _with_turns(events: Iterator[Any], turns: RunTurns) -> Iterator[Any]:
+    # Returns the run's scheduler slot even if the consumer stops early
+    with turns:
+        yield from events
+
+
+async def _awith_turns(events: AsyncIterator[Any], turns: RunTurns) -> AsyncIterator[Any]:
+    try:
+        async for event in events:
+            yield event
+    finally:
+        await events.aclose()
+        turns.close()
+
+
+def _to_dict(model: Any) -> Any:
+    if model is None:
+        return None
+    if hasattr(model, "model_dump"):
+        try:
+            return model.model_dump(mode="json")
+        except TypeError:
+            return model.model_dump()
+    if hasattr(model, "dict"):
+        return model.dict()
+    return model
+
 
 class ReactAgent:
-    def __init__(self, model: Optional[ModelClient] = None, tools: List[Tool] = None, custom_system_prompt: str = None, max_iterations: int = 20, mcp_config: Optional[List[Dict[str, Any]]] = None):
+    def __init__(self, model: Optional[ModelClient] = None, tools: List[Union[Tool, str, ToolSpec]] = None, custom_system_prompt: str = None, max_iterations: int = 20, mcp_config: Optional[List[Dict[str, Any]]] = None, mcp_lazy: bool = False, mcp_manager: Optional[MCPClientManager] = None, tool_top_k: Optional[int] = None, tool_embed: Optional[EmbedFn] = None, scheduler: Optional[FairScheduler] = None, tenant: str = "default", priority: str = "interactive", checkpoint_store: Optional[CheckpointStore] = None):
 
         self.client = model or create_model(provider="openai")
 
         self.max_iterations = max_iterations
 
-        # Get Tool Details
-        self.tools = tools or []
+        # Get Tool Details; tools given by name are registry entries instantiated on first use
+        self.tools = resolve_tools(tools or [])
         self.tool_registry = {tool.action_type: tool for tool in self.tools}
 
         # Optional: load MCP tools from config
+        # (or share an already started manager, and its sessions, across agents)
         self._mcp_manager: Optional[MCPClientManager] = None
-        if mcp_config:
+        if mcp_config or mcp_manager is not None:
             try:
-                self._mcp_manager = MCPClientManager(mcp_config)
-                self._mcp_manager.start()
+                if mcp_manager is not None:
+                    self._mcp_manager = mcp_manager
+                else:
+                    # Lazy mode spawns servers on first tool call, using the cached tool manifest
+                    self._mcp_manager = MCPClientManager(mcp_config, lazy=mcp_lazy)
+                    self._mcp_manager.start()
                 discovered = self._mcp_manager.list_all_tools()
                 for server_id, items in discovered.items():
                     for t in items:
                         tool_name = t.get("name")
                         desc = t.get("description") or "MCP tool"
                         schema = t.get("input_schema")
-                        input_format = "JSON per tool schema"
-                        if schema and isinstance(schema, dict):
-                            title = schema.get("title")
-                            input_format = f"JSON matching schema{': ' + title if title else ''}"
+                        if not isinstance(schema, dict):
+                            schema = None
                         mtool = MCPTool(
                             server_id=server_id,
                             tool_name=tool_name,
                             description=desc,
-                            input_format=input_format,
+                            input_format=render_input_format(tool_name, schema),
                             manager=self._mcp_manager,
+                            input_schema=schema,
                         )
                         self.tools.append(mtool)
                         self.tool_registry[mtool.action_type] = mtool
@@ -55,23 +114,42 @@ class ReactAgent:
         # Maintain conversation turns across invocations
         self.conversation_history: List[Dict[str, Optional[str]]] = []
 
+        # With many tools, each query's prompt lists only the most relevant ones;
+        # the rest stay callable and can be found through the search_tools meta-tool
+        self.tool_top_k = tool_top_k
+        self.tool_retriever: Optional[ToolRetriever] = None
+        self._pinned_tools: List[Tool] = []
+        if tool_top_k and len(self.tools) > tool_top_k:
+            self.tool_retriever = ToolRetriever(self.tools, embed=tool_embed)
+            search_tool = SearchToolsTool(self.tool_retriever)
+            self.tool_registry[search_tool.action_type] = search_tool
+            self._pinned_tools = [search_tool]
+
+        self.custom_system_prompt = custom_system_prompt
+
+        # With a scheduler, each iteration waits for a slot shared fairly across tenants
+        self.scheduler = scheduler
+        self.tenant = tenant
+        self.priority = priority
+
+        # Saves each completed step so runs can be resumed after a failure
+        self.checkpoint_store = checkpoint_store
+
         # Build dynamic system prompt after tools are finalized
-        tools_description = "\n\n".join(tool.get_tool_description() for tool in self.tools)
-        tool_names = ", ".join(tool.action_type for tool in self.tools)
+        self.system_prompt = self._render_system_prompt(self.tools)
 
-        # Get current date here
-        current_date = datetime.now().strftime("%B %d, %Y")
+    def _render_system_prompt(self, tools: List[Tool]) -> str:
+        """The system message: identical for every call with the same tools and custom prompt.
 
-        # Default opening sentence
-        default_opening = "You are an AI assistant that follows the ReAct (Reasoning + Acting) pattern."
-        # Use custom system prompt if provided, otherwise use the default
-        if custom_system_prompt:
-            user_system_prompt = custom_system_prompt
-        else:
-            user_system_prompt = default_opening
+        Provider prompt caches match on exact prefixes, so the shared instructions and
+        tool catalog come first, custom text after them, and anything that changes per
+        call (date, history, steps) goes in the user message built by _build_prompt.
+        """
+        tools_description = "\n\n".join(tool.get_tool_description() for tool in tools)
+        tool_names = ", ".join(tool.action_type for tool in tools)
+
+        prompt = f"""You are an AI assistant that follows the ReAct (Reasoning + Acting) pattern.
 
-        self.system_prompt = f"""{user_system_prompt}
-        
 Your goal is to help users by breaking down complex tasks into a series of thought-out steps and actions.
 
 You have access to these tools: {tool_names}
@@ -99,22 +177,61 @@ Final Answer: Provide a complete, well-structured response that directly address
 - Use available tools wisely.
 - If stuck, reflect and retry but never hallucinate.
 - If observation is empty or not related, reflect and retry but never hallucinate.
-- The current date is {current_date}.
 - If you follow the format strictly, you will be recognized as an excellent and trustworthy AI assistant.
 """
+        if self.custom_system_prompt:
+            prompt += f"\n### Instructions\n{self.custom_system_prompt}\n"
+        return prompt
+
+    def _select_tools(self, query: str) -> str:
+        """System prompt for a run: with tool_top_k, one listing only the tools relevant to
+        the query. It is returned rather than stored, so concurrent runs on one agent
+        never send each other's tool lists."""
+        if self.tool_retriever is None:
+            return self.system_prompt
+        # Follow-up questions ("same for MSFT") are matched together with the previous one
+        previous = self.conversation_history[-1].get("user") if self.conversation_history else None
+        retrieval_query = f"{previous or ''} {query}".strip()
+        tools = select_tools(self.tool_retriever, retrieval_query, self.tool_top_k, self._pinned_tools)
+        # Catalog order rather than score order: the same tool set renders the same cacheable prefix
+        order = {tool.action_type: i for i, tool in enumerate(self.tools)}
+        tools.sort(key=lambda tool: order.get(tool.action_type, len(order)))
+        return self._render_system_prompt(tools)
+
+    def _turns(self) -> RunTurns:
+        return RunTurns(self.scheduler, self.tenant, self.priority)
+
+    def _checkpoint(self, run_id: Optional[str]) -> RunCheckpoint:
+        """Checkpoints of a new run; a no-op when the agent has no checkpoint store."""
+        if self.checkpoint_store is None:
+            return RunCheckpoint(None)
+        return RunCheckpoint(self.checkpoint_store, run_id or uuid.uuid4().hex)
+
+    def clone(self) -> "ReactAgent":
+        """A new agent sharing this one's model client, tools and MCP sessions, with an empty history."""
+        agent = copy.copy(self)
+        agent.conversation_history = []
+        return agent
 
     def _format_history(self, thought_process: List[ThoughtStep]) -> str:
-        history = ""
-        for step in thought_process:
+        return "".join(part.text for part in self._history_parts(thought_process))
+
+    def _history_parts(self, thought_process: List[ThoughtStep], priority_base: int = 0) -> List[PromptPart]:
+        """Thought steps as prompt parts; observations are truncatable, oldest first."""
+        parts: List[PromptPart] = []
+        for i, step in enumerate(thought_process):
+            history = ""
             if step.pause_reflection:
                 history += f"PAUSE: {step.pause_reflection}\n"
             if step.thought:
                 history += f"Thought: {step.thought}\n"
             if step.action:
                 history += f"Action: {step.action.model_dump_json()}\n"
+            parts.append(PromptPart(history))
             if step.observation:
-                history += f"Observation: {step.observation.result}\n"
-        return history
+                parts.append(PromptPart(f"Observation: {step.observation.result}\n",
+                                        priority=priority_base + i, mode="truncate"))
+        return parts
 
     def execute_tool(self, action: Action) -> str:
         tool = self.tool_registry.get(action.action_type)
@@ -122,182 +239,221 @@ Final Answer: Provide a complete, well-structured response that directly address
             return f"Error: Unknown action type '{action.action_type}'"
         
         try:
-            return tool.run(action.input)
+            key = tool.coalescing_key(action.input)
+            if key is None:
+                return tool.run(action.input)
+            # Identical concurrent calls (across all agents) share one upstream request
+            return tool_calls.do(key, lambda: tool.run(action.input))
+        except Exception as e:
+            return f"Error running tool '{action.action_type}': {e}"
+
+    async def aexecute_tool(self, action: Action) -> str:
+        """Async execute_tool; cancelling the caller cancels the tool call."""
+        tool = self.tool_registry.get(action.action_type)
+        if not tool:
+            return f"Error: Unknown action type '{action.action_type}'"
+
+        try:
+            key = tool.coalescing_key(action.input)
+            if key is None:
+                return await tool.arun(action.input)
+            return await tool_calls.ado(key, lambda: tool.arun(action.input))
         except Exception as e:
             return f"Error running tool '{action.action_type}': {e}"
 
-    def _get_llm_response(self, prompt: str) -> str:
+    def _get_llm_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         if not self.client:
             raise ValueError("❌ LLM client not initialized")
         
         return self.client.chat_completion(
-            system_prompt=self.system_prompt,
+            system_prompt=system_prompt or self.system_prompt,
             user_prompt=prompt,
             )
 
-    def _build_prompt(self, query: str, thought_process: List[ThoughtStep]) -> str:
-        prompt = f"{self.system_prompt}\n\n"
+    def _build_prompt(self, query: str, thought_process: List[ThoughtStep], system_prompt: Optional[str] = None) -> str:
+        # Only volatile content goes here; the stable part is the system message
+        parts = [PromptPart(f"The current date is {datetime.now().strftime('%B %d, %Y')}.\n\n")]
 
         if self.conversation_history:
-            prompt += "Conversation history:\n"
-            for turn in self.conversation_history:
+            parts.append(PromptPart("Conversation history:\n"))
+            for i, turn in enumerate(self.conversation_history):
                 user_msg = turn.get("user")
                 assistant_msg = turn.get("assistant")
+                text = ""
                 if user_msg:
-                    prompt += f"User: {user_msg}\n"
+                    text += f"User: {user_msg}\n"
                 if assistant_msg:
-                    prompt += f"Assistant: {assistant_msg}\n"
-            prompt += "\n"
+                    text += f"Assistant: {assistant_msg}\n"
+                # When the prompt must shrink, the oldest turns are dropped first
+                parts.append(PromptPart(text, priority=i))
+            parts.append(PromptPart("\n"))
 
-        prompt += f"Question: {query}\n\n"
+        parts.append(PromptPart(f"Question: {query}\n\n"))
 
         if thought_process:
-            prompt += self._format_history(thought_process)
+            # ...then older observations are truncated, the latest one last
+            parts.extend(self._history_parts(thought_process, priority_base=len(self.conversation_history)))
 
-        prompt += "\nNow continue with next steps by strictly following the required format.\n"
-        return prompt
+        parts.append(PromptPart("\nNow continue with next steps by strictly following the required format.\n"))
+
+        context = getattr(self.client, "context", None)
+        if context is None:
+            return "".join(part.text for part in parts)
+        return context.fit(system_prompt or self.system_prompt, parts, self.client.max_tokens)
 
     def run_stream(
         self,
         query: str,
+        stream_mode: str = "tokens",
+        coalesce_ms: Optional[float] = None,
+        coalesce_chars: Optional[int] = None,
+        complete_payload: str = "full",
+        event_objects: bool = False,
+        run_id: Optional[str] = None,
     ):
         """
         Synchronous generator that yields structured events for streaming UIs.
         Each yield returns a dict describing the event.
+
+        coalesce_ms / coalesce_chars: merge consecutive token events and flush them
+            every N milliseconds or N characters, instead of one event per token.
+        complete_payload: "full" puts the whole AgentResponse in the complete event;
+            "summary" sends only final_answer, iterations and step_count, since the
+            steps were already streamed as thought_step events.
+        event_objects: yield StreamEvent objects (read-only, dict-compatible, slotted)
+            instead of dicts; call event.to_dict() before JSON encoding.
+        run_id: id under which the run is checkpointed when the agent has a
+            checkpoint_store (a new one is generated if omitted); see resume().
+
+        stream_mode:
+            "tokens": one llm_token event per provider token (default).
+            "sections": llm_token events carry the section they belong to ("thought",
+                "action", "final_answer", ...) with the markers removed, and final-answer
+                text is also sent as final_answer_token events as soon as it arrives.
+            "final_answer": like "sections" but without llm_token events, for UIs that
+                only show the answer.
+        If a step that streamed final_answer_token events turns out to contain an
+        Action, a final_answer_reset event tells the UI to discard that text.
         """
+        if stream_mode not in STREAM_MODES:
+            raise ValueError(f"stream_mode must be one of {', '.join(STREAM_MODES)}")
+        if complete_payload not in ("full", "summary"):
+            raise ValueError("complete_payload must be 'full' or 'summary'")
+        checkpoint = self._checkpoint(run_id)
+        turns = self._turns()
+        events = _with_turns(
+            self._stream_events(query, stream_mode, complete_payload, event_objects, turns, checkpoint), turns)
+        if coalesce_ms or coalesce_chars:
+            events = coalesce_tokens(events, coalesce_ms, coalesce_chars)
+        return events
+
+    def _stream_events(self, query: str, stream_mode: str, complete_payload: str, event_objects: bool,
+                       turns: RunTurns, checkpoint: RunCheckpoint):
+        emit = StreamEvent.create if event_objects else dict_event
+        emit_token = _object_token_event if event_objects else _dict_token_event
+        # Saved once the stream is consumed, with the history the run actually starts from
+        checkpoint.start(query, self.conversation_history)
+        system_prompt = self._select_tools(query)
         thought_process: List[ThoughtStep] = []
         printed_prompt = False
         iterations_count = 0
 
-        def model_to_dict(model: Any) -> Any:
-            if model is None:
-                return None
-            if hasattr(model, "model_dump"):
-                try:
-                    return model.model_dump(mode="json")
-                except TypeError:
-                    return model.model_dump()
-            if hasattr(model, "dict"):
-                return model.dict()
-            return model
+        def complete(response: AgentResponse):
+            return self._complete_event(emit, response, iterations_count, complete_payload)
 
         while iterations_count < self.max_iterations:
             iterations_count += 1
             print("=" * 50 + f" Iteration {iterations_count} ")
+            turns.next()
 
-            thought = None
-            action = None
-            observation = None
-            pause_reflection = None
-
-            prompt = self._build_prompt(query, thought_process)
+            prompt = self._build_prompt(query, thought_process, system_prompt)
 
             if not printed_prompt:
                 print("✅  [Debug] Sending System Prompt (with history) to LLM:")
+                print(system_prompt)
                 print(prompt)
                 print("=" * 50)
                 printed_prompt = True
 
-            yield {"type": "prompt", "prompt": prompt, "iteration": iterations_count}
+            yield emit("prompt", prompt=prompt, iteration=iterations_count)
 
             if not self.client:
                 response = AgentResponse(
                     thought_process=thought_process,
-                    final_answer="❌ No LLM is Connected. Please set and pass the OPENAI_API_KEY to AgentPro."
+                    final_answer=NO_LLM_ANSWER
                 )
-                yield {"type": "complete", "response": model_to_dict(response)}
+                yield complete(response)
                 return
 
             stream_method = getattr(self.client, "chat_completion_stream", None)
             step_text = ""
-            llm_response_emitted = False
+            parser = SectionStreamParser() if stream_mode != "tokens" else None
 
             if callable(stream_method):
+                stream = None
                 try:
-                    for chunk in stream_method(
-                        system_prompt=self.system_prompt,
+                    stream = stream_method(
+                        system_prompt=system_prompt,
                         user_prompt=prompt,
-                    ):
+                    )
+                    for chunk in stream:
                         token = chunk.get("token") if isinstance(chunk, dict) and "token" in chunk else str(chunk)
                         step_text += token
-                        yield {"type": "llm_token", "token": token, "iteration": iterations_count}
+                        if parser is None:
+                            yield emit_token("llm_token", token, iterations_count)
+                        else:
+                            yield from self._section_events(parser.feed(token), stream_mode, iterations_count, emit_token)
+                    if parser is not None:
+                        yield from self._section_events(parser.flush(), stream_mode, iterations_count, emit_token)
                 except NotImplementedError:
-                    step_text = self._get_llm_response(prompt)
-                else:
-                    yield {"type": "llm_response", "content": step_text, "iteration": iterations_count}
-                    llm_response_emitted = True
+                    step_text = self._get_llm_response(prompt, system_prompt)
+                finally:
+                    # A consumer that stops iterating closes the provider stream right away
+                    if stream is not None:
+                        _close_stream(stream)
             else:
-                step_text = self._get_llm_response(prompt)
-                yield {"type": "llm_response", "content": step_text, "iteration": iterations_count}
-                llm_response_emitted = True
-
-            if not llm_response_emitted:
-                yield {"type": "llm_response", "content": step_text, "iteration": iterations_count}
-
-            if "Final Answer:" in step_text and "Action:" not in step_text:
-                thought_match = re.search(r"Thought:\s*(.*?)(?:Action:|PAUSE:|Final Answer:|$)", step_text, re.DOTALL)
-                pause_match = re.search(r"PAUSE:\s*(.*?)(?:Thought:|Action:|Final Answer:|$)", step_text, re.DOTALL)
+                step_text = self._get_llm_response(prompt, system_prompt)
 
-                if thought_match:
-                    thought = thought_match.group(1).strip()
-                    print("✅ Parsed Thought:", thought)
+            yield emit("llm_response", content=step_text, iteration=iterations_count)
 
-                if pause_match:
-                    pause_reflection = pause_match.group(1).strip()
-                    print("✅ Parsed Pause Reflection:", pause_reflection)
+            is_final = "Final Answer:" in step_text and "Action:" not in step_text
+            answer_streamed = parser is not None and parser.seen_final_answer
+            if answer_streamed and not is_final:
+                yield emit("final_answer_reset", iteration=iterations_count)
 
-                thought_step = ThoughtStep(
-                    thought=thought,
-                    pause_reflection=pause_reflection
-                )
+            if is_final:
+                thought_step, final_answer = self._parse_final_step(step_text)
                 thought_process.append(thought_step)
-                yield {"type": "thought_step", "step": model_to_dict(thought_step), "iteration": iterations_count}
+                checkpoint.step(thought_step)
+                yield emit("thought_step", step=_to_dict(thought_step), iteration=iterations_count)
 
-                final_answer = None
-                final_answer_match = re.search(r"Final Answer:\s*(.*)", step_text, re.DOTALL)
-                if final_answer_match:
-                    final_answer = final_answer_match.group(1).strip()
-                    print("✅ Parsed Final Answer:", final_answer)
-                    yield {"type": "final_answer", "final_answer": final_answer, "iteration": iterations_count}
+                if final_answer is not None:
+                    if parser is not None and not answer_streamed:
+                        # The client could not stream, so the whole answer arrives at once
+                        yield emit_token("final_answer_token", final_answer, iterations_count)
+                    yield emit("final_answer", final_answer=final_answer, iteration=iterations_count)
 
                 response = AgentResponse(
                     thought_process=thought_process,
-                    final_answer=final_answer
+                    final_answer=final_answer,
+                    run_id=checkpoint.run_id
                 )
+                checkpoint.finish(final_answer)
                 self.conversation_history.append({
                     "user": query,
                     "assistant": final_answer
                 })
-                yield {"type": "complete", "response": model_to_dict(response)}
+                yield complete(response)
                 return
             else:
                 try:
-                    thought_match = re.search(r"Thought:\s*(.*?)(?:Action:|PAUSE:|Final Answer:|$)", step_text, re.DOTALL)
-                    action_match = re.search(r"Action:\s*(\{.*?\})(?:Observation:|PAUSE:|Thought:|Final Answer:|$)", step_text, re.DOTALL)
-                    pause_match = re.search(r"PAUSE:\s*(.*?)(?:Thought:|Action:|Final Answer:|$)", step_text, re.DOTALL)
-
-                    if thought_match:
-                        thought = thought_match.group(1).strip()
-                        print("✅ Parsed Thought:", thought)
-
-                    if action_match:
-                        action_text = action_match.group(1).strip()
-                        print("✅ Parsed Action JSON:", action_text)
-
-                        action_data = json.loads(action_text)
-                        action = Action(
-                            action_type=action_data["action_type"],
-                            input=action_data["input"]
-                        )
-
+                    thought, action, pause_reflection = self._parse_action_step(step_text)
+                    observation = None
+                    if action is not None:
                         result = self.execute_tool(action)
                         print("✅ Parsed Action Results:", result)
                         observation = Observation(result=result)
 
-                    if pause_match:
-                        pause_reflection = pause_match.group(1).strip()
-                        print("✅ Parsed Pause Reflection:", pause_reflection)
-
                     thought_step = ThoughtStep(
                         thought=thought,
                         action=action,
@@ -305,112 +461,324 @@ Final Answer: Provide a complete, well-structured response that directly address
                         pause_reflection=pause_reflection
                     )
                     thought_process.append(thought_step)
-                    yield {"type": "thought_step", "step": model_to_dict(thought_step), "iteration": iterations_count}
+                    checkpoint.step(thought_step)
+                    yield emit("thought_step", step=_to_dict(thought_step), iteration=iterations_count)
                 except Exception as e:
-                    print(f"❌ Error parsing LLM response: {e}")
-                    print(f"❌ Raw step text: {step_text}")
-
-                    error_message = (
-                        f"Error parsing LLM response: {e}\n"
-                        f"Response: {step_text}\n\n"
-                        "### Response format (choose only one per response)\n\n"
-                        "Option 1 — When action is needed:\n"
-                        "Thought: Your reasoning about action\n"
-                        "Action: {\"action_type\": \"<action_type>\", \"input\": <input_data>}\n\n"
-                        "Option 2 — When you're confident in the final response:\n"
-                        "Thought: Now I know the answer that will be given in Final Answer.\n"
-                        "Final Answer: Provide a complete, well-structured response that directly addresses the original question."
-                    )
-
-                    print("✅ Parsed Action Results:", error_message)
-
-                    observation = Observation(result=error_message)
-
-                    thought_step = ThoughtStep(
-                        thought=None,
-                        action=None,
-                        observation=observation,
-                        pause_reflection=None
-                    )
+                    error_message = self._parse_error_message(e, step_text)
+                    thought_step = ThoughtStep(observation=Observation(result=error_message))
                     thought_process.append(thought_step)
-                    yield {"type": "error", "error": error_message, "iteration": iterations_count}
-                    yield {"type": "thought_step", "step": model_to_dict(thought_step), "iteration": iterations_count}
+                    checkpoint.step(thought_step)
+                    yield emit("error", error=error_message, iteration=iterations_count)
+                    yield emit("thought_step", step=_to_dict(thought_step), iteration=iterations_count)
 
         response = AgentResponse(
             thought_process=thought_process,
-            final_answer="❌ Stopped after reaching maximum iterations limit."
+            final_answer=MAX_ITERATIONS_ANSWER,
+            run_id=checkpoint.run_id
         )
-        yield {"type": "complete", "response": model_to_dict(response)}
+        checkpoint.finish(response.final_answer)
+        yield complete(response)
         return
 
-    def run(self, query: str) -> AgentResponse:
+    def arun_stream(
+        self,
+        query: str,
+        stream_mode: str = "tokens",
+        coalesce_ms: Optional[float] = None,
+        coalesce_chars: Optional[int] = None,
+        complete_payload: str = "full",
+        event_objects: bool = False,
+        run_id: Optional[str] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Async generator with the same events and options as run_stream.
+
+        Model output comes from the client's achat_completion_stream and tools run
+        through Tool.arun. Cancelling the consuming task, or calling aclose() on the
+        generator (e.g. when a client disconnects), closes the provider stream so
+        generation stops upstream, and cancels the tool call in progress.
+        """
+        if stream_mode not in STREAM_MODES:
+            raise ValueError(f"stream_mode must be one of {', '.join(STREAM_MODES)}")
+        if complete_payload not in ("full", "summary"):
+            raise ValueError("complete_payload must be 'full' or 'summary'")
+        checkpoint = self._checkpoint(run_id)
+        turns = self._turns()
+        events = _awith_turns(
+            self._astream_events(query, stream_mode, complete_payload, event_objects, turns, checkpoint), turns)
+        if coalesce_ms or coalesce_chars:
+            events = acoalesce_tokens(events, coalesce_ms, coalesce_chars)
+        return events
+
+    async def _astream_events(self, query: str, stream_mode: str, complete_payload: str, event_objects: bool,
+                              turns: RunTurns, checkpoint: RunCheckpoint):
+        emit = StreamEvent.create if event_objects else dict_event
+        emit_token = _object_token_event if event_objects else _dict_token_event
+        checkpoint.start(query, self.conversation_history)
+        system_prompt = self._select_tools(query)
         thought_process: List[ThoughtStep] = []
-        printed_prompt = False  # <<< ADD A FLAG
         iterations_count = 0
+
+        while iterations_count < self.max_iterations:
+            iterations_count += 1
+            print("=" * 50 + f" Iteration {iterations_count} ")
+            await turns.anext()
+
+            prompt = self._build_prompt(query, thought_process, system_prompt)
+            yield emit("prompt", prompt=prompt, iteration=iterations_count)
+
+            if not self.client:
+                response = AgentResponse(
+                    thought_process=thought_process,
+                    final_answer=NO_LLM_ANSWER
+                )
+                yield self._complete_event(emit, response, iterations_count, complete_payload)
+                return
+
+            stream_method = getattr(self.client, "achat_completion_stream", None)
+            step_text = ""
+            parser = SectionStreamParser() if stream_mode != "tokens" else None
+
+            stream = None
+            try:
+                if not callable(stream_method):
+                    raise NotImplementedError
+                stream = stream_method(system_prompt=system_prompt, user_prompt=prompt)
+                async for chunk in stream:
+                    token = chunk.get("token") if isinstance(chunk, dict) and "token" in chunk else str(chunk)
+                    step_text += token
+                    if parser is None:
+                        yield emit_token("llm_token", token, iterations_count)
+                    else:
+                        for event in self._section_events(parser.feed(token), stream_mode, iterations_count, emit_token):
+                            yield event
+                if parser is not None:
+                    for event in self._section_events(parser.flush(), stream_mode, iterations_count, emit_token):
+                        yield event
+            except NotImplementedError:
+                step_text = await asyncio.to_thread(self._get_llm_response, prompt, system_prompt)
+            finally:
+                # Also runs on cancellation and aclose(): closing the stream aborts the request
+                if stream is not None:
+                    await _aclose_stream(stream)
+
+            yield emit("llm_response", content=step_text, iteration=iterations_count)
+
+            is_final = "Final Answer:" in step_text and "Action:" not in step_text
+            answer_streamed = parser is not None and parser.seen_final_answer
+            if answer_streamed and not is_final:
+                yield emit("final_answer_reset", iteration=iterations_count)
+
+            if is_final:
+                thought_step, final_answer = self._parse_final_step(step_text)
+                thought_process.append(thought_step)
+                checkpoint.step(thought_step)
+                yield emit("thought_step", step=_to_dict(thought_step), iteration=iterations_count)
+                if final_answer is not None:
+                    if parser is not None and not answer_streamed:
+                        yield emit_token("final_answer_token", final_answer, iterations_count)
+                    yield emit("final_answer", final_answer=final_answer, iteration=iterations_count)
+                response = AgentResponse(thought_process=thought_process, final_answer=final_answer,
+                                         run_id=checkpoint.run_id)
+                checkpoint.finish(final_answer)
+                self.conversation_history.append({"user": query, "assistant": final_answer})
+                yield self._complete_event(emit, response, iterations_count, complete_payload)
+                return
+
+            try:
+                thought, action, pause_reflection = self._parse_action_step(step_text)
+                observation = None
+                if action is not None:
+                    result = await self.aexecute_tool(action)
+                    print("✅ Parsed Action Results:", result)
+                    observation = Observation(result=result)
+                thought_step = ThoughtStep(
+                    thought=thought,
+                    action=action,
+                    observation=observation,
+                    pause_reflection=pause_reflection
+                )
+                thought_process.append(thought_step)
+                checkpoint.step(thought_step)
+                yield emit("thought_step", step=_to_dict(thought_step), iteration=iterations_count)
+            except Exception as e:
+                error_message = self._parse_error_message(e, step_text)
+                thought_step = ThoughtStep(observation=Observation(result=error_message))
+                thought_process.append(thought_step)
+                checkpoint.step(thought_step)
+                yield emit("error", error=error_message, iteration=iterations_count)
+                yield emit("thought_step", step=_to_dict(thought_step), iteration=iterations_count)
+
+        response = AgentResponse(
+            thought_process=thought_process,
+            final_answer=MAX_ITERATIONS_ANSWER,
+            run_id=checkpoint.run_id
+        )
+        checkpoint.finish(response.final_answer)
+        yield self._complete_event(emit, response, iterations_count, complete_payload)
+
+    @staticmethod
+    def _complete_event(emit: Any, response: AgentResponse, iterations: int, complete_payload: str) -> Any:
+        if complete_payload == "summary":
+            summary = {
+                "final_answer": response.final_answer,
+                "iterations": iterations,
+                "step_count": len(response.thought_process),
+            }
+            if response.run_id is not None:
+                summary["run_id"] = response.run_id
+            return emit("complete", response=summary)
+        return emit("complete", response=_to_dict(response))
+
+    @staticmethod
+    def _parse_final_step(step_text: str) -> Tuple[ThoughtStep, Optional[str]]:
+        """Thought step and final answer of a response that ends the run."""
+        thought = pause_reflection = final_answer = None
+        thought_match = re.search(r"Thought:\s*(.*?)(?:Action:|PAUSE:|Final Answer:|$)", step_text, re.DOTALL)
+        pause_match = re.search(r"PAUSE:\s*(.*?)(?:Thought:|Action:|Final Answer:|$)", step_text, re.DOTALL)
+
+        if thought_match:
+            thought = thought_match.group(1).strip()
+            print("✅ Parsed Thought:", thought)
+
+        if pause_match:
+            pause_reflection = pause_match.group(1).strip()
+            print("✅ Parsed Pause Reflection:", pause_reflection)
+
+        final_answer_match = re.search(r"Final Answer:\s*(.*)", step_text, re.DOTALL)
+        if final_answer_match:
+            final_answer = final_answer_match.group(1).strip()
+            print("✅ Parsed Final Answer:", final_answer)
+        return ThoughtStep(thought=thought, pause_reflection=pause_reflection), final_answer
+
+    @staticmethod
+    def _parse_action_step(step_text: str) -> Tuple[Optional[str], Optional[Action], Optional[str]]:
+        """Thought, Action and PAUSE of an intermediate response; raises if the Action is malformed."""
+        thought = action = pause_reflection = None
+        thought_match = re.search(r"Thought:\s*(.*?)(?:Action:|PAUSE:|Final Answer:|$)", step_text, re.DOTALL)
+        action_match = re.search(r"Action:\s*(\{.*?\})(?:Observation:|PAUSE:|Thought:|Final Answer:|$)", step_text, re.DOTALL)
+        pause_match = re.search(r"PAUSE:\s*(.*?)(?:Thought:|Action:|Final Answer:|$)", step_text, re.DOTALL)
+
+        if thought_match:
+            thought = thought_match.group(1).strip()
+            print("✅ Parsed Thought:", thought)
+
+        if action_match:
+            action_text = action_match.group(1).strip()
+            print("✅ Parsed Action JSON:", action_text)
+            action_data = json.loads(action_text)
+            action = Action(
+                action_type=action_data["action_type"],
+                input=action_data["input"]
+            )
+
+        if pause_match:
+            pause_reflection = pause_match.group(1).strip()
+            print("✅ Parsed Pause Reflection:", pause_reflection)
+        return thought, action, pause_reflection
+
+    @staticmethod
+    def _parse_error_message(e: Exception, step_text: str) -> str:
+        """Observation that tells the model its response could not be parsed."""
+        print(f"❌ Error parsing LLM response: {e}")
+        print(f"❌ Raw step text: {step_text}")
+
+        error_message = (
+            f"Error parsing LLM response: {e}\n"
+            f"Response: {step_text}\n\n"
+            "### Response format (choose only one per response)\n\n"
+            "Option 1 — When action is needed:\n"
+            "Thought: Your reasoning about action\n"
+            "Action: {\"action_type\": \"<action_type>\", \"input\": <input_data>}\n\n"
+            "Option 2 — When you're confident in the final response:\n"
+            "Thought: Now I know the answer that will be given in Final Answer.\n"
+            "Final Answer: Provide a complete, well-structured response that directly addresses the original question."
+        )
+
+        print("✅ Parsed Action Results:", error_message)
+        return error_message
+
+    @staticmethod
+    def _section_events(segments: List[Tuple[str, str]], stream_mode: str, iteration: int, emit_token: Any):
+        for section, text in segments:
+            if stream_mode == "sections":
+                yield emit_token("llm_token", text, iteration, section)
+            if section == "final_answer":
+                yield emit_token("final_answer_token", text, iteration)
+
+    def run(self, query: str, run_id: Optional[str] = None) -> AgentResponse:
+        """Run the agent on a query. With a checkpoint_store the run is saved under
+        run_id (generated if omitted, returned as response.run_id)."""
+        checkpoint = self._checkpoint(run_id)
+        checkpoint.start(query, self.conversation_history)
+        with self._turns() as turns:
+            return self._run(query, turns, checkpoint, [])
+
+    def resume(self, run_id: str) -> AgentResponse:
+        """Continue a checkpointed run after its last completed step.
+
+        The query and conversation history are restored from the checkpoint, so a new
+        agent (e.g. after a restart) can resume the run. A run that already finished
+        returns its saved response without calling the model.
+        """
+        if self.checkpoint_store is None:
+            raise ValueError("resume() needs an agent with a checkpoint_store")
+        state = self.checkpoint_store.load(run_id)
+        if state is None:
+            raise ValueError(f"No checkpoint for run '{run_id}'")
+        if state.completed:
+            return AgentResponse(thought_process=state.steps, final_answer=state.final_answer, run_id=run_id)
+        print(f"✅ Resuming run '{run_id}' after {len(state.steps)} completed steps")
+        self.conversation_history = state.history
+        with self._turns() as turns:
+            return self._run(state.query, turns, RunCheckpoint(self.checkpoint_store, run_id), state.steps)
+
+    def _run(self, query: str, turns: RunTurns, checkpoint: RunCheckpoint,
+             thought_process: List[ThoughtStep]) -> AgentResponse:
+        system_prompt = self._select_tools(query)
+        printed_prompt = False  # <<< ADD A FLAG
+        # Steps restored from a checkpoint count towards max_iterations
+        iterations_count = len(thought_process)
         
 
         while iterations_count < self.max_iterations:
             iterations_count += 1
             print("=" * 50 + f" Iteration {iterations_count} ")
+            turns.next()
             
-            # Initialize placeholders at the beginning
-            thought = None
-            action = None
-            observation = None
-            pause_reflection = None
-
-            prompt = self._build_prompt(query, thought_process)
+            prompt = self._build_prompt(query, thought_process, system_prompt)
 
             # Print whole System Prompt once in the start
             if not printed_prompt:
                 print("✅  [Debug] Sending System Prompt (with history) to LLM:")
+                print(system_prompt)
                 print(prompt)
                 print("=" * 50)
                 printed_prompt = True  # <<< Set flag True after printing
 
             # Run LLM model
             if self.client:
-                step_text = self._get_llm_response(prompt)
+                step_text = self._get_llm_response(prompt, system_prompt)
             else:
                 return AgentResponse(
                     thought_process=thought_process,
-                    final_answer="❌ No LLM is Connected. Please set and pass the OPENAI_API_KEY to AgentPro."
+                    final_answer=NO_LLM_ANSWER
                 )
 
             print("🤖 [Debug] Step LLM Response:")
             print(step_text)
             
             if "Final Answer:" in step_text and "Action:" not in step_text:
-                # Try to find last Thought before Final Answer
-                thought_match = re.search(r"Thought:\s*(.*?)(?:Action:|PAUSE:|Final Answer:|$)", step_text, re.DOTALL)
-                pause_match = re.search(r"PAUSE:\s*(.*?)(?:Thought:|Action:|Final Answer:|$)", step_text, re.DOTALL)
-                    
-                # Extract Thought if found
-                if thought_match:
-                    thought = thought_match.group(1).strip()
-                    print("✅ Parsed Thought:", thought)
-
-                # Extract PAUSE if found
-                if pause_match:
-                    pause_reflection = pause_match.group(1).strip()
-                    print("✅ Parsed Pause Reflection:", pause_reflection)
-
-                thought_process.append(ThoughtStep(
-                        thought=thought,
-                        pause_reflection=pause_reflection
-                    ))
-
-                # Extract Final Answer
-                final_answer = None
-                final_answer_match = re.search(r"Final Answer:\s*(.*)", step_text, re.DOTALL)
-                if final_answer_match:
-                    final_answer = final_answer_match.group(1).strip()
-                    print("✅ Parsed Final Answer:", final_answer)
+                thought_step, final_answer = self._parse_final_step(step_text)
+                thought_process.append(thought_step)
+                checkpoint.step(thought_step)
 
                 response = AgentResponse(
                     thought_process=thought_process,
-                    final_answer=final_answer
+                    final_answer=final_answer,
+                    run_id=checkpoint.run_id
                 )
+                checkpoint.finish(final_answer)
                 self.conversation_history.append({
                     "user": query,
                     "assistant": final_answer
@@ -419,77 +787,31 @@ Final Answer: Provide a complete, well-structured response that directly address
                 return response
             else:
                 try:
-                    # Try Extracting Thought Action and Pause
-                    thought_match = re.search(r"Thought:\s*(.*?)(?:Action:|PAUSE:|Final Answer:|$)", step_text, re.DOTALL)
-                    action_match = re.search(r"Action:\s*(\{.*?\})(?:Observation:|PAUSE:|Thought:|Final Answer:|$)", step_text, re.DOTALL)
-                    pause_match = re.search(r"PAUSE:\s*(.*?)(?:Thought:|Action:|Final Answer:|$)", step_text, re.DOTALL)
-
-                    # Extract Thought if found
-                    if thought_match:
-                        thought = thought_match.group(1).strip()
-                        print("✅ Parsed Thought:", thought)
-
-                    # Extract Action if found
-                    if action_match:
-                        action_text = action_match.group(1).strip()
-                        print("✅ Parsed Action JSON:", action_text)
-
-                        # Load action safely
-                        action_data = json.loads(action_text)
-                        action = Action(
-                            action_type=action_data["action_type"],
-                            input=action_data["input"]
-                        )
-
-                        # Execute action
+                    thought, action, pause_reflection = self._parse_action_step(step_text)
+                    observation = None
+                    if action is not None:
                         result = self.execute_tool(action)
                         print("✅ Parsed Action Results:", result)
                         observation = Observation(result=result)
 
-                    # Extract PAUSE if found
-                    if pause_match:
-                        pause_reflection = pause_match.group(1).strip()
-                        print("✅ Parsed Pause Reflection:", pause_reflection)
-
-                    # Record the thought step
                     thought_process.append(ThoughtStep(
                         thought=thought,
                         action=action,
                         observation=observation,
                         pause_reflection=pause_reflection
                     ))
+                    checkpoint.step(thought_process[-1])
                 except Exception as e:
-                    print(f"❌ Error parsing LLM response: {e}")
-                    print(f"❌ Raw step text: {step_text}")
-                    
-                    error_message = (
-                        f"Error parsing LLM response: {e}\n"
-                        f"Response: {step_text}\n\n"
-                        "### Response format (choose only one per response)\n\n"
-                        "Option 1 — When action is needed:\n"
-                        "Thought: Your reasoning about action\n"
-                        "Action: {\"action_type\": \"<action_type>\", \"input\": <input_data>}\n\n"
-                        "Option 2 — When you're confident in the final response:\n"
-                        "Thought: Now I know the answer that will be given in Final Answer.\n"
-                        "Final Answer: Provide a complete, well-structured response that directly addresses the original question."
-                        )
-                    
-                    print("✅ Parsed Action Results:", error_message)
-
-                    # Add error as an observation
-                    observation = Observation(result=error_message)
-    
-                    # Record the thought step with the error observation
-                    thought_process.append(ThoughtStep(
-                        thought=None,
-                        action=None,
-                        observation=observation,
-                        pause_reflection=None
-                        ))
-                    # Continue to the next iteration instead of returning
+                    # Record the error as an observation and continue with the next iteration
+                    error_message = self._parse_error_message(e, step_text)
+                    thought_process.append(ThoughtStep(observation=Observation(result=error_message)))
+                    checkpoint.step(thought_process[-1])
         
         # # If exceeded max steps
+        final_answer = MAX_ITERATIONS_ANSWER
+        checkpoint.finish(final_answer)
         return AgentResponse(
             thought_process=thought_process,
-            final_answer="❌ Stopped after reaching maximum iterations limit."
+            final_answer=final_answer,
+            run_id=checkpoint.run_id
         )
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+import asyncio
+import threading
+import time
+
+from .metrics import metrics
+
+# Default priority classes and their weights: interactive work gets 8 of every 9
+# contended slots, and batch work is never starved completely
+PRIORITIES = {"interactive": 8.0, "batch": 1.0}
+
+
+class _Ticket:
+    __slots__ = ("tenant", "priority", "enqueued", "granted", "event", "future", "loop")
+
+    def __init__(self, tenant: str, priority: str):
+        self.tenant = tenant
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.event: Optional[threading.Event] = None
+        self.future: Optional[asyncio.Future] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class _FairQueue:
+    """Start-time fair queuing over named flows: the backlogged flow with the lowest
+    virtual time goes next, and each grant advances it by 1/weight."""
+
+    __slots__ = ("flows", "vtime", "clock")
+
+    def __init__(self):
+        self.flows: Dict[str, Any] = {}
+        self.vtime: Dict[str, float] = {}
+        self.clock = 0.0
+
+    def activate(self, name: str) -> None:
+        # A flow returning from idle starts at the current clock; idle time earns no credit
+        self.vtime[name] = max(self.vtime.get(name, 0.0), self.clock)
+        if len(self.vtime) > 2 * len(self.flows) + 64:
+            # Idle flows behind the clock would restart at the clock anyway
+            for stale in [n for n, v in self.vtime.items() if v <= self.clock and n not in self.flows and n != name]:
+                del self.vtime[stale]
+
+    def pick(self, backlogged: Any) -> Optional[str]:
+        names = [name for name in self.flows if backlogged(self.flows[name])]
+        if not names:
+            return None
+        return min(names, key=lambda name: self.vtime.get(name, 0.0))
+
+    def charge(self, name: str, weight: float) -> None:
+        self.clock = self.vtime[name]
+        self.vtime[name] += 1.0 / max(weight, 1e-9)
+
+
+class FairScheduler:
+    """Shares a fixed number of agent iteration slots across tenants and priority classes.
+
+    Agents with a scheduler take one slot per iteration (one LLM call plus its tool
+    call) and queue again for the next one, so long multi-iteration runs give way
+    between LLM calls. Under contention, classes share slots by their weights in
+    `priorities`, and tenants within a class by `tenant_weights` (default 1.0).
+
+    Queue waits are recorded in agentproplus.metrics as
+    "scheduler.queue_wait_ms.<priority>" and "scheduler.queue_wait_ms.tenant.<tenant>".
+    """
+
+    def __init__(self, capacity: int = 8, tenant_weights: Optional[Dict[str, float]] = None,
+                 priorities: Optional[Dict[str, float]] = None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.tenant_weights = dict(tenant_weights or {})
+        self.priorities = dict(priorities or PRIORITIES)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._classes = _FairQueue()
+        for priority in self.priorities:
+            self._classes.flows[priority] = _FairQueue()
+
+    # -- queueing -------------------------------------------------------------
+
+    def _enqueue(self, ticket: _Ticket) -> None:
+        if ticket.priority not in self.priorities:
+            raise ValueError(f"Unknown priority '{ticket.priority}'; expected one of {', '.join(self.priorities)}")
+        tenants: _FairQueue = self._classes.flows[ticket.priority]
+        if not any(tenants.flows.values()):
+            self._classes.activate(ticket.priority)
+        queue: Optional[Deque[_Ticket]] = tenants.flows.get(ticket.tenant)
+        if not queue:
+            queue = tenants.flows[ticket.tenant] = deque()
+            tenants.activate(ticket.tenant)
+        queue.append(ticket)
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting tickets; call with the lock held."""
+        while self._running < self.capacity:
+            priority = self._classes.pick(lambda tenants: any(tenants.flows.values()))
+            if priority is None:
+                return
+            tenants: _FairQueue = self._classes.flows[priority]
+            tenant = tenants.pick(bool)
+            ticket = tenants.flows[tenant].popleft()  # type: ignore[index]
+            self._classes.charge(priority, self.priorities[priority])
+            tenants.charge(tenant, self.tenant_weights.get(tenant, 1.0))  # type: ignore[arg-type]
+            if not tenants.flows[tenant]:
+                del tenants.flows[tenant]  # type: ignore[arg-type]
+            self._running += 1
+            ticket.granted = True
+            self._record_wait(ticket)
+            if ticket.event is not None:
+                ticket.event.set()
+            elif ticket.loop is not None:
+                ticket.loop.call_soon_threadsafe(_resolve, ticket.future)
+
+    def _remove(self, ticket: _Ticket) -> None:
+        tenants: _FairQueue = self._classes.flows[ticket.priority]
+        queue = tenants.flows.get(ticket.tenant)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del tenants.flows[ticket.tenant]
+
+    @staticmethod
+    def _record_wait(ticket: _Ticket) -> None:
+        waited = (time.monotonic() - ticket.enqueued) * 1000
+        metrics.observe(f"scheduler.queue_wait_ms.{ticket.priority}", waited)
+        metrics.observe(f"scheduler.queue_wait_ms.tenant.{ticket.tenant}", waited)
+
+    # -- public API -----------------------------------------------------------
+
+    def acquire(self, tenant: str = "default", priority: str = "interactive") -> None:
+        """Block until a slot is granted to this tenant and priority."""
+        ticket = _Ticket(tenant, priority)
+        ticket.event = threading.Event()
+        with self._lock:
+            self._enqueue(ticket)
+            self._dispatch()
+        ticket.event.wait()
+
+    async def aacquire(self, tenant: str = "default", priority: str = "interactive") -> None:
+        """Async acquire; a cancelled waiter leaves the queue (or returns its slot)."""
+        loop = asyncio.get_running_loop()
+        ticket = _Ticket(tenant, priority)
+        ticket.loop = loop
+        ticket.future = loop.create_future()
+        with self._lock:
+            self._enqueue(ticket)
+            self._dispatch()
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if ticket.granted:
+                    self._running -= 1
+                    self._dispatch()
+                else:
+                    self._remove(ticket)
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._running -= 1
+            self._dispatch()
+
+    def turns(self, tenant: str = "default", priority: str = "interactive") -> "RunTurns":
+        return RunTurns(self, tenant, priority)
+
+    def stats(self) -> Dict[str, Any]:
+        """Running slots and queued iterations per priority class and tenant."""
+        with self._lock:
+            queued = {
+                priority: {tenant: len(queue) for tenant, queue in tenants.flows.items() if queue}
+                for priority, tenants in self._classes.flows.items()
+            }
+            return {"capacity": self.capacity, "running": self._running, "queued": queued}
+
+
+def _resolve(future: Optional[asyncio.Future]) -> None:
+    if future is not None and not future.done():
+        future.set_result(None)
+
+
+class RunTurns:
+    """The slots of one agent run: next() hands back the previous iteration's slot and
+    queues for the next one; leaving the with-block returns the slot still held.
+    Without a scheduler every call is a no-op."""
+
+    __slots__ = ("scheduler", "tenant", "priority", "_held")
+
+    def __init__(self, scheduler: Optional[FairScheduler], tenant: str = "default", priority: str = "interactive"):
+        self.scheduler = scheduler
+        self.tenant = tenant
+        self.priority = priority
+        self._held = False
+
+    def next(self) -> None:
+        if self.scheduler is None:
+            return
+        self.close()
+        self.scheduler.acquire(self.tenant, self.priority)
+        self._held = True
+
+    async def anext(self) -> None:
+        if self.scheduler is None:
+            return
+        self.close()
+        await self.scheduler.aacquire(self.tenant, self.priority)
+        self._held = True
+
+    def close(self) -> None:
+        if self._held:
+            self._held = False
+            self.scheduler.release()  # type: ignore[union-attr]
+
+    def __enter__(self) -> "RunTurns":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
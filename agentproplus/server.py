@@ -0,0 +1,620 @@
+"""
+HTTP serving layer for ReactAgents: JSON, Server-Sent Events and WebSocket streaming.
+
+Agents are built once at startup and prewarmed. Every session gets its own clone, so
+conversation history is kept per session_id while the model client, tools and MCP
+sessions are shared. Agent runs use arun_stream: no request thread blocks on run(),
+and a client that disconnects aborts its in-flight model request.
+
+Endpoints:
+    GET  /healthz                   process is up
+    GET  /readyz                    200 while accepting work, 503 when draining
+    GET  /agents                    served agent names
+    POST /agents/{name}/run         {"query", "session_id"?, "priority"?} -> final response as JSON
+    POST /agents/{name}/stream      same body (+ "stream_mode") -> run_stream events as SSE
+    WS   /agents/{name}/ws          send {"query", ...} messages, receive events as JSON;
+                                    {"type": "cancel"} stops the current run
+
+At most `max_concurrency` runs execute at once. Up to `max_queue` more wait for a slot
+(at most `queue_timeout` seconds); beyond that requests get 429 with Retry-After.
+On SIGTERM/SIGINT the server stops admitting work, fails /readyz, lets running
+requests finish (up to `drain_timeout`) and exits; a second signal exits at once.
+Agents built with a FairScheduler share its iteration slots by tenant and
+priority (see agentproplus.scheduling). Both are decided by the server: by
+`identify` (e.g. api_key_identity, --api-keys) from the request headers, or the
+agent's own. A request's "priority" may only lower the priority it is granted.
+
+Run:
+    agentproplus-server --agent research=my_app.agents:build_research_agent --port 8080
+    agentproplus-server --agent research=my_app.agents:build_research_agent --workers 4
+
+With --workers, agentproplus.prefork runs pre-forked worker processes.
+
+Requires starlette and uvicorn: pip install "agentproplus[server]"
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from .metrics import metrics
+from .mcp_serve import load_agent
+from .react_agent import STREAM_MODES, ReactAgent
+
+# Seconds between checks whether the client of a non-streaming run is still there
+_DISCONNECT_POLL = 1.0
+
+
+class ServerNotAvailableError(RuntimeError):
+    pass
+
+
+class AdmissionRejected(Exception):
+    """A request that cannot be admitted; carries the HTTP status to answer with."""
+
+    def __init__(self, status: int, reason: str, retry_after: Optional[float] = None):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, time-limited wait queue."""
+
+    def __init__(self, max_concurrency: int = 16, max_queue: int = 64, queue_timeout: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.draining = False
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it belongs to the server's event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._slots
+
+    async def acquire(self) -> None:
+        """Wait for a run slot, or raise AdmissionRejected (429 queue full, 503 draining/timeout)."""
+        slots = self._semaphore()
+        if self.draining:
+            raise AdmissionRejected(503, "server is draining")
+        if slots.locked() and self.waiting >= self.max_queue:
+            metrics.incr("server.rejected")
+            raise AdmissionRejected(429, "too many requests", retry_after=1)
+        self.waiting += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            metrics.incr("server.queue_timeouts")
+            raise AdmissionRejected(503, "timed out waiting for a free slot", retry_after=1)
+        finally:
+            self.waiting -= 1
+        metrics.observe("server.queue_wait_ms", (time.monotonic() - start) * 1000)
+        self.active += 1
+        self._idle.clear()  # type: ignore[union-attr]
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore().release()
+        if self.active == 0:
+            self._idle.set()  # type: ignore[union-attr]
+
+    async def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until no run is active; False if `timeout` passed first."""
+        self._semaphore()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)  # type: ignore[union-attr]
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"active": self.active, "queued": self.waiting, "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue, "draining": self.draining}
+
+
+class _Session:
+    __slots__ = ("agent", "lock", "last_used")
+
+    def __init__(self, agent: ReactAgent):
+        self.agent = agent
+        # Requests of one session run one at a time; they share its history
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class SessionStore:
+    """Agent clones by (agent name, session_id), evicted when idle or least recently used."""
+
+    def __init__(self, ttl: float = 1800.0, max_sessions: int = 10_000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[Tuple[str, str], _Session]" = OrderedDict()
+
+    def get(self, agent_name: str, template: ReactAgent, session_id: Optional[str]) -> Tuple[str, _Session]:
+        self._evict()
+        session_id = session_id or uuid.uuid4().hex
+        key = (agent_name, session_id)
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = _Session(template.clone())
+        else:
+            self._sessions.move_to_end(key)
+        session.last_used = time.monotonic()
+        return session_id, session
+
+    def _evict(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            key, oldest = next(iter(self._sessions.items()))
+            if oldest.lock.locked() or (oldest.last_used >= cutoff and len(self._sessions) < self.max_sessions):
+                break
+            del self._sessions[key]
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+def _json(data: Any) -> str:
+    return json.dumps(data, default=str, ensure_ascii=False)
+
+
+# Maps request headers to (tenant, highest allowed priority), or None to reject the request
+Identify = Callable[[Mapping[str, str]], Optional[Tuple[str, str]]]
+
+
+def api_key_identity(keys: Dict[str, Dict[str, str]], default_priority: str = "interactive") -> Identify:
+    """An `identify` for AgentServer from a table of API keys.
+
+    keys: {api_key: {"tenant": ..., "priority": ...}}; the key is sent as
+    "Authorization: Bearer <key>" or "X-API-Key: <key>".
+    """
+
+    def identify(headers: Mapping[str, str]) -> Optional[Tuple[str, str]]:
+        auth = headers.get("authorization", "")
+        key = auth[7:].strip() if auth[:7].lower() == "bearer " else headers.get("x-api-key", "")
+        grant = keys.get(key) if key else None
+        if grant is None:
+            return None
+        return grant["tenant"], grant.get("priority", default_priority)
+
+    return identify
+
+
+class _RunEvents:
+    """Event stream of an admitted run. aclose() frees the run slot even if the
+    stream was dropped before its first event, when the generator's own cleanup
+    never runs."""
+
+    __slots__ = ("_events", "_release")
+
+    def __init__(self, events: AsyncIterator[Any], release: Callable[[], None]):
+        self._events = events
+        self._release = release
+
+    def __aiter__(self) -> "_RunEvents":
+        return self
+
+    def __anext__(self) -> Any:
+        return self._events.__anext__()
+
+    async def aclose(self) -> None:
+        try:
+            await self._events.aclose()  # type: ignore[attr-defined]
+        finally:
+            self._release()
+
+    def __del__(self) -> None:
+        # Dropped without aclose(), e.g. a response cancelled before its body started
+        self._release()
+
+
+class AgentServer:
+    """Serves named ReactAgents over HTTP, SSE and WebSocket (a Starlette app run by uvicorn)."""
+
+    def __init__(
+        self,
+        agents: Dict[str, ReactAgent],
+        max_concurrency: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 30.0,
+        session_ttl: float = 1800.0,
+        max_sessions: int = 10_000,
+        drain_timeout: float = 30.0,
+        coalesce_ms: Optional[float] = 30.0,
+        identify: Optional[Identify] = None,
+    ):
+        if not agents:
+            raise ValueError("AgentServer needs at least one agent")
+        self.agents = agents
+        self.admission = AdmissionController(max_concurrency, max_queue, queue_timeout)
+        self.sessions = SessionStore(session_ttl, max_sessions)
+        self.drain_timeout = drain_timeout
+        # Token events are merged into ~coalesce_ms batches before they are framed
+        self.coalesce_ms = coalesce_ms
+        # Tenant and priority come from here, never from the request body
+        self.identify = identify
+        self.ready = False
+        # Called (and awaited if async) once the app has started, e.g. by prefork workers
+        self.on_startup: List[Callable[[], Any]] = []
+        self._app: Any = None
+
+    def prewarm(self) -> None:
+        for agent in self.agents.values():
+            prewarm = getattr(agent.client, "prewarm", None)
+            if callable(prewarm):
+                try:
+                    prewarm()
+                except Exception as e:
+                    print(f"⚠️ Prewarming model client failed: {e}")
+
+    def build(self) -> Any:
+        """Create the Starlette application."""
+        if self._app is not None:
+            return self._app
+        try:
+            from starlette.applications import Starlette
+            from starlette.routing import Route, WebSocketRoute
+        except ImportError:
+            raise ServerNotAvailableError(
+                "starlette and uvicorn are required to serve agents over HTTP. "
+                "Install with: pip install starlette uvicorn"
+            )
+
+        from contextlib import asynccontextmanager
+
+        @asynccontextmanager
+        async def lifespan(app: Any) -> AsyncIterator[None]:
+            await asyncio.to_thread(self.prewarm)
+            for hook in self.on_startup:
+                result = hook()
+                if asyncio.iscoroutine(result):
+                    await result
+            self.ready = True
+            try:
+                yield
+            finally:
+                await self.drain()
+
+        self._app = Starlette(
+            routes=[
+                Route("/healthz", self._healthz),
+                Route("/readyz", self._readyz),
+                Route("/agents", self._list_agents),
+                Route("/agents/{name}/run", self._run, methods=["POST"]),
+                Route("/agents/{name}/stream", self._stream, methods=["POST"]),
+                WebSocketRoute("/agents/{name}/ws", self._websocket),
+            ],
+            lifespan=lifespan,
+        )
+        return self._app
+
+    async def drain(self) -> bool:
+        """Stop admitting work and wait for running requests; False if drain_timeout passed."""
+        self.admission.draining = True
+        return await self.admission.wait_idle(self.drain_timeout)
+
+    # -- HTTP handlers -------------------------------------------------------
+
+    async def _healthz(self, request: Any) -> Any:
+        from starlette.responses import JSONResponse
+
+        return JSONResponse({"status": "ok"})
+
+    async def _readyz(self, request: Any) -> Any:
+        from starlette.responses import JSONResponse
+
+        ready = self.ready and not self.admission.draining
+        body = {"status": "ready" if ready else "unavailable", "sessions": len(self.sessions),
+                **self.admission.stats()}
+        return JSONResponse(body, status_code=200 if ready else 503)
+
+    async def _list_agents(self, request: Any) -> Any:
+        from starlette.responses import JSONResponse
+
+        return JSONResponse({"agents": sorted(self.agents)})
+
+    async def _parse(self, request: Any) -> Tuple[str, Dict[str, Any]]:
+        name = request.path_params["name"]
+        if name not in self.agents:
+            raise AdmissionRejected(404, f"unknown agent '{name}'")
+        try:
+            body = await request.json()
+        except Exception:
+            raise AdmissionRejected(400, "request body must be a JSON object")
+        return name, self._validate(body)
+
+    @staticmethod
+    def _validate(body: Any) -> Dict[str, Any]:
+        if not isinstance(body, dict) or not isinstance(body.get("query"), str) or not body["query"].strip():
+            raise AdmissionRejected(400, "'query' must be a non-empty string")
+        if body.get("stream_mode", "tokens") not in STREAM_MODES:
+            raise AdmissionRejected(400, f"'stream_mode' must be one of {', '.join(STREAM_MODES)}")
+        if "priority" in body and (not isinstance(body["priority"], str) or not body["priority"]):
+            raise AdmissionRejected(400, "'priority' must be a non-empty string")
+        return body
+
+    def _identity(self, name: str, headers: Mapping[str, str], body: Dict[str, Any]) -> Tuple[str, str]:
+        """Tenant and priority of a request: granted by `identify` (or the agent's own),
+        with the body's "priority" honoured only if it does not outrank the grant."""
+        agent = self.agents[name]
+        tenant, priority = agent.tenant, agent.priority
+        if self.identify is not None:
+            identity = self.identify(headers)
+            if identity is None:
+                raise AdmissionRejected(401, "missing or unknown API key")
+            tenant, priority = identity
+        requested = body.get("priority")
+        scheduler = agent.scheduler
+        if requested is not None and scheduler is not None:
+            weights = scheduler.priorities
+            if requested not in weights:
+                raise AdmissionRejected(400, f"'priority' must be one of {', '.join(weights)}")
+            if weights[requested] <= weights.get(priority, 0.0):
+                priority = requested
+        return tenant, priority
+
+    @staticmethod
+    def _error(exc: AdmissionRejected) -> Any:
+        from starlette.responses import JSONResponse
+
+        headers = {"Retry-After": str(int(exc.retry_after))} if exc.retry_after else None
+        return JSONResponse({"error": exc.reason}, status_code=exc.status, headers=headers)
+
+    async def _events(self, name: str, body: Dict[str, Any], complete_payload: str,
+                      headers: Mapping[str, str]) -> Tuple[str, _RunEvents]:
+        """Admit a run and return its session_id and event stream; the slot is freed when
+        the stream ends or is closed. Callers must aclose() the stream."""
+        tenant, priority = self._identity(name, headers, body)
+        await self.admission.acquire()
+        try:
+            session_id, session = self.sessions.get(name, self.agents[name], body.get("session_id"))
+        except BaseException:
+            self.admission.release()
+            raise
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.admission.release()
+
+        async def events() -> AsyncIterator[Any]:
+            started = time.monotonic()
+            try:
+                async with session.lock:
+                    session.agent.tenant = tenant
+                    session.agent.priority = priority
+                    stream = session.agent.arun_stream(
+                        body["query"],
+                        stream_mode=body.get("stream_mode", "tokens"),
+                        coalesce_ms=self.coalesce_ms,
+                        complete_payload=complete_payload,
+                    )
+                    try:
+                        async for event in stream:
+                            yield event
+                    finally:
+                        # Runs on client disconnect too, aborting the model request
+                        await stream.aclose()
+            finally:
+                session.last_used = time.monotonic()
+                release()
+                metrics.incr("server.requests")
+                metrics.observe("server.run_ms", (time.monotonic() - started) * 1000)
+
+        return session_id, _RunEvents(events(), release)
+
+    async def _run(self, request: Any) -> Any:
+        from starlette.responses import JSONResponse
+
+        try:
+            name, body = await self._parse(request)
+            session_id, events = await self._events(name, body, "full", request.headers)
+        except AdmissionRejected as e:
+            return self._error(e)
+
+        async def collect() -> Any:
+            response = None
+            try:
+                async for event in events:
+                    if event.get("type") == "complete":
+                        response = event.get("response")
+            finally:
+                await events.aclose()
+            return response
+
+        run = asyncio.create_task(collect())
+        try:
+            # Nothing is sent until the run ends, so poll for a client that went away
+            while not (await asyncio.wait({run}, timeout=_DISCONNECT_POLL))[0]:
+                if await request.is_disconnected():
+                    run.cancel()
+                    await asyncio.gather(run, return_exceptions=True)
+                    return JSONResponse({"error": "client disconnected"}, status_code=499)
+        finally:
+            if not run.done():
+                run.cancel()
+                await asyncio.gather(run, return_exceptions=True)
+        response = run.result()
+        return JSONResponse({"session_id": session_id, "response": response},
+                            headers={"X-Session-Id": session_id})
+
+    async def _stream(self, request: Any) -> Any:
+        from starlette.responses import StreamingResponse
+
+        try:
+            name, body = await self._parse(request)
+            session_id, events = await self._events(name, body, "summary", request.headers)
+        except AdmissionRejected as e:
+            return self._error(e)
+
+        async def sse() -> AsyncIterator[str]:
+            try:
+                yield f"event: session\ndata: {_json({'session_id': session_id})}\n\n"
+                async for event in events:
+                    yield f"event: {event.get('type')}\ndata: {_json(event)}\n\n"
+            finally:
+                # Also when the client disconnects before the run started
+                await events.aclose()
+
+        return StreamingResponse(
+            sse(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Session-Id": session_id},
+        )
+
+    async def _websocket(self, websocket: Any) -> None:
+        from starlette.websockets import WebSocketDisconnect
+
+        name = websocket.path_params["name"]
+        if name not in self.agents:
+            await websocket.close(code=4404)
+            return
+        await websocket.accept()
+        session_id = websocket.query_params.get("session_id")
+        running: Optional[asyncio.Task] = None
+
+        async def forward(body: Dict[str, Any]) -> None:
+            nonlocal session_id
+            try:
+                session_id, events = await self._events(name, {**body, "session_id": session_id}, "summary",
+                                                        websocket.headers)
+            except AdmissionRejected as e:
+                await websocket.send_text(_json({"type": "rejected", "status": e.status, "error": e.reason}))
+                return
+            try:
+                await websocket.send_text(_json({"type": "session", "session_id": session_id}))
+                async for event in events:
+                    await websocket.send_text(_json(event))
+            finally:
+                await events.aclose()
+
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if isinstance(message, dict) and message.get("type") == "cancel":
+                    if running is not None and not running.done():
+                        running.cancel()
+                    continue
+                if running is not None and not running.done():
+                    await websocket.send_text(_json({"type": "rejected", "status": 409,
+                                                     "error": "a run is already in progress"}))
+                    continue
+                try:
+                    body = self._validate(message)
+                except AdmissionRejected as e:
+                    await websocket.send_text(_json({"type": "rejected", "status": e.status, "error": e.reason}))
+                    continue
+                running = asyncio.create_task(forward(body))
+        except (WebSocketDisconnect, json.JSONDecodeError, RuntimeError):
+            pass
+        finally:
+            # The client is gone: stop the run so it no longer costs tokens
+            if running is not None and not running.done():
+                running.cancel()
+                await asyncio.gather(running, return_exceptions=True)
+
+    def run(self, host: str = "127.0.0.1", port: int = 8080, **uvicorn_options: Any) -> None:
+        """Serve until SIGTERM/SIGINT, then drain running requests and exit."""
+        self.uvicorn_server(host, port, **uvicorn_options).run()
+
+    def uvicorn_server(self, host: str = "127.0.0.1", port: int = 8080, **uvicorn_options: Any) -> Any:
+        """A uvicorn.Server for the app whose first exit signal drains before shutting down."""
+        app = self.build()
+        try:
+            import uvicorn
+        except ImportError:
+            raise ServerNotAvailableError("uvicorn is required to run the server. Install with: pip install uvicorn")
+
+        agent_server = self
+
+        class _DrainingServer(uvicorn.Server):
+            def handle_exit(self, sig: int, frame: Any) -> None:
+                loop = getattr(self, "_drain_loop", None)
+                if agent_server.admission.draining or loop is None:
+                    super().handle_exit(sig, frame)
+                    return
+                # First signal: fail readiness and let in-flight requests finish
+                print("⚠️ Draining: waiting for running requests before shutting down")
+                agent_server.admission.draining = True
+                loop.call_soon_threadsafe(lambda: loop.create_task(self._drain_then_exit(sig, frame)))
+
+            async def _drain_then_exit(self, sig: int, frame: Any) -> None:
+                await agent_server.drain()
+                super().handle_exit(sig, frame)
+
+            async def startup(self, sockets: Any = None) -> None:
+                self._drain_loop = asyncio.get_running_loop()
+                await super().startup(sockets=sockets)
+
+        options = {"log_level": "warning", "timeout_graceful_shutdown": self.drain_timeout, **uvicorn_options}
+        return _DrainingServer(uvicorn.Config(app, host=host, port=port, **options))
+
+
+def _load_api_keys(path: str) -> Dict[str, Dict[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        keys = json.load(f)
+    for key, grant in keys.items():
+        if not isinstance(grant, dict) or not grant.get("tenant"):
+            raise SystemExit(f"{path}: every API key needs a \"tenant\"")
+    return keys
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve ReactAgents over HTTP, SSE and WebSocket")
+    parser.add_argument("--agent", action="append", required=True, metavar="[NAME=]MODULE:ATTR",
+                        help="Agent to serve; may be repeated")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--queue-timeout", type=float, default=30.0)
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Pre-forked worker processes sharing the agents copy-on-write")
+    parser.add_argument("--max-requests", type=int, default=10_000,
+                        help="With --workers, recycle a worker after about this many requests (0 = never)")
+    parser.add_argument("--api-keys", metavar="FILE",
+                        help='JSON file {"<key>": {"tenant": ..., "priority": ...}}; requests need one of the keys')
+    args = parser.parse_args(argv)
+
+    agents: Dict[str, ReactAgent] = {}
+    for spec in args.agent:
+        name, _, target = spec.rpartition("=")
+        agents[name or target.rpartition(":")[2]] = load_agent(target)
+
+    server = AgentServer(
+        agents,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        queue_timeout=args.queue_timeout,
+        drain_timeout=args.drain_timeout,
+        identify=api_key_identity(_load_api_keys(args.api_keys)) if args.api_keys else None,
+    )
+    if args.workers > 1:
+        from .prefork import PreforkSupervisor
+
+        PreforkSupervisor(server, workers=args.workers, host=args.host, port=args.port,
+                          max_requests=args.max_requests or None).run()
+    else:
+        server.run(host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import asyncio
+import time
+
+# Events that carry incremental text and may be merged by coalesce_tokens
+TOKEN_EVENT_TYPES = frozenset({"llm_token", "final_answer_token"})
+
+
+class StreamEvent(Mapping):
+    """Read-only, dict-compatible run_stream event with fixed slots.
+
+    Token events (the vast majority) allocate no per-event dict; any other fields
+    live in `data`. event["type"], event.get("token") and dict(event) behave like
+    the plain dict events; use to_dict() before JSON encoding.
+    """
+
+    __slots__ = ("type", "iteration", "token", "section", "data")
+
+    def __init__(self, type: str, iteration: Optional[int] = None, token: Optional[str] = None,
+                 section: Optional[str] = None, data: Optional[Dict[str, Any]] = None):
+        self.type = type
+        self.iteration = iteration
+        self.token = token
+        self.section = section
+        self.data = data
+
+    @classmethod
+    def create(cls, type: str, **fields: Any) -> "StreamEvent":
+        iteration = fields.pop("iteration", None)
+        token = fields.pop("token", None)
+        section = fields.pop("section", None)
+        return cls(type, iteration, token, section, fields or None)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in ("type", "iteration", "token", "section"):
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.data is not None and key in self.data:
+            return self.data[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in ("type", "iteration", "token", "section"):
+            if getattr(self, key) is not None:
+                yield key
+        if self.data:
+            yield from self.data
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return f"StreamEvent({self.to_dict()!r})"
+
+
+def dict_event(type: str, **fields: Any) -> Dict[str, Any]:
+    return {"type": type, **fields}
+
+
+Event = Union[Dict[str, Any], StreamEvent]
+
+
+class _Coalescer:
+    """Buffers token events per (type, section, iteration); shared by coalesce_tokens
+    and acoalesce_tokens.
+
+    In "sections" mode final-answer text arrives as alternating llm_token and
+    final_answer_token events, so each kind has its own buffer rather than every
+    change of type forcing a flush. Buffers are released together, in the order they
+    were started.
+    """
+
+    def __init__(self, flush_ms: Optional[float], flush_chars: Optional[int]):
+        self.max_age = (flush_ms or 0) / 1000.0
+        self.flush_chars = flush_chars
+        # key -> [first event, text parts, length]
+        self.buffers: Dict[Tuple[Any, Any, Any], List[Any]] = {}
+        self.started = 0.0
+
+    def push(self, event: Event) -> List[Event]:
+        """Events ready to be yielded after `event` arrives."""
+        kind = event.get("type")
+        if kind not in TOKEN_EVENT_TYPES:
+            out = self.flush()
+            out.append(event)
+            return out
+        out: List[Event] = []
+        key = (kind, event.get("section"), event.get("iteration"))
+        entry = self.buffers.get(key)
+        if entry is None:
+            if any(other[0] == kind for other in self.buffers):
+                # Same type in a new section or iteration: the earlier text goes first
+                out.extend(self.flush())
+            if not self.buffers:
+                self.started = time.monotonic()
+            entry = self.buffers[key] = [event, [], 0]
+        token = event.get("token") or ""
+        entry[1].append(token)
+        entry[2] += len(token)
+        if (self.flush_chars and entry[2] >= self.flush_chars) or self.due_in() == 0.0:
+            out.extend(self.flush())
+        return out
+
+    def due_in(self) -> Optional[float]:
+        """Seconds until buffered text is flush_ms old; None if nothing is buffered or there is no age limit."""
+        if not self.buffers or not self.max_age:
+            return None
+        return max(0.0, self.started + self.max_age - time.monotonic())
+
+    def flush(self) -> List[Event]:
+        out: List[Event] = []
+        for first, parts, _ in self.buffers.values():
+            text = "".join(parts)
+            if isinstance(first, StreamEvent):
+                out.append(StreamEvent(first.type, first.iteration, text, first.section))
+            else:
+                out.append({**first, "token": text})
+        self.buffers = {}
+        return out
+
+
+def coalesce_tokens(events: Iterable[Event], flush_ms: Optional[float] = None,
+                    flush_chars: Optional[int] = None) -> Iterator[Event]:
+    """Merge consecutive token events of the same type and section.
+
+    Buffered text is released once it is `flush_ms` old or `flush_chars` long
+    (checked when the next token arrives), and always before any other event, so
+    ordering is preserved. In "sections" mode llm_token and final_answer_token text
+    is buffered separately, so both are merged. Fewer, larger events cut per-event CPU and framing
+    overhead for SSE/WebSocket fan-out; the generator still only advances when the
+    consumer asks for the next event.
+    """
+    coalescer = _Coalescer(flush_ms, flush_chars)
+    try:
+        try:
+            for event in events:
+                yield from coalescer.push(event)
+        except Exception:
+            # Text that arrived before the failure is still delivered
+            yield from coalescer.flush()
+            raise
+        yield from coalescer.flush()
+    finally:
+        close = getattr(events, "close", None)
+        if close is not None:
+            close()
+
+
+_READ_AHEAD = 256
+
+
+async def acoalesce_tokens(events: AsyncIterator[Event], flush_ms: Optional[float] = None,
+                           flush_chars: Optional[int] = None) -> AsyncIterator[Event]:
+    """Async counterpart of coalesce_tokens; closing it closes `events`.
+
+    Unlike the sync version, text is also released when it comes due while the
+    stream is stalled (e.g. during a provider pause). For that, `events` is read by
+    one task that stays at most `_READ_AHEAD` events ahead of the consumer.
+    """
+    coalescer = _Coalescer(flush_ms, flush_chars)
+    # A list and two events rather than asyncio.Queue, whose per-item cost dominates here
+    received: List[Event] = []
+    arrived = asyncio.Event()
+    drained = asyncio.Event()
+    finished = False
+    failure: Optional[BaseException] = None
+
+    async def pump() -> None:
+        nonlocal finished, failure
+        try:
+            async for event in events:
+                received.append(event)
+                arrived.set()
+                if len(received) >= _READ_AHEAD:
+                    drained.clear()
+                    await drained.wait()
+        except Exception as e:
+            failure = e
+        finally:
+            finished = True
+            arrived.set()
+
+    reader = asyncio.ensure_future(pump())
+    try:
+        while True:
+            if not received and not finished:
+                arrived.clear()
+                due = coalescer.due_in()
+                if due is None:
+                    await arrived.wait()
+                else:
+                    try:
+                        # Timing out only stops this wait; the stream itself is untouched
+                        async with asyncio.timeout(due):
+                            await arrived.wait()
+                    except TimeoutError:
+                        for ready in coalescer.flush():
+                            yield ready
+                        continue
+            # Take everything read so far in one go
+            batch = received[:]
+            received.clear()
+            drained.set()
+            for event in batch:
+                for ready in coalescer.push(event):
+                    yield ready
+            if finished and not received:
+                break
+        for ready in coalescer.flush():
+            yield ready
+        if failure is not None:
+            raise failure
+    finally:
+        if not reader.done():
+            # Cancelling the reader cancels the step in progress, aborting the model request
+            reader.cancel()
+        try:
+            await reader
+        except BaseException:
+            pass
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
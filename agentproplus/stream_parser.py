@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+# Section markers of the ReAct response format, mapped to section names
+MARKERS = {
+    "Thought:": "thought",
+    "Action:": "action",
+    "Final Answer:": "final_answer",
+    "PAUSE:": "pause",
+    "Observation:": "observation",
+}
+
+# Every proper prefix of a marker, for the per-token partial-marker check
+_MARKER_PREFIXES = frozenset(marker[:i] for marker in MARKERS for i in range(1, len(marker)))
+
+
+class SectionStreamParser:
+    """Classifies streamed ReAct output into sections as tokens arrive.
+
+    feed() returns (section, text) segments with the markers themselves removed.
+    Text that could be the start of a marker split across tokens ("Final Ans")
+    is held back until the next token decides it, so at most one marker's
+    length of text is delayed. Text before the first marker is "thought".
+    """
+
+    def __init__(self):
+        self.section = "thought"
+        self._pending = ""
+        self._at_section_start = True
+        self._max_marker = max(len(m) for m in MARKERS)
+        self.seen_final_answer = False
+
+    def feed(self, token: str) -> List[Tuple[str, str]]:
+        self._pending += token
+        segments: List[Tuple[str, str]] = []
+        while self._pending:
+            index, marker = self._find_marker(self._pending)
+            if marker is None:
+                keep = self._partial_marker_length(self._pending)
+                ready = self._pending[: len(self._pending) - keep]
+                self._pending = self._pending[len(ready):]
+                self._emit(segments, ready)
+                break
+            self._emit(segments, self._pending[:index])
+            self._pending = self._pending[index + len(marker):]
+            self.section = MARKERS[marker]
+            self._at_section_start = True
+            if self.section == "final_answer":
+                self.seen_final_answer = True
+        return segments
+
+    def flush(self) -> List[Tuple[str, str]]:
+        segments: List[Tuple[str, str]] = []
+        self._emit(segments, self._pending)
+        self._pending = ""
+        return segments
+
+    def _emit(self, segments: List[Tuple[str, str]], text: str) -> None:
+        if self._at_section_start:
+            text = text.lstrip()
+            if not text:
+                return
+            self._at_section_start = False
+        if not text:
+            return
+        if segments and segments[-1][0] == self.section:
+            segments[-1] = (self.section, segments[-1][1] + text)
+        else:
+            segments.append((self.section, text))
+
+    @staticmethod
+    def _find_marker(text: str):
+        best_index, best_marker = -1, None
+        for marker in MARKERS:
+            index = text.find(marker)
+            if index != -1 and (best_index == -1 or index < best_index):
+                best_index, best_marker = index, marker
+        return best_index, best_marker
+
+    def _partial_marker_length(self, text: str) -> int:
+        """Length of the longest suffix of text that is a proper prefix of some marker."""
+        for length in range(min(len(text), self._max_marker - 1), 0, -1):
+            if text[-length:] in _MARKER_PREFIXES:
+                return length
+        return 0
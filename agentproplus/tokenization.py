@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, List, Optional
+import hashlib
+import threading
+
+# Context window sizes (input + output tokens) by model-name prefix, longest match wins.
+# Pass context_window= to the model client for models not listed here.
+CONTEXT_WINDOWS = {
+    "gpt-4.1": 1_047_576,
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4-32k": 32_768,
+    "gpt-4": 8_192,
+    "gpt-3.5-turbo": 16_385,
+    "gpt-5": 400_000,
+    "o1": 200_000,
+    "o3": 200_000,
+    "o4": 200_000,
+    "claude": 200_000,
+    "gemini-1.5": 1_048_576,
+    "gemini-2": 1_048_576,
+    "llama-3.1": 131_072,
+    "llama-3.2": 131_072,
+    "llama-3.3": 131_072,
+    "mistral-large": 131_072,
+}
+
+
+def _base_model_name(model_name: Optional[str]) -> str:
+    # "openrouter/anthropic/claude-3.5-sonnet" -> "claude-3.5-sonnet"
+    return (model_name or "").rsplit("/", 1)[-1].lower()
+
+
+def context_window_for(model_name: Optional[str]) -> Optional[int]:
+    """Known context window of a model, or None when unknown."""
+    name = _base_model_name(model_name)
+    matches = [prefix for prefix in CONTEXT_WINDOWS if name.startswith(prefix)]
+    return CONTEXT_WINDOWS[max(matches, key=len)] if matches else None
+
+
+_COUNT_CACHE_SIZE = 1024
+
+
+class Tokenizer:
+    """Counts tokens for one model.
+
+    Uses tiktoken for OpenAI-style models, a locally cached Hugging Face tokenizer
+    for "org/model" names, and a ~4 characters per token estimate when neither is
+    available. The backend is loaded on first use, so creating clients stays cheap.
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name
+        self._backend: Any = None
+        self._kind: Optional[str] = None
+        self._lock = threading.Lock()
+        # Counts of recently seen texts by digest. The system prompt and history steps
+        # repeat on every iteration; whole prompts grow and would only fill the cache.
+        self._counts: "OrderedDict[bytes, int]" = OrderedDict()
+
+    @property
+    def kind(self) -> str:
+        self._load()
+        return self._kind  # type: ignore[return-value]
+
+    @property
+    def exact(self) -> bool:
+        """True when a real tokenizer is loaded; otherwise counts are estimates and encode() returns None."""
+        return self.kind != "estimate"
+
+    def _load(self) -> None:
+        if self._kind is not None:
+            return
+        with self._lock:
+            if self._kind is not None:
+                return
+            backend, kind = self._load_tiktoken() or self._load_hf() or (None, "estimate")
+            self._backend, self._kind = backend, kind
+
+    def _load_tiktoken(self) -> Optional[tuple]:
+        try:
+            import tiktoken
+        except ImportError:
+            return None
+        name = _base_model_name(self.model_name)
+        try:
+            return tiktoken.encoding_for_model(name), "tiktoken"
+        except KeyError:
+            pass
+        except Exception:
+            # Encoding files are fetched on first use; offline hosts fall through
+            return None
+        if "/" in (self.model_name or "") and not name.startswith(("gpt", "o1", "o3", "o4")):
+            return None  # leave other vendors' models to their own tokenizer
+        try:
+            modern = name.startswith(("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4"))
+            return tiktoken.get_encoding("o200k_base" if modern else "cl100k_base"), "tiktoken"
+        except Exception:
+            return None
+
+    def _load_hf(self) -> Optional[tuple]:
+        if not self.model_name or self.model_name.count("/") < 1:
+            return None
+        try:
+            from transformers import AutoTokenizer
+        except ImportError:
+            return None
+        # Provider prefixes like "huggingface/" are not part of the repo id
+        repo_id = "/".join(self.model_name.split("/")[-2:])
+        try:
+            return AutoTokenizer.from_pretrained(repo_id, local_files_only=True), "huggingface"
+        except Exception:
+            return None
+
+    def encode(self, text: str) -> Optional[List[int]]:
+        """Token ids of text, or None when no tokenizer is available (check `exact`)."""
+        self._load()
+        if self._kind == "tiktoken":
+            return self._backend.encode(text, disallowed_special=())
+        if self._kind == "huggingface":
+            return self._backend.encode(text, add_special_tokens=False)
+        return None
+
+    def count(self, text: Optional[str]) -> int:
+        if not text:
+            return 0
+        if not self.exact:
+            return len(text) // 4 + 1
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+                return count
+        count = len(self.encode(text) or ())
+        with self._lock:
+            self._counts[key] = count
+            if len(self._counts) > _COUNT_CACHE_SIZE:
+                self._counts.popitem(last=False)
+        return count
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """First max_tokens tokens of text (character-proportional when only estimating)."""
+        if max_tokens <= 0:
+            return ""
+        if not self.exact:
+            return text[: max_tokens * 4]
+        tokens = self.encode(text)
+        return text if len(tokens) <= max_tokens else self._backend.decode(tokens[:max_tokens])
+
+
+@lru_cache(maxsize=64)
+def get_tokenizer(model_name: Optional[str] = None) -> Tokenizer:
+    """Shared tokenizer per model name."""
+    return Tokenizer(model_name)
+
+
+def count_tokens(text: Optional[str], model_name: Optional[str] = None) -> int:
+    return get_tokenizer(model_name).count(text)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import math
+import re
+
+from pydantic import PrivateAttr
+
+from .tools.base_tool import Tool
+
+# Maps a batch of texts to embedding vectors, e.g. a wrapper around an embeddings API
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it of on or the this to what when where which who why with"
+    " me my you your please can could would should do does".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; snake_case, kebab-case and camelCase names are split into words."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text or "")
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in _STOPWORDS]
+
+
+def _tool_text(tool: Tool) -> str:
+    # Names and action types are repeated so they weigh more than long descriptions
+    return f"{tool.name} {tool.action_type} {tool.name} {tool.action_type} {tool.description}"
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents, precomputed at construction."""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs = [Counter(tokenize(doc)) for doc in documents]
+        self._lengths = [sum(doc.values()) for doc in self._docs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        df: Counter = Counter()
+        for doc in self._docs:
+            df.update(doc.keys())
+        n = len(self._docs)
+        self._idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+
+    def scores(self, query: str) -> List[float]:
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        results = []
+        for doc, length in zip(self._docs, self._lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / (self._avg_length or 1))
+            for term in terms:
+                tf = doc.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ToolRetriever:
+    """Ranks tools by relevance to a query using BM25 and, optionally, embeddings.
+
+    Tool texts are indexed (and embedded) once; with `embed` set, the final score
+    mixes normalized BM25 and cosine similarity by `embedding_weight`.
+    """
+
+    def __init__(self, tools: Sequence[Tool], embed: Optional[EmbedFn] = None, embedding_weight: float = 0.5):
+        self.tools = list(tools)
+        self.embed = embed
+        self.embedding_weight = embedding_weight
+        texts = [_tool_text(tool) for tool in self.tools]
+        self._bm25 = BM25Index(texts)
+        self._vectors: Optional[List[List[float]]] = None
+        if embed is not None and texts:
+            try:
+                self._vectors = embed(texts)
+            except Exception as e:
+                print(f"⚠️ Tool embedding failed, using BM25 only: {e}")
+
+    def rank(self, query: str) -> List[Tuple[Tool, float]]:
+        scores = self._bm25.scores(query)
+        top = max(scores, default=0.0)
+        if top > 0:
+            scores = [s / top for s in scores]
+        if self._vectors is not None:
+            try:
+                query_vector = self.embed([query])[0]  # type: ignore[misc]
+                similarities = [_cosine(query_vector, v) for v in self._vectors]
+                w = self.embedding_weight
+                scores = [(1 - w) * s + w * sim for s, sim in zip(scores, similarities)]
+            except Exception as e:
+                print(f"⚠️ Query embedding failed, using BM25 only: {e}")
+        # Stable sort keeps registration order among equally relevant tools
+        order = sorted(range(len(self.tools)), key=lambda i: -scores[i])
+        return [(self.tools[i], scores[i]) for i in order]
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tool]:
+        return [tool for tool, score in self.rank(query)[:k] if score > min_score]
+
+
+class SearchToolsTool(Tool):
+    """Meta-tool that lets the agent look up tools left out of its prompt."""
+
+    name: str = "Tool Search"
+    description: str = (
+        "Finds more tools by keyword when none of the listed tools fits the task. "
+        "Any tool it returns can then be used with its action type."
+    )
+    action_type: str = "search_tools"
+    input_format: str = "Keywords describing the capability you need. Example: 'stock price history'"
+
+    _retriever: ToolRetriever = PrivateAttr()
+    _k: int = PrivateAttr(default=5)
+
+    def __init__(self, retriever: ToolRetriever, k: int = 5, **data: Any):
+        super().__init__(**data)
+        self._retriever = retriever
+        self._k = k
+
+    def run(self, input_text: Any) -> str:
+        query = input_text if isinstance(input_text, str) else str(input_text)
+        matches = self._retriever.search(query, self._k)
+        if not matches:
+            return "No matching tools found. Try different keywords."
+        return "\n".join(tool.get_tool_description() for tool in matches)
+
+
+def select_tools(
+    retriever: ToolRetriever, query: str, k: int, pinned: Sequence[Tool] = ()
+) -> List[Tool]:
+    """Pinned tools plus the top-k retrieved tools for the query, without duplicates."""
+    selected: Dict[str, Tool] = {tool.action_type: tool for tool in pinned}
+    for tool in retriever.search(query, k):
+        selected.setdefault(tool.action_type, tool)
+    if len(selected) == len(pinned):
+        # Nothing matched: fall back to the first tools so the agent is never tool-less
+        for tool in retriever.tools[:k]:
+            selected.setdefault(tool.action_type, tool)
+    return list(selected.values())
@@ -1,12 +1,36 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .base_tool import Tool
-from .duckduckgo_tool import QuickInternetTool
-from .calculator_tool import CalculateTool
-from .userinput_tool import UserInputTool
-from .ares_tool import AresInternetTool
-from .yfinance_tool import YFinanceTool
-from .traversaalpro_rag_tool import TraversaalProRAGTool
-from .slide_generation_tool import SlideGenerationTool
-from .mcp_tool import MCPTool
+
+if TYPE_CHECKING:
+    from .duckduckgo_tool import QuickInternetTool
+    from .calculator_tool import CalculateTool
+    from .userinput_tool import UserInputTool
+    from .ares_tool import AresInternetTool
+    from .yfinance_tool import YFinanceTool
+    from .traversaalpro_rag_tool import TraversaalProRAGTool
+    from .slide_generation_tool import SlideGenerationTool
+    from .mcp_tool import MCPTool
+    from .registry import ToolSpec, LazyTool, ToolRegistry, get_tool, register_tool
+
+# Tool modules (and their yfinance / python-pptx / duckduckgo-search dependencies)
+# are imported on first attribute access
+_LAZY_TOOLS = {
+    "QuickInternetTool": ".duckduckgo_tool",
+    "CalculateTool": ".calculator_tool",
+    "UserInputTool": ".userinput_tool",
+    "AresInternetTool": ".ares_tool",
+    "YFinanceTool": ".yfinance_tool",
+    "TraversaalProRAGTool": ".traversaalpro_rag_tool",
+    "SlideGenerationTool": ".slide_generation_tool",
+    "MCPTool": ".mcp_tool",
+    "ToolSpec": ".registry",
+    "LazyTool": ".registry",
+    "ToolRegistry": ".registry",
+    "get_tool": ".registry",
+    "register_tool": ".registry",
+}
 
 __all__ = [
     "Tool",
@@ -16,6 +40,24 @@ __all__ = [
     "AresInternetTool",
     "YFinanceTool",
     "TraversaalProRAGTool",
-    "SlideGenerationTool"
-    ,"MCPTool"
+    "SlideGenerationTool",
+    "MCPTool",
+    "ToolSpec",
+    "LazyTool",
+    "ToolRegistry",
+    "get_tool",
+    "register_tool",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_TOOLS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
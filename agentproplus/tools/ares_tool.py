@@ -7,11 +7,14 @@ import requests
 import json
 import os
 
+from ..http_client import arequest, get_session
+
 class AresInternetTool(Tool):
     name: str = "Ares Internet Search"
     description: str = "Uses Ares API to search live and detailed information from the internet and returns a clean summary and related links."
     action_type: str = "ares_internet_search"
     input_format: str = "A search query as a string. Example: 'Best restaurants in San Francisco'"
+    coalesce = True
 
     _config: Dict[str, Any] = PrivateAttr()
 
@@ -21,7 +24,8 @@ class AresInternetTool(Tool):
             "api_key": api_key or os.getenv("ARES_API_KEY")
         }
 
-    def run(self, input_text: Any) -> str:
+    def _request(self, input_text: Any) -> Any:
+        """Build the POST arguments shared by run() and arun(), or return an error message."""
         if not isinstance(input_text, str):
             return "❌ Error: Expected a search query string."
 
@@ -30,39 +34,65 @@ class AresInternetTool(Tool):
         if not api_key:
             return "❌ Error: Ares API key is missing. Please provide it during initialization or set the ARES_API_KEY environment variable."
 
-        api_url = "https://api-ares.traversaal.ai/live/predict"
         prompt = input_text.strip("'\"")
-        payload = {"query": [prompt]}
-        headers = {
-            "x-api-key": api_key,
-            "content-type": "application/json"
+        return {
+            "url": "https://api-ares.traversaal.ai/live/predict",
+            "json": {"query": [prompt]},
+            "headers": {
+                "x-api-key": api_key,
+                "content-type": "application/json"
+            },
         }
 
-        try:
-            response = requests.post(api_url, json=payload, headers=headers, timeout=30)
+    def _format(self, response: Any) -> str:
+        if response.status_code != 200:
+            return f"Error: Ares API returned {response.status_code} - {response.text}"
 
-            if response.status_code != 200:
-                return f"Error: Ares API returned {response.status_code} - {response.text}"
+        result = response.json()
 
-            result = response.json()
+        response_text = result.get("data", {}).get("response_text", "").strip()
+        web_urls = result.get("data", {}).get("web_url", [])
 
-            response_text = result.get("data", {}).get("response_text", "").strip()
-            web_urls = result.get("data", {}).get("web_url", [])
+        if not response_text:
+            return "No information found for this query. Please try a different search term."
 
-            if not response_text:
-                return "No information found for this query. Please try a different search term."
+        output = f"Search Summary:\n{response_text}\n\n"
 
-            output = f"Search Summary:\n{response_text}\n\n"
+        if web_urls:
+            output += "Related Links:\n"
+            for idx, url in enumerate(web_urls, 1):
+                output += f"{idx}. {url}\n"
 
-            if web_urls:
-                output += "Related Links:\n"
-                for idx, url in enumerate(web_urls, 1):
-                    output += f"{idx}. {url}\n"
+        return output.strip()
 
-            return output.strip()
+    def run(self, input_text: Any) -> str:
+        request = self._request(input_text)
+        if isinstance(request, str):
+            return request
+
+        try:
+            response = get_session().post(**request)
+            return self._format(response)
 
         except requests.exceptions.RequestException as e:
             return f"Error: HTTP request failed - {e}"
 
         except Exception as e:
-            return f"Error: Unexpected error - {e}"
\ No newline at end of file
+            return f"Error: Unexpected error - {e}"
+
+    async def arun(self, input_text: Any) -> str:
+        import httpx
+
+        request = self._request(input_text)
+        if isinstance(request, str):
+            return request
+
+        try:
+            response = await arequest("POST", **request)
+            return self._format(response)
+
+        except httpx.HTTPError as e:
+            return f"Error: HTTP request failed - {e}"
+
+        except Exception as e:
+            return f"Error: Unexpected error - {e}"
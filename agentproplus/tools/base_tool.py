@@ -1,10 +1,11 @@
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, ClassVar, Hashable
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, PrivateAttr
+import asyncio
 import math
-import requests
 import json
 import os
+import hashlib
 
 # Base Tool class
 class Tool(ABC, BaseModel):
@@ -13,10 +14,37 @@ class Tool(ABC, BaseModel):
     action_type: str
     input_format: str  # <<< NEW FIELD
 
+    # Read-only tools may share one in-flight execution between identical concurrent calls
+    coalesce: ClassVar[bool] = False
+
     @abstractmethod
     def run(self, input_text: Any) -> str:
         pass
 
+    async def arun(self, input_text: Any) -> str:
+        """Async variant of run(); runs it on a worker thread unless a tool overrides it.
+
+        Cancelling the caller stops waiting at once, but a blocking run() cannot be
+        interrupted and finishes in the background. Tools with async I/O override this.
+        """
+        return await asyncio.to_thread(self.run, input_text)
+
+    def coalescing_key(self, input_text: Any) -> Optional[Hashable]:
+        """Key under which identical concurrent calls are coalesced, or None to always run.
+
+        Private `_config` (API keys, document scopes) is folded in as a digest so calls
+        made with different credentials never share results.
+        """
+        if not self.coalesce:
+            return None
+        try:
+            canonical_input = json.dumps(input_text, sort_keys=True, default=str)
+            config = getattr(self, "_config", None)
+            scope = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest() if config else ""
+        except Exception:
+            return None
+        return (self.action_type, scope, canonical_input)
+
     def get_tool_description(self) -> str:
         return (
             f"Tool: {self.name}\n"
@@ -3,7 +3,6 @@ from typing import Any, Optional, Dict
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, PrivateAttr
 import math
-import requests
 import json
 import os
 
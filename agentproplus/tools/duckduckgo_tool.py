@@ -3,17 +3,17 @@ from typing import Any, Optional, Dict
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, PrivateAttr
 import math
-import requests
 import json
 import os
 
-# Try importing DuckDuckGo Search
-try:
-    from duckduckgo_search import DDGS
-    DDGS_AVAILABLE = True
-except ImportError:
-    DDGS_AVAILABLE = False
-    print("Warning: duckduckgo-search not installed. Using mock search instead.")
+def _create_ddgs() -> Optional[Any]:
+    # Imported on first use; duckduckgo-search is slow to import
+    try:
+        from duckduckgo_search import DDGS
+    except ImportError:
+        print("Warning: duckduckgo-search not installed. Using mock search instead.")
+        return None
+    return DDGS()
 
 
 # DuckDuckGo search tool
@@ -22,16 +22,17 @@ class QuickInternetTool(Tool):
     description: str = "Searches internet quickly using DuckDuckGo for a given query and returns top 5 results."
     action_type: str = "search"
     input_format: str = "A search query as a string. Example: 'Latest advancements in AI'"
+    coalesce = True
 
     ddg: Optional[Any] = None  # Important: Declare ddg properly for Pydantic
-
-    def __init__(self, **data):
-        super().__init__(**data)
-        # Set ddg safely even with BaseModel
-        object.__setattr__(self, 'ddg', DDGS() if DDGS_AVAILABLE else None)
+    _ddg_loaded: bool = PrivateAttr(default=False)
 
     def run(self, input_text: Any) -> str:
         query = input_text
+        if not self._ddg_loaded:
+            # Set ddg safely even with BaseModel
+            object.__setattr__(self, 'ddg', _create_ddgs())
+            self._ddg_loaded = True
         if not self.ddg:
             return f"Mock search results for: {query}\n1. Sample Result\n2. Another Result"
 
@@ -1,5 +1,6 @@
 from typing import Any, Optional, Dict
 from .base_tool import Tool
+from ..mcp_schema import coerce_arguments, validate_arguments
 
 
 class MCPTool(Tool):
@@ -11,8 +12,10 @@ class MCPTool(Tool):
     _server_id: str
     _tool_name: str
     _manager: Any
+    _input_schema: Optional[Dict[str, Any]]
 
-    def __init__(self, *, server_id: str, tool_name: str, description: str, input_format: str, manager: Any):
+    def __init__(self, *, server_id: str, tool_name: str, description: str, input_format: str, manager: Any,
+                 input_schema: Optional[Dict[str, Any]] = None):
         super().__init__(
             name=f"{tool_name} (MCP:{server_id})",
             description=description,
@@ -22,15 +25,41 @@ class MCPTool(Tool):
         self._server_id = server_id
         self._tool_name = tool_name
         self._manager = manager
+        self._input_schema = input_schema
+
+    def _arguments(self, input_text: Any) -> Dict[str, Any]:
+        """Coerce the action input and validate it locally; raises ValueError on a schema mismatch."""
+        arguments = coerce_arguments(input_text, self._input_schema)
+        errors = validate_arguments(arguments, self._input_schema)
+        if errors:
+            raise ValueError("; ".join(errors))
+        return arguments
 
     def run(self, input_text: Any) -> str:
-        # Expect dict-like arguments; pass through as-is
         if not hasattr(self._manager, "call_tool"):
             return "MCP manager is not available or not started."
-        arguments: Dict[str, Any] = input_text if isinstance(input_text, dict) else {"input": input_text}
+        # Bad arguments are rejected here, without a round trip to the server
+        try:
+            arguments = self._arguments(input_text)
+        except ValueError as e:
+            return f"Invalid arguments for MCP tool '{self._tool_name}': {e}. Input format: {self.input_format}"
         try:
             result = self._manager.call_tool(self._server_id, self._tool_name, arguments)
         except Exception as e:
             return f"Error calling MCP tool '{self._tool_name}': {e}"
         return str(result)
 
+    async def arun(self, input_text: Any) -> str:
+        """Async variant; concurrent calls are multiplexed over the manager's session."""
+        if not hasattr(self._manager, "acall_tool"):
+            return "MCP manager is not available or not started."
+        try:
+            arguments = self._arguments(input_text)
+        except ValueError as e:
+            return f"Invalid arguments for MCP tool '{self._tool_name}': {e}. Input format: {self.input_format}"
+        try:
+            result = await self._manager.acall_tool(self._server_id, self._tool_name, arguments)
+        except Exception as e:
+            return f"Error calling MCP tool '{self._tool_name}': {e}"
+        return str(result)
+
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type, Union
+import threading
+
+from pydantic import PrivateAttr
+
+from .base_tool import Tool
+
+# Third-party packages expose tools under this entry point group, e.g. in pyproject.toml:
+#   [project.entry-points."agentproplus.tools"]
+#   weather = "my_package.specs:WEATHER"   # a ToolSpec (preferred) or a Tool subclass
+ENTRY_POINT_GROUP = "agentproplus.tools"
+
+
+class ToolSpec:
+    """Where a tool lives and how it is looked up, without constructing it.
+
+    `target` is a "module:ClassName" path. Metadata that is not passed (name,
+    description, input format, action type) is read from the class' field defaults
+    when first needed, so it always matches the class. Tool modules import their
+    heavy dependencies inside run(), so reading it stays cheap.
+    """
+
+    _FIELDS = ("name", "action_type", "description", "input_format")
+
+    def __init__(
+        self,
+        target: str,
+        name: Optional[str] = None,
+        action_type: Optional[str] = None,
+        description: Optional[str] = None,
+        input_format: Optional[str] = None,
+        aliases: Sequence[str] = (),
+    ):
+        self.target = target
+        self.aliases = tuple(aliases)
+        given = dict(name=name, action_type=action_type, description=description, input_format=input_format)
+        self._given = {field: value for field, value in given.items() if value is not None}
+        self._defaults: Optional[Dict[str, Any]] = None
+
+    def _field(self, field: str) -> Any:
+        if field in self._given:
+            return self._given[field]
+        if self._defaults is None:
+            fields = self.load_class().model_fields
+            self._defaults = {f: fields[f].default for f in self._FIELDS}
+        return self._defaults[field]
+
+    @property
+    def name(self) -> str:
+        return self._field("name")
+
+    @property
+    def action_type(self) -> str:
+        return self._field("action_type")
+
+    @property
+    def description(self) -> str:
+        return self._field("description")
+
+    @property
+    def input_format(self) -> str:
+        return self._field("input_format")
+
+    def get_tool_description(self) -> str:
+        return (
+            f"Tool: {self.name}\n"
+            f"Description: {self.description}\n"
+            f"Action Type: {self.action_type}\n"
+            f"Input Format: {self.input_format}\n"
+        )
+
+    def load_class(self) -> Type[Tool]:
+        module_name, _, class_name = self.target.partition(":")
+        return getattr(import_module(module_name), class_name)
+
+    def create(self, **kwargs: Any) -> Tool:
+        return self.load_class()(**kwargs)
+
+    @classmethod
+    def from_class(cls, tool_class: Type[Tool], aliases: Sequence[str] = ()) -> "ToolSpec":
+        """Build a spec from a Tool subclass' field defaults (imports the implementation)."""
+        fields = tool_class.model_fields
+        return cls(
+            target=f"{tool_class.__module__}:{tool_class.__name__}",
+            name=fields["name"].default,
+            action_type=fields["action_type"].default,
+            description=fields["description"].default,
+            input_format=fields["input_format"].default,
+            aliases=aliases,
+        )
+
+
+class LazyTool(Tool):
+    """Registers a tool under its spec's metadata and builds the real tool on first use.
+
+    Constructor kwargs can change the metadata (e.g. TraversaalProRAGTool's
+    document_names changes its description), so with kwargs the tool is built at once.
+    """
+
+    _spec: ToolSpec = PrivateAttr()
+    _init_kwargs: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _instance: Optional[Tool] = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, spec: ToolSpec, **init_kwargs: Any):
+        instance = spec.create(**init_kwargs) if init_kwargs else None
+        source: Union[Tool, ToolSpec] = instance if instance is not None else spec
+        super().__init__(
+            name=source.name,
+            description=source.description,
+            action_type=source.action_type,
+            input_format=source.input_format,
+        )
+        self._spec = spec
+        self._init_kwargs = init_kwargs
+        self._instance = instance
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def get_instance(self) -> Tool:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._spec.create(**self._init_kwargs)
+        return self._instance
+
+    def coalescing_key(self, input_text: Any):
+        return self.get_instance().coalescing_key(input_text)
+
+    def run(self, input_text: Any) -> str:
+        return self.get_instance().run(input_text)
+
+
+class ToolRegistry:
+    """Name -> ToolSpec lookup fed by the built-in specs and installed entry points."""
+
+    def __init__(self):
+        self._specs: Dict[str, ToolSpec] = {}
+        self._lock = threading.Lock()
+        self._discovered = False
+
+    def register(self, spec: ToolSpec) -> None:
+        # Names read from the class are matched in get_spec, so registering imports nothing
+        keys = [spec.action_type, *spec.aliases]
+        if "name" in spec._given:
+            keys.append(spec.name)
+        with self._lock:
+            for key in keys:
+                self._specs[key.lower()] = spec
+
+    def discover(self) -> None:
+        """Register built-in tools and every tool published under ENTRY_POINT_GROUP."""
+        if self._discovered:
+            return
+        from . import specs
+
+        for spec in specs.BUILTIN_SPECS:
+            self.register(spec)
+
+        from importlib.metadata import entry_points
+
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                for spec in self._as_specs(ep.load(), ep.name):
+                    self.register(spec)
+            except Exception as e:
+                print(f"⚠️ Failed to load tool entry point '{ep.name}': {e}")
+        self._discovered = True
+
+    @staticmethod
+    def _as_specs(obj: Any, entry_name: str) -> Iterable[ToolSpec]:
+        if isinstance(obj, ToolSpec):
+            return [obj]
+        if isinstance(obj, type) and issubclass(obj, Tool):
+            return [ToolSpec.from_class(obj, aliases=[entry_name])]
+        if isinstance(obj, (list, tuple)):
+            return [spec for item in obj for spec in ToolRegistry._as_specs(item, entry_name)]
+        raise TypeError(f"expected ToolSpec or Tool subclass, got {type(obj).__name__}")
+
+    def get_spec(self, name: str) -> ToolSpec:
+        self.discover()
+        spec = self._specs.get(name.lower())
+        if spec is None:
+            spec = next((s for s in self.specs() if s.name.lower() == name.lower()), None)
+        if spec is None:
+            raise KeyError(f"Unknown tool '{name}'. Available: {', '.join(self.names())}")
+        return spec
+
+    def specs(self) -> List[ToolSpec]:
+        self.discover()
+        unique: Dict[str, ToolSpec] = {}
+        for spec in self._specs.values():
+            unique.setdefault(spec.action_type, spec)
+        return list(unique.values())
+
+    def names(self) -> List[str]:
+        return sorted(spec.action_type for spec in self.specs())
+
+    def create(self, name: str, lazy: bool = True, **kwargs: Any) -> Tool:
+        spec = self.get_spec(name)
+        return LazyTool(spec, **kwargs) if lazy else spec.create(**kwargs)
+
+
+default_tool_registry = ToolRegistry()
+
+
+def register_tool(spec: ToolSpec) -> None:
+    default_tool_registry.register(spec)
+
+
+def get_tool(name: str, lazy: bool = True, **kwargs: Any) -> Tool:
+    """Create a tool by action type, name or alias; by default it loads on first run."""
+    return default_tool_registry.create(name, lazy=lazy, **kwargs)
+
+
+def resolve_tools(tools: Iterable[Union[Tool, str, ToolSpec]]) -> List[Tool]:
+    """Turn a mixed list of Tool instances, tool names and specs into Tool objects."""
+    resolved: List[Tool] = []
+    for tool in tools:
+        if isinstance(tool, str):
+            resolved.append(get_tool(tool))
+        elif isinstance(tool, ToolSpec):
+            resolved.append(LazyTool(tool))
+        else:
+            resolved.append(tool)
+    return resolved
@@ -1,10 +1,8 @@
 from .base_tool import Tool
-from pptx import Presentation
 from typing import Any, Optional
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
 import math
-import requests
 import json
 import os
 
@@ -45,6 +43,8 @@ class SlideGenerationTool(Tool):
                 filename += '.pptx'
             
             # Create presentation
+            from pptx import Presentation  # imported on first use
+
             prs = Presentation()
             
             # Add title slide
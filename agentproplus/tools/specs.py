@@ -0,0 +1,22 @@
+# Where the built-in tools live. Only the lookup keys (action type and aliases) are
+# given here; name, description and input format are read from each Tool class, whose
+# module defers yfinance, python-pptx, duckduckgo-search, ... until the tool runs.
+from .registry import ToolSpec
+
+QUICK_INTERNET = ToolSpec("agentproplus.tools.duckduckgo_tool:QuickInternetTool", action_type="search", aliases=["duckduckgo"])
+CALCULATOR = ToolSpec("agentproplus.tools.calculator_tool:CalculateTool", action_type="calculate")
+USER_INPUT = ToolSpec("agentproplus.tools.userinput_tool:UserInputTool", action_type="request_user_input", aliases=["user_input"])
+ARES_INTERNET = ToolSpec("agentproplus.tools.ares_tool:AresInternetTool", action_type="ares_internet_search", aliases=["ares"])
+YFINANCE = ToolSpec("agentproplus.tools.yfinance_tool:YFinanceTool", action_type="fetch_stock_info", aliases=["yfinance"])
+TRAVERSAAL_PRO_RAG = ToolSpec("agentproplus.tools.traversaalpro_rag_tool:TraversaalProRAGTool", action_type="traversaalpro_rag")
+SLIDE_GENERATION = ToolSpec("agentproplus.tools.slide_generation_tool:SlideGenerationTool", action_type="ppt_generate", aliases=["slides"])
+
+BUILTIN_SPECS = [
+    QUICK_INTERNET,
+    CALCULATOR,
+    USER_INPUT,
+    ARES_INTERNET,
+    YFINANCE,
+    TRAVERSAAL_PRO_RAG,
+    SLIDE_GENERATION,
+]
@@ -5,11 +5,14 @@ from pydantic import PrivateAttr
 import requests
 import os
 
+from ..http_client import arequest, get_session
+
 class TraversaalProRAGTool(Tool):
     name: str = "Traversaal Pro RAG"
     action_type: str = "traversaalpro_rag"
     input_format: str = "A query string for document search. Example: 'chemical safety protocol'"
     description: str = "Searches documents using the Traversaal Pro RAG API and returns a context-aware answer and document excerpts."
+    coalesce = True
 
     _config: Dict[str, Any] = PrivateAttr()
 
@@ -28,8 +31,8 @@ class TraversaalProRAGTool(Tool):
         }
         
 
-    def run(self, input_text: Any) -> str:
-            
+    def _request(self, input_text: Any) -> Any:
+        """Build the POST arguments shared by run() and arun(), or return an error message."""
         if not isinstance(input_text, str):
             return "❌ Error: Expected a query string. Example: 'chemical safety protocol'"
 
@@ -40,20 +43,27 @@ class TraversaalProRAGTool(Tool):
         if not api_key:
             return "❌ Error: API key is required. Provide it during initialization or set TRAVERSAAL_PRO_API_KEY environment variable."
 
-        url = "https://pro-documents.traversaal-api.com/documents/search"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
+        return {
+            "url": "https://pro-documents.traversaal-api.com/documents/search",
+            "headers": {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            "json": {
+                "query": input_text.strip("'\""),
+                "rag": False
+            },
+            "timeout": timeout,
         }
 
-        payload = {
-            "query": input_text.strip("'\""),
-            "rag": False
-        }
+    def run(self, input_text: Any) -> str:
+        request = self._request(input_text)
+        if isinstance(request, str):
+            return request
 
         try:
-            # Added timeout parameter to the request
-            response = requests.post(url, headers=headers, json=payload, timeout=timeout)
+            # Pooled session reuses keep-alive connections across calls
+            response = get_session().post(**request)
             response.raise_for_status()  # This will raise an exception for HTTP error codes
 
             result = response.json()
@@ -90,3 +100,24 @@ class TraversaalProRAGTool(Tool):
             return f"❌ HTTP Request Error: {e}"
         except Exception as e:
             return f"❌ Unexpected Error: {e}"
+
+    async def arun(self, input_text: Any) -> str:
+        import httpx
+
+        request = self._request(input_text)
+        if isinstance(request, str):
+            return request
+
+        try:
+            response = await arequest("POST", **request)
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.TimeoutException:
+            return "❌ Error: The request timed out. Please try again later or with a simpler query."
+        except httpx.HTTPStatusError as e:
+            return f"❌ API Error: {e.response.status_code} - {e.response.text}"
+        except httpx.HTTPError as e:
+            return f"❌ HTTP Request Error: {e}"
+        except Exception as e:
+            return f"❌ Unexpected Error: {e}"
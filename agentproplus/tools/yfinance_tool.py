@@ -1,5 +1,4 @@
 from .base_tool import Tool
-import yfinance as yf
 from typing import Any
 import json
 
@@ -11,6 +10,7 @@ class YFinanceTool(Tool):
         "A JSON with 'ticker' and optional 'detail_level' ('basic' or 'extended').\n"
         "Example: {\"ticker\": \"AAPL\", \"detail_level\": \"extended\"}"
     )
+    coalesce = True
 
     def run(self, input_text: Any) -> str:
         if isinstance(input_text, str):
@@ -22,6 +22,8 @@ class YFinanceTool(Tool):
         if not isinstance(input_text, dict) or "ticker" not in input_text:
             return "❌ Error: Missing 'ticker' field in input."
 
+        import yfinance as yf  # imported on first use; it pulls in pandas
+
         ticker_symbol = input_text["ticker"].strip().upper()
         detail_level = input_text.get("detail_level", "basic").lower()
 
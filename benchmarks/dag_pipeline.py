@@ -0,0 +1,101 @@
+"""
+Benchmark for agentproplus.orchestration.
+
+Runs the seven-step PHP migration pipeline of the team-blackbeak cookbook app
+(audit, security, migrate, test, extract_files, integration, doc) with simulated
+model latency (no network, no API key). It compares running the steps one after
+another, running them as a DAG, and re-running the DAG with a warm node cache.
+
+Run:
+    python benchmarks/dag_pipeline.py
+    python benchmarks/dag_pipeline.py --latency-ms 500 --max-parallel 2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agentproplus.model import ModelClient  # noqa: E402
+from agentproplus.orchestration import AgentDAG, InMemoryNodeCache  # noqa: E402
+from agentproplus.react_agent import ReactAgent  # noqa: E402
+
+STEPS = ["audit", "security", "migrate", "test", "extract_files", "integration", "doc"]
+# Dependencies of each step; the app runs them in the order above regardless
+DEPS = {
+    "audit": ["php"],
+    "security": ["php"],
+    "migrate": ["php"],
+    "test": ["migrate"],
+    "extract_files": ["migrate"],
+    "integration": ["extract_files"],
+    "doc": ["migrate"],
+}
+
+
+class SimulatedModel(ModelClient):
+    """Answers every prompt after a fixed delay."""
+
+    def __init__(self, name: str, latency: float):
+        super().__init__(model_name=f"simulated-{name}")
+        self.name = name
+        self.latency = latency
+
+    async def achat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        await asyncio.sleep(self.latency)
+        yield {"token": f"Thought: Done.\nFinal Answer: {self.name} output ({len(user_prompt)} prompt chars)"}
+
+
+def build(agents: dict, max_parallel: int, cache: InMemoryNodeCache) -> AgentDAG:
+    dag = AgentDAG(max_parallel=max_parallel, cache=cache)
+    for step in STEPS:
+        dag.add_agent(step, agents[step], deps=DEPS[step])
+    return dag
+
+
+async def sequential(agents: dict, php: str) -> None:
+    outputs = {"php": php}
+    for step in STEPS:
+        stream = agents[step].clone().arun_stream("\n\n".join(str(outputs[d]) for d in DEPS[step]))
+        async for event in stream:
+            if event["type"] == "complete":
+                outputs[step] = event["response"]["final_answer"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the agent DAG orchestrator")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Simulated latency per agent call")
+    parser.add_argument("--max-parallel", type=int, default=4)
+    args = parser.parse_args()
+
+    agents = {step: ReactAgent(model=SimulatedModel(step, args.latency_ms / 1000), tools=[]) for step in STEPS}
+    php = "<?php echo 'hello'; ?>"
+    cache = InMemoryNodeCache()
+
+    # The agent's debug output would swamp the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        asyncio.run(sequential(agents, php))
+        seq = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build(agents, args.max_parallel, cache).run({"php": php})
+        dag = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rerun = build(agents, args.max_parallel, cache).run({"php": php})
+        cached = time.perf_counter() - start
+
+    print(f"sequential: {seq * 1000:.0f} ms")
+    print(f"DAG (max_parallel={args.max_parallel}): {dag * 1000:.0f} ms ({seq / dag:.1f}x)")
+    print(f"DAG re-run, unchanged input: {cached * 1000:.1f} ms ({len(rerun.cached)}/{len(STEPS)} nodes cached)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Import-time benchmark for agentproplus.
+
+Measures a cold `import agentproplus` (plus the public names most scripts touch) in
+fresh interpreters and fails if it exceeds the budget or if any heavy dependency
+that should load lazily is already imported.
+
+Run:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 600 --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that must only be imported on first use
+LAZY_MODULES = [
+    "openai",
+    "litellm",
+    "httpx",
+    "requests",
+    "yfinance",
+    "pptx",
+    "duckduckgo_search",
+    "mcp",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import agentproplus
+from agentproplus import ReactAgent, create_model
+from agentproplus.tools import Tool, CalculateTool
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def measure_once() -> dict:
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=repo_root,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark agentproplus import time")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to sample")
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="Fail if the median exceeds this")
+    args = parser.parse_args()
+
+    samples = [measure_once() for _ in range(args.runs)]
+    timings = [s["ms"] for s in samples]
+    loaded = sorted({m for s in samples for m in s["loaded"]})
+    median = statistics.median(timings)
+
+    print(f"import agentproplus: median {median:.1f} ms, min {min(timings):.1f} ms over {args.runs} runs")
+
+    failed = False
+    if loaded:
+        print(f"❌ Eagerly imported heavy modules: {', '.join(loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"❌ Median import time {median:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("✅ Import time within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
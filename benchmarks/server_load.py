@@ -0,0 +1,142 @@
+"""
+Load benchmark for agentproplus.server.
+
+Starts an AgentServer on a local port with a simulated streaming model (no network,
+no API key) and fires concurrent SSE requests at it. It reports time to first token,
+end-to-end latency, throughput and how many requests were rejected by admission
+control.
+
+Run:
+    python benchmarks/server_load.py
+    python benchmarks/server_load.py --requests 500 --concurrency 200 --max-concurrency 64 --max-queue 64
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agentproplus.model import ModelClient  # noqa: E402
+from agentproplus.react_agent import ReactAgent  # noqa: E402
+from agentproplus.server import AgentServer  # noqa: E402
+
+
+class SimulatedModel(ModelClient):
+    """Streams a fixed final answer, one token every `token_delay` seconds."""
+
+    def __init__(self, tokens: int, token_delay: float):
+        super().__init__(model_name="simulated")
+        self.text = "Thought: I know this.\nFinal Answer: " + " ".join(f"word{i}" for i in range(tokens))
+        self.token_delay = token_delay
+
+    async def achat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        for piece in self.text.split(" "):
+            await asyncio.sleep(self.token_delay)
+            yield {"token": piece + " "}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def one_request(host: str, port: int, path: str, results: dict) -> None:
+    # A raw HTTP/1.1 client keeps client-side CPU out of the measurement
+    body = b'{"query": "hi", "stream_mode": "final_answer"}'
+    request = (
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+    ).encode() + body
+    start = time.perf_counter()
+    first_token = None
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(request)
+        status_line = await reader.readline()
+        if b" 200 " not in status_line:
+            results["rejected"] += 1
+            return
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            if first_token is None and b"event: final_answer_token" in chunk:
+                first_token = time.perf_counter() - start
+    finally:
+        writer.close()
+    results["ttft"].append(first_token or 0.0)
+    results["latency"].append(time.perf_counter() - start)
+
+
+async def load(host: str, port: int, path: str, total: int, concurrency: int) -> dict:
+    results = {"ttft": [], "latency": [], "rejected": 0}
+    gate = asyncio.Semaphore(concurrency)
+
+    async def bounded() -> None:
+        async with gate:
+            await one_request(host, port, path, results)
+
+    await asyncio.gather(*(bounded() for _ in range(total)))
+    return results
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the agent HTTP server")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent client connections")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Server run slots")
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--tokens", type=int, default=50, help="Tokens per simulated answer")
+    parser.add_argument("--token-delay-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    agent = ReactAgent(model=SimulatedModel(args.tokens, args.token_delay_ms / 1000), tools=[])
+    server = AgentServer({"bench": agent}, max_concurrency=args.max_concurrency, max_queue=args.max_queue)
+    port = free_port()
+    threading.Thread(target=server.run, kwargs={"port": port}, daemon=True).start()
+
+    import httpx
+
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/readyz").status_code == 200:
+                break
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+
+    # The agent's debug output would swamp the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = asyncio.run(load("127.0.0.1", port, "/agents/bench/stream", args.requests, args.concurrency))
+        elapsed = time.perf_counter() - start
+
+    done = len(results["latency"])
+    ideal = (args.tokens + 6) * args.token_delay_ms / 1000
+    print(f"{done} completed, {results['rejected']} rejected in {elapsed:.2f}s ({done / elapsed:.1f} req/s)")
+    print(f"time to first token: p50 {percentile(results['ttft'], .5) * 1000:.0f} ms, "
+          f"p95 {percentile(results['ttft'], .95) * 1000:.0f} ms")
+    print(f"latency: p50 {percentile(results['latency'], .5) * 1000:.0f} ms, "
+          f"p95 {percentile(results['latency'], .95) * 1000:.0f} ms "
+          f"(model time alone: {ideal * 1000:.0f} ms, mean {statistics.mean(results['latency'] or [0]) * 1000:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
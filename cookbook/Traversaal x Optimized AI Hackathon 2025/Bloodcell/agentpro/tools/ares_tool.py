@@ -4,6 +4,9 @@ from pydantic import HttpUrl
 from .base import Tool
 from typing import Optional
 
+# Module-level session keeps the TLS connection to Ares alive between calls
+_session = requests.Session()
+
 class AresInternetTool(Tool):
     name: str = "Ares Health-Enhanced Internet Search Tool"
     description: str = "Enhanced tool to search healthcare and location-relevant data using Traversaal Ares web search"
@@ -35,13 +38,14 @@ class AresInternetTool(Tool):
 
     def query_ares(self, final_prompt: str) -> str:
         payload = {"query": [final_prompt]}
-        response = requests.post(
-            self.url,
+        response = _session.post(
+            str(self.url),
             json=payload,
             headers={
                 "x-api-key": self.x_api_key,
                 "content-type": "application/json"
-            }
+            },
+            timeout=30,
         )
         if response.status_code != 200:
             return f"Error: {response.status_code} - {response.text}"
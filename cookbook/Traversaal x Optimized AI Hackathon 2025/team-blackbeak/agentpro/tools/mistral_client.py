@@ -2,6 +2,8 @@ import os
 import requests
 
 class MistralClient:
+    # Shared session keeps the TLS connection to the Mistral API alive between calls
+    _session = requests.Session()
     API_KEY = os.getenv("MISTRAL_API_KEY")
     API_URL = "https://api.mistral.ai/v1/chat/completions"
     
@@ -30,7 +32,7 @@ class MistralClient:
         }
 
         try:
-            response = requests.post(cls.API_URL, headers=headers, json=data)
+            response = cls._session.post(cls.API_URL, headers=headers, json=data, timeout=120)
             if response.status_code == 200:
                 return response.json()['choices'][0]['message']['content']
             return f"Mistral API Error: {response.status_code}"
@@ -1,7 +1,7 @@
 import os
 import argparse
 from agentproplus import ReactAgent
-from agentproplus.tools import QuickInternetTool, CalculateTool, UserInputTool, AresInternetTool, YFinanceTool, TraversaalProRAGTool, SlideGenerationTool
+from agentproplus.tools import get_tool
 from agentproplus import create_model
 
 def main():
@@ -22,15 +22,15 @@ def main():
             max_tokens=2048
         )
         
-        # Instantiate your tools
+        # Reference tools by name; each implementation is imported on its first call
         tools = [
-            QuickInternetTool(),
-            CalculateTool(),
-            UserInputTool(),
-            YFinanceTool(),
-            SlideGenerationTool(),
-            AresInternetTool(api_key=os.getenv("ARES_API_KEY", None)),
-            # TraversaalProRAGTool(api_key=os.getenv("TRAVERSAAL_PRO_API_KEY", None), document_names="employee_safety_manual"),
+            "search",
+            "calculate",
+            "request_user_input",
+            "fetch_stock_info",
+            "ppt_generate",
+            get_tool("ares_internet_search", api_key=os.getenv("ARES_API_KEY", None)),
+            # get_tool("traversaalpro_rag", api_key=os.getenv("TRAVERSAAL_PRO_API_KEY", None), document_names="employee_safety_manual"),
         ]
         myagent = ReactAgent(model=litellm_model, tools=tools, custom_system_prompt=args.system_prompt, max_iterations=20)
         
@@ -1,13 +1,22 @@
 """
-Example MCP server exposing two simple tools via stdio using FastMCP.
+Example MCP server exposing two simple tools using FastMCP.
 
-Run:
+Run over stdio (spawned by the agent):
     python mcp_server.py
 
 Then configure ReactAgent with:
     mcp_config=[{"id": "example", "command": "python", "args": ["mcp_server.py"]}]
+
+Or run it as a shared HTTP service:
+    python mcp_server.py --transport streamable-http --port 8000
+    mcp_config=[{"id": "example", "url": "http://127.0.0.1:8000/mcp"}]
+
+    python mcp_server.py --transport sse --port 8001
+    mcp_config=[{"id": "example", "url": "http://127.0.0.1:8001/sse", "transport": "sse"}]
 """
 
+import argparse
+
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("example-tools")
@@ -26,5 +35,12 @@ def add(a: float, b: float) -> float:
 
 
 if __name__ == "__main__":
-    mcp.run()
-
+    parser = argparse.ArgumentParser(description="Example MCP tool server")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http", "sse"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    mcp.run(transport=args.transport)
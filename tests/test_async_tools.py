@@ -0,0 +1,103 @@
+import asyncio
+import contextlib
+import io
+
+from agentproplus.agent import Action
+from agentproplus.model import ModelClient
+from agentproplus.react_agent import ReactAgent
+from agentproplus.tools import Tool
+
+
+class SlowLookup(Tool):
+    name: str = "Lookup"
+    description: str = "Looks things up"
+    action_type: str = "lookup"
+    input_format: str = "text"
+    coalesce = True
+
+    def run(self, input_text):
+        raise AssertionError("the async path must use arun")
+
+    async def arun(self, input_text):
+        calls.append(input_text)
+        try:
+            await asyncio.sleep(0.2)
+        except asyncio.CancelledError:
+            cancelled.append(input_text)
+            raise
+        return f"result for {input_text}"
+
+
+calls = []
+cancelled = []
+
+
+def setup_function():
+    calls.clear()
+    cancelled.clear()
+
+
+def test_coalesced_async_tool_calls_share_one_arun():
+    agent = ReactAgent(model=ModelClient(model_name="test-model"), tools=[SlowLookup()])
+    action = Action(action_type="lookup", input="x")
+
+    async def main():
+        return await asyncio.gather(agent.aexecute_tool(action), agent.aexecute_tool(action))
+
+    assert asyncio.run(main()) == ["result for x", "result for x"]
+    assert calls == ["x"]
+
+
+def test_cancelling_every_caller_cancels_the_tool():
+    agent = ReactAgent(model=ModelClient(model_name="test-model"), tools=[SlowLookup()])
+    action = Action(action_type="lookup", input="y")
+
+    async def main():
+        first = asyncio.create_task(agent.aexecute_tool(action))
+        second = asyncio.create_task(agent.aexecute_tool(action))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        # One caller is still waiting, so the shared call keeps running
+        assert cancelled == []
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert cancelled == ["y"]
+
+
+class _BareStream:
+    """An async iterator without aclose(), as a custom client might return."""
+
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.tokens:
+            raise StopAsyncIteration
+        return {"token": self.tokens.pop(0)}
+
+
+class BareStreamModel(ModelClient):
+    def __init__(self):
+        super().__init__(model_name="test-model")
+
+    def achat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        return _BareStream(["Thought: done\n", "Final Answer: ok"])
+
+
+def test_async_stream_without_aclose():
+    agent = ReactAgent(model=BareStreamModel(), tools=[])
+
+    async def main():
+        return [event async for event in agent.arun_stream("q")]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        events = asyncio.run(main())
+    assert events[-1]["type"] == "complete"
+    assert events[-1]["response"]["final_answer"] == "ok"
@@ -0,0 +1,95 @@
+import contextlib
+import io
+import time
+
+import pytest
+
+from agentproplus.agent import ThoughtStep
+from agentproplus.checkpoint import CheckpointStore, FileCheckpointStore, InMemoryCheckpointStore
+from agentproplus.model import ModelClient
+from agentproplus.react_agent import ReactAgent
+
+
+class AnswerModel(ModelClient):
+    def __init__(self):
+        super().__init__(model_name="test-model")
+
+    def chat_completion(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        return "Thought: done\nFinal Answer: ok"
+
+    def chat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        yield {"token": "Thought: done\nFinal Answer: ok"}
+
+
+class BrokenStore(InMemoryCheckpointStore):
+    def start(self, run_id, query, history):
+        raise OSError("disk full")
+
+
+def test_checkpoint_store_is_abstract():
+    with pytest.raises(TypeError):
+        CheckpointStore()
+
+
+def test_resume_after_partial_line_keeps_new_records(tmp_path):
+    store = FileCheckpointStore(str(tmp_path))
+    store.start("run", "q", [])
+    store.add_step("run", ThoughtStep(thought="first"))
+    with open(tmp_path / "run.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"type": "step", "step": {"thou')  # crash mid-write
+
+    assert [s.thought for s in store.load("run").steps] == ["first"]
+    store.add_step("run", ThoughtStep(thought="second"))
+    store.finish("run", "done")
+
+    state = store.load("run")
+    assert [s.thought for s in state.steps] == ["first", "second"]
+    assert state.completed and state.final_answer == "done"
+
+
+def test_unreadable_record_is_skipped(tmp_path):
+    store = FileCheckpointStore(str(tmp_path))
+    store.start("run", "q", [])
+    with open(tmp_path / "run.jsonl", "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    store.add_step("run", ThoughtStep(thought="after"))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = store.load("run")
+    assert [s.thought for s in state.steps] == ["after"]
+
+
+def test_failing_store_does_not_fail_the_run():
+    agent = ReactAgent(model=AnswerModel(), tools=[], checkpoint_store=BrokenStore())
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        response = agent.run("q")
+    assert response.final_answer == "ok"
+    assert "disk full" in out.getvalue()
+
+
+def test_stream_saves_the_run_when_consumed():
+    store = InMemoryCheckpointStore()
+    agent = ReactAgent(model=AnswerModel(), tools=[], checkpoint_store=store)
+    events = agent.run_stream("q", run_id="later")
+    assert store.load("later") is None
+    with contextlib.redirect_stdout(io.StringIO()):
+        list(events)
+    assert store.load("later").completed
+
+
+def test_in_memory_store_evicts_finished_and_old_runs(monkeypatch):
+    store = InMemoryCheckpointStore(max_runs=2, ttl=60)
+    store.start("done", "q", [])
+    store.finish("done", "answer")
+    store.start("open", "q", [])
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    # Finished runs are dropped after the ttl; unfinished ones stay resumable
+    assert store.run_ids() == ["open"]
+
+    store.start("a", "q", [])
+    store.add_step("open", ThoughtStep(thought="still going"))
+    store.start("b", "q", [])
+    # Beyond max_runs the least recently updated run goes first
+    assert store.run_ids() == ["open", "b"]
@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+
+from agentproplus import http_client
+from agentproplus.tools.ares_tool import AresInternetTool
+from agentproplus.tools.traversaalpro_rag_tool import TraversaalProRAGTool
+
+
+class AsyncOnlyAres(AresInternetTool):
+    def run(self, input_text):
+        raise AssertionError("the async path must not fall back to a worker thread")
+
+
+def use_transport(monkeypatch, handler):
+    clients = {}
+
+    def get_async_client():
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return clients[loop]
+
+    monkeypatch.setattr(http_client, "get_async_client", get_async_client)
+
+
+def test_ares_arun_uses_the_async_client(monkeypatch):
+    def handler(request):
+        assert request.headers["x-api-key"] == "key"
+        return httpx.Response(200, json={"data": {"response_text": "sunny", "web_url": ["https://a"]}})
+
+    use_transport(monkeypatch, handler)
+    tool = AsyncOnlyAres(api_key="key")
+
+    assert asyncio.run(tool.arun("weather")) == "Search Summary:\nsunny\n\nRelated Links:\n1. https://a"
+
+
+def test_traversaal_arun_reports_api_errors(monkeypatch):
+    use_transport(monkeypatch, lambda request: httpx.Response(503, text="busy"))
+    tool = TraversaalProRAGTool(api_key="key")
+
+    assert asyncio.run(tool.arun("q")) == "❌ API Error: 503 - busy"
+
+
+def test_arequest_caps_in_flight_requests_per_host(monkeypatch):
+    monkeypatch.setattr(http_client, "_config", http_client.HTTPConfig(pool_maxsize=2))
+    in_flight = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        return httpx.Response(200)
+
+    use_transport(monkeypatch, handler)
+
+    async def main():
+        urls = ["http://a/", "http://b/"] * 5
+        await asyncio.gather(*(http_client.arequest("GET", url) for url in urls))
+
+    asyncio.run(main())
+    assert peak == {"a": 2, "b": 2}
@@ -0,0 +1,65 @@
+import asyncio
+import contextlib
+import io
+import time
+
+from agentproplus.mcp_bridge import MCPClientManager, _is_cacheable, _ReplicaPool, _ResultCache
+
+
+def test_result_cache_is_opt_in():
+    assert _ResultCache.from_entry({"id": "s", "command": "x"}) is None
+    assert _ResultCache.from_entry({"id": "s", "command": "x", "cache": False}) is None
+    assert _ResultCache.from_entry({"id": "s", "command": "x", "cache": True}).ttl == 60.0
+    assert _ResultCache.from_entry({"id": "s", "command": "x", "cache": {"ttl": 5}}).ttl == 5.0
+
+
+def test_only_read_only_idempotent_tools_are_cached():
+    assert not _is_cacheable(None)
+    assert not _is_cacheable({"readOnlyHint": True})
+    assert not _is_cacheable({"idempotentHint": True})
+    assert _is_cacheable({"readOnlyHint": True, "idempotentHint": True})
+
+    manager = MCPClientManager([{"id": "s", "command": "x", "cache": True}])
+    manager._remember_annotations("s", [
+        {"name": "clock", "annotations": {"readOnlyHint": True}},
+        {"name": "lookup", "annotations": {"readOnlyHint": True, "idempotentHint": True}},
+    ])
+    assert manager.cache_stats()["s"]["cached_tools"] == ["lookup"]
+
+
+class FakeConnection:
+    healthy = True
+
+    def __init__(self):
+        self.outstanding = 0
+
+    async def stop(self):
+        pass
+
+
+class FlakyPool(_ReplicaPool):
+    """Extra replicas take a while to start and then fail."""
+
+    async def _spawn(self):
+        await asyncio.sleep(0.2)
+        raise RuntimeError("command not found")
+
+
+def test_busy_pool_keeps_using_live_replica_while_another_starts():
+    async def main():
+        pool = FlakyPool("s", {"replicas": 2}, startup_timeout=1)
+        live = FakeConnection()
+        live.outstanding = 1
+        pool.replicas.append(live)
+        started = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            # Neither waits for the slow spawn, nor fails when it does
+            assert await pool.acquire() is live
+            assert await pool.acquire() is live
+            assert time.monotonic() - started < 0.1
+            await asyncio.sleep(0.3)
+        assert "command not found" in out.getvalue()
+        assert pool._spawning == 0 and live.outstanding == 3
+        await pool.stop()
+
+    asyncio.run(main())
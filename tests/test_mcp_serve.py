@@ -0,0 +1,37 @@
+import asyncio
+import contextlib
+import io
+
+from agentproplus.mcp_serve import AgentMCPServer
+from agentproplus.model import ModelClient
+from agentproplus.react_agent import ReactAgent
+
+
+class SlowModel(ModelClient):
+    def __init__(self):
+        super().__init__(model_name="test-model")
+        self.closed = False
+
+    async def achat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        try:
+            await asyncio.sleep(10)
+            yield {"token": "Thought: done\nFinal Answer: late"}
+        finally:
+            self.closed = True
+
+
+def test_cancelled_request_stops_the_agent():
+    model = SlowModel()
+    server = AgentMCPServer({"research": ReactAgent(model=model, tools=[])})
+
+    async def main():
+        run = asyncio.create_task(server.arun_agent("research", "q"))
+        await asyncio.sleep(0.05)
+        run.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+        return run
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = asyncio.run(main())
+    assert run.cancelled()
+    assert model.closed
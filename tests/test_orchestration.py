@@ -0,0 +1,59 @@
+import contextlib
+import io
+
+import pytest
+
+from agentproplus.model import ModelClient
+from agentproplus.orchestration import AgentDAG, InMemoryNodeCache, NodeCache, NodeFailedError, _code_digest
+from agentproplus.react_agent import ReactAgent
+
+
+class LoopingModel(ModelClient):
+    """Never gives a final answer."""
+
+    def __init__(self):
+        super().__init__(model_name="test-model")
+
+    async def achat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        yield {"token": "Thought: not yet\nPAUSE: thinking"}
+
+
+def test_node_cache_is_abstract():
+    with pytest.raises(TypeError):
+        NodeCache()
+
+
+def test_agent_stopped_at_max_iterations_fails_and_is_not_cached():
+    cache = InMemoryNodeCache()
+    dag = AgentDAG(cache=cache)
+    dag.add_agent("answer", ReactAgent(model=LoopingModel(), tools=[], max_iterations=2), deps=["q"])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with pytest.raises(NodeFailedError) as info:
+            dag.run({"q": "question"})
+    assert info.value.node == "answer"
+    assert not cache._items
+
+
+def make_scaler(factor):
+    return lambda inputs: inputs["x"] * factor
+
+
+def test_code_digest_covers_closure_values():
+    assert _code_digest(make_scaler(2)) == _code_digest(make_scaler(2))
+    assert _code_digest(make_scaler(2)) != _code_digest(make_scaler(3))
+
+
+def test_code_digest_is_stable_for_nested_functions_and_objects():
+    marker = object()
+
+    def outer(inputs):
+        return [(lambda v: v + 1)(inputs["x"]), marker]
+
+    other = object()
+
+    def same(inputs):
+        return [(lambda v: v + 1)(inputs["x"]), other]
+
+    # The reprs of the nested code object and of the objects hold memory addresses
+    assert _code_digest(outer) == _code_digest(same)
@@ -0,0 +1,39 @@
+import pytest
+
+from agentproplus import rate_limit
+from agentproplus.rate_limit import get_rate_limiter, scale_rate_limits
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_limiters", {})
+    monkeypatch.setattr(rate_limit, "_quotas", {})
+    monkeypatch.setattr(rate_limit, "_scale", 1.0)
+
+
+def test_scaled_limit_survives_new_clients():
+    limiter = get_rate_limiter("openai", "gpt", requests_per_minute=600)
+    scale_rate_limits(1 / 4)
+    assert limiter.requests_per_minute == 150
+    # A model client created later with the configured quota keeps the worker's share
+    assert get_rate_limiter("openai", "gpt", requests_per_minute=600) is limiter
+    assert limiter.requests_per_minute == 150
+    assert get_rate_limiter("openai", "other", tokens_per_minute=1000).tokens_per_minute == 250
+
+
+def test_scaling_does_not_compound():
+    limiter = get_rate_limiter("openai", "gpt", requests_per_minute=600)
+    scale_rate_limits(0.5)
+    scale_rate_limits(0.5)
+    assert limiter.requests_per_minute == 300
+
+
+def test_reconfigure_keeps_the_bucket_balance():
+    limiter = get_rate_limiter("openai", "gpt", requests_per_minute=60)
+    for _ in range(60):
+        limiter.reserve()
+    assert limiter.reserve() > 0
+    get_rate_limiter("openai", "gpt", requests_per_minute=60)
+    get_rate_limiter("openai", "gpt", requests_per_minute=120)
+    # Raising the limit does not hand out a fresh, full bucket
+    assert limiter.reserve() > 0
@@ -0,0 +1,47 @@
+import contextlib
+import io
+
+from agentproplus.model import ModelClient
+from agentproplus.react_agent import ReactAgent
+from agentproplus.tools import Tool
+
+
+class Echo(Tool):
+    name: str = "Echo"
+    description: str = "Echoes its input"
+    action_type: str = "echo"
+    input_format: str = "text"
+
+    def run(self, input_text):
+        return f"echo {input_text}"
+
+
+SCRIPT = [
+    'PAUSE: wait\nThought: look it up\nAction: {"action_type": "echo", "input": "hi"}',
+    'Thought: broken\nAction: {"action_type": "echo", "input": }',
+    "Thought: done\nPAUSE: checked\nFinal Answer: the answer",
+]
+
+
+class ScriptedModel(ModelClient):
+    def __init__(self):
+        super().__init__(model_name="test-model")
+        self.replies = list(SCRIPT)
+
+    def chat_completion(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        return self.replies.pop(0)
+
+    def chat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        yield {"token": self.replies.pop(0)}
+
+
+def test_run_and_run_stream_parse_alike():
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync = ReactAgent(model=ScriptedModel(), tools=[Echo()]).run("q")
+        events = list(ReactAgent(model=ScriptedModel(), tools=[Echo()]).run_stream("q"))
+    streamed = events[-1]["response"]
+
+    assert [step.model_dump() for step in sync.thought_process] == streamed["thought_process"]
+    assert sync.final_answer == streamed["final_answer"] == "the answer"
+    assert sync.thought_process[0].observation.result == "echo hi"
+    assert sync.thought_process[1].observation.result.startswith("Error parsing LLM response")
@@ -0,0 +1,151 @@
+import asyncio
+import contextlib
+import gc
+import io
+import json
+
+import pytest
+
+from agentproplus.model import ModelClient
+from agentproplus.react_agent import ReactAgent
+from agentproplus.scheduling import FairScheduler
+from agentproplus.server import AgentServer, AdmissionRejected, api_key_identity
+
+
+class AnswerModel(ModelClient):
+    def __init__(self):
+        super().__init__(model_name="test-model")
+
+    async def achat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        yield {"token": "Thought: done\nFinal Answer: ok"}
+
+
+class SlowModel(ModelClient):
+    def __init__(self):
+        super().__init__(model_name="test-model")
+        self.closed = False
+
+    async def achat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        try:
+            await asyncio.sleep(10)
+            yield {"token": "Thought: done\nFinal Answer: late"}
+        finally:
+            self.closed = True
+
+
+class FakeRequest:
+    path_params = {"name": "echo"}
+    headers = {}
+
+    def __init__(self, body=None, connected=True):
+        self.body = body or {"query": "q"}
+        self.connected = connected
+
+    async def json(self):
+        return self.body
+
+    async def is_disconnected(self):
+        return not self.connected
+
+
+def make_server():
+    return AgentServer({"echo": ReactAgent(model=AnswerModel(), tools=[])}, max_concurrency=1)
+
+
+def test_closing_events_before_the_first_event_frees_the_slot():
+    server = make_server()
+
+    async def main():
+        _, events = await server._events("echo", {"query": "q"}, "summary", {})
+        assert server.admission.active == 1
+        await events.aclose()
+        assert server.admission.active == 0
+        assert await server.drain()
+
+    asyncio.run(main())
+
+
+def test_sse_disconnect_after_session_frame_frees_the_slot():
+    server = make_server()
+
+    async def main():
+        response = await server._stream(FakeRequest())
+        body = response.body_iterator
+        assert (await body.__anext__()).startswith("event: session")
+        await body.aclose()
+        assert server.admission.active == 0
+        # The next request is admitted rather than queued behind a leaked slot
+        _, events = await asyncio.wait_for(server._events("echo", {"query": "q"}, "summary", {}), 1)
+        await events.aclose()
+
+    asyncio.run(main())
+
+
+def test_dropped_events_free_the_slot():
+    server = make_server()
+
+    async def main():
+        _, events = await server._events("echo", {"query": "q"}, "summary", {})
+        del events
+        gc.collect()
+        assert server.admission.active == 0
+
+    asyncio.run(main())
+
+
+def test_completed_run_releases_once():
+    server = make_server()
+
+    async def main():
+        _, events = await server._events("echo", {"query": "q"}, "summary", {})
+        seen = [event async for event in events]
+        await events.aclose()
+        return seen
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        seen = asyncio.run(main())
+    assert seen[-1]["type"] == "complete"
+    assert server.admission.active == 0
+
+
+def test_tenant_and_priority_come_from_the_server():
+    agent = ReactAgent(model=AnswerModel(), tools=[], scheduler=FairScheduler(), priority="batch")
+    keys = {"k1": {"tenant": "acme", "priority": "batch"}, "k2": {"tenant": "globex"}}
+    server = AgentServer({"echo": agent}, identify=api_key_identity(keys))
+
+    # A body cannot pick its tenant or outrank its grant
+    body = {"query": "q", "tenant": "globex", "priority": "interactive"}
+    assert server._identity("echo", {"authorization": "Bearer k1"}, body) == ("acme", "batch")
+    # It may lower its priority
+    assert server._identity("echo", {"x-api-key": "k2"}, {"query": "q", "priority": "batch"}) == ("globex", "batch")
+    assert server._identity("echo", {"x-api-key": "k2"}, {"query": "q"}) == ("globex", "interactive")
+    with pytest.raises(AdmissionRejected) as info:
+        server._identity("echo", {"authorization": "Bearer nope"}, {"query": "q"})
+    assert info.value.status == 401
+
+    # Without identify, the agent's own tenant and priority are the ceiling
+    open_server = AgentServer({"echo": agent})
+    assert open_server._identity("echo", {}, body) == ("default", "batch")
+
+
+def test_run_is_aborted_when_the_client_disconnects(monkeypatch):
+    monkeypatch.setattr("agentproplus.server._DISCONNECT_POLL", 0.01)
+    model = SlowModel()
+    server = AgentServer({"echo": ReactAgent(model=model, tools=[])})
+
+    async def main():
+        return await asyncio.wait_for(server._run(FakeRequest(connected=False)), 2)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = asyncio.run(main())
+    assert response.status_code == 499
+    assert model.closed
+    assert server.admission.active == 0
+
+
+def test_run_returns_the_response():
+    server = make_server()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = asyncio.run(server._run(FakeRequest()))
+    assert json.loads(response.body)["response"]["final_answer"] == "ok"
@@ -0,0 +1,84 @@
+import asyncio
+import contextlib
+import io
+import time
+
+from agentproplus.model import ModelClient
+from agentproplus.react_agent import ReactAgent
+from agentproplus.stream_events import acoalesce_tokens, coalesce_tokens
+
+ANSWER = "Thought: I know it.\nFinal Answer: " + " ".join(f"word{i}" for i in range(60))
+
+
+class StreamingModel(ModelClient):
+    def __init__(self):
+        super().__init__(model_name="test-model")
+
+    def chat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        for piece in ANSWER.split(" "):
+            yield {"token": piece + " "}
+
+    async def achat_completion_stream(self, system_prompt, user_prompt, temperature=None, max_tokens=None):
+        for piece in ANSWER.split(" "):
+            yield {"token": piece + " "}
+
+
+def token_events(events, kind):
+    return [event for event in events if event["type"] == kind]
+
+
+def text(events, kind):
+    return "".join(event["token"] for event in token_events(events, kind))
+
+
+def test_sections_mode_coalesces_both_token_streams():
+    agent = ReactAgent(model=StreamingModel(), tools=[])
+    with contextlib.redirect_stdout(io.StringIO()):
+        plain = list(agent.run_stream("q", stream_mode="sections"))
+        merged = list(agent.run_stream("q", stream_mode="sections", coalesce_chars=20))
+
+    for kind in ("llm_token", "final_answer_token"):
+        assert text(merged, kind) == text(plain, kind)
+        # Alternating llm_token / final_answer_token events no longer force a flush each
+        assert len(token_events(merged, kind)) * 2 < len(token_events(plain, kind))
+    assert merged[-1]["type"] == "complete"
+
+
+def test_async_sections_mode_coalesces():
+    agent = ReactAgent(model=StreamingModel(), tools=[])
+
+    async def collect(**options):
+        return [event async for event in agent.arun_stream("q", stream_mode="sections", **options)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        plain = asyncio.run(collect())
+        merged = asyncio.run(collect(coalesce_chars=20))
+    assert text(merged, "final_answer_token") == text(plain, "final_answer_token")
+    assert len(token_events(merged, "final_answer_token")) * 2 < len(token_events(plain, "final_answer_token"))
+
+
+def test_async_flushes_while_stream_is_stalled():
+    async def stalled():
+        yield {"type": "llm_token", "token": "hi", "iteration": 1}
+        await asyncio.sleep(0.5)
+        yield {"type": "llm_token", "token": " there", "iteration": 1}
+
+    async def collect():
+        start = time.monotonic()
+        return [(time.monotonic() - start, event["token"]) async for event in acoalesce_tokens(stalled(), 50)]
+
+    received = asyncio.run(collect())
+    assert [token for _, token in received] == ["hi", " there"]
+    assert received[0][0] < 0.4
+
+
+def test_buffered_text_is_delivered_before_an_error():
+    def failing():
+        yield {"type": "llm_token", "token": "partial", "iteration": 1}
+        raise ValueError("provider error")
+
+    received = []
+    with contextlib.suppress(ValueError):
+        for event in coalesce_tokens(failing(), flush_chars=100):
+            received.append(event["token"])
+    assert received == ["partial"]
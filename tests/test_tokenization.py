@@ -0,0 +1,41 @@
+from agentproplus.context_window import ContextWindowManager, FittedPrompt, PromptPart
+from agentproplus.tokenization import Tokenizer
+
+
+class CountingEncoding:
+    """Stands in for a tiktoken encoding: one token per word."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, text, disallowed_special=()):
+        self.calls.append(text)
+        return text.split()
+
+
+def exact_tokenizer():
+    tokenizer = Tokenizer("gpt-4o")
+    tokenizer._backend, tokenizer._kind = CountingEncoding(), "tiktoken"
+    return tokenizer
+
+
+def test_fit_passes_its_count_to_check():
+    tokenizer = exact_tokenizer()
+    context = ContextWindowManager("gpt-4o", 10_000, tokenizer)
+    prompt = context.fit("system words", [PromptPart("one two "), PromptPart("three")], 100)
+    assert isinstance(prompt, FittedPrompt) and prompt.tokens == 3
+
+    assert context.check("system words", prompt, 100) == 5
+    # Only the parts and the system prompt were encoded, each once; never the whole prompt
+    assert sorted(tokenizer._backend.calls) == ["one two ", "system words", "three"]
+
+
+def test_count_cache_is_bounded_and_keyed_by_digest():
+    tokenizer = exact_tokenizer()
+    for i in range(3000):
+        tokenizer.count(f"prompt {i}")
+    assert len(tokenizer._counts) <= 1024
+    assert all(isinstance(key, bytes) and len(key) == 16 for key in tokenizer._counts)
+    calls = len(tokenizer._backend.calls)
+    tokenizer.count("prompt 2999")
+    assert len(tokenizer._backend.calls) == calls
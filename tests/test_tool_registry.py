@@ -0,0 +1,25 @@
+from agentproplus.tools import get_tool
+from agentproplus.tools.calculator_tool import CalculateTool
+from agentproplus.tools.registry import LazyTool
+from agentproplus.tools.specs import BUILTIN_SPECS
+
+
+def test_spec_metadata_comes_from_the_tool_class():
+    for spec in BUILTIN_SPECS:
+        fields = spec.load_class().model_fields
+        assert spec.action_type == fields["action_type"].default
+        assert spec.name == fields["name"].default
+        assert spec.description == fields["description"].default
+        assert spec.input_format == fields["input_format"].default
+
+
+def test_lookup_by_class_name():
+    tool = get_tool("Calculator")
+    assert isinstance(tool, LazyTool) and not tool.loaded
+    assert tool.description == CalculateTool.model_fields["description"].default
+
+
+def test_constructor_kwargs_shape_the_metadata():
+    tool = get_tool("traversaalpro_rag", document_names="HR policy", api_key="k")
+    assert "HR policy" in tool.description
+    assert "HR policy" in tool.get_tool_description()